@@ -9,19 +9,46 @@ assertDontRaiseAnException
 assertExceptionMessage
 assertListIsSorted
 assertListIsNotSorted
-assertValidation (Min, Max, Positive, Negative, Range, InList, NotInList, Blank, NonBlank)
+assertValidation (Min, Max, Positive, Negative, Range, InList, NotInList, Blank, NonBlank, Sweep)
+assertRandomValidation
 assertPerformance
+assertBenchmark
+assertBaseline
+assertThroughput
+assertComplexity
 '''
 
-import re
-import threading2
-import time
+import array
+import collections
+import itertools
+import random
+import struct
+
+from . import baselines
+from . import calibration
+from . import compat
+from . import complexity
+from . import coroutines
+from . import executors
+from . import instrumentation
+from . import load
+from . import profiling
+from . import regexes
+from . import strategies
+from . import threading2
+from . import timing
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 failureException = AssertionError
 
 # Exceptions
 
+@instrumentation.instrumented('assertion')
 def assertDontRaiseAnException(method, *args, **kwargs):
     '''
     Assert that the method is executed without raise an exception. 
@@ -32,6 +59,7 @@ def assertDontRaiseAnException(method, *args, **kwargs):
     except Exception as e:
         raise failureException("It was not expect an exception, but it get a %s: %s" % (e.__class__.__name__, str(e)))
 
+@instrumentation.instrumented('assertion')
 def assertExceptionMessage(exception_message, method, *args, **kwargs):
     '''
     Assert that a exception is raised and has an specific message. 
@@ -39,7 +67,7 @@ def assertExceptionMessage(exception_message, method, *args, **kwargs):
     try:
         executeMethod(method, *args, **kwargs)
     except Exception as e:
-        if not re.match(exception_message.replace("[...]", ".*"), str(e)):
+        if not regexes.compilePattern(exception_message.replace("[...]", ".*")).match(str(e)):
             raise failureException("It was expected an exception with message '%s', but receive '%s'" % (exception_message, str(e)))
     else:
         raise failureException("It was expected an exception.")
@@ -47,49 +75,132 @@ def assertExceptionMessage(exception_message, method, *args, **kwargs):
 # Validation
 
 def executeMethod(method, *args, **kwargs):
-    return method(*args, **kwargs)
+    '''
+    Coroutine functions (and other methods that return an awaitable) are executed in an event loop.
+    '''
+    result = method(*args, **kwargs)
+    if coroutines.isAwaitable(result) and not coroutines.isDeferring():
+        return coroutines.run(result)
+    return result
+
+MAX_VALUE_LENGTH = 100
+
+
+def _truncate(text, length=MAX_VALUE_LENGTH):
+    if len(text) > length:
+        return text[:length - 3] + '...'
+    return text
+
+
+class ValidationRecord(object):
+    '''
+    Compact record of an unexpected result: the arguments are stored as a truncated text, not the objects.
+    '''
+    __slots__ = ('success', 'values', 'msg')
+
+    def __init__(self, success, values, msg=None):
+        self.success = success
+        self.values = ', '.join(_truncate(str(v)) for v in values)
+        self.msg = None if msg is None else _truncate(msg)
+
+    def __str__(self):
+        if self.success:
+            return '> %s' % self.values
+        return '> %s - %s' % (self.values, self.msg)
+
+
+def _asSink(sink):
+    '''
+    sink = None, a callable that receives the ValidationRecord, a file (or any object with write) or a logger
+    '''
+    if sink is None or callable(sink):
+        return sink
+    if hasattr(sink, 'write'):
+        def fileSink(record):
+            sink.write('Unexpected %s: %s\n' % ('success' if record.success else 'failure', str(record)[2:]))
+        return fileSink
+    if hasattr(sink, 'error'):
+        def loggerSink(record):
+            sink.error('Unexpected %s: %s', 'success' if record.success else 'failure', str(record)[2:])
+        return loggerSink
+    raise Exception('Invalid sink, use a callable, a file or a logger.')
+
 
 class ValidationTestResult(object):
     '''
     Result object (used as collect parameter) that store the log of validation tests
+
+    sink = default None, a callable, a file or a logger that receives every record as soon as it is added
+    maxRecords = default None (no limit), maximum number of records of each kind kept in memory (and in the report)
     '''
 
-    def __init__(self):
+    def __init__(self, sink=None, maxRecords=None):
         self.unexpectFailure = []
         self.unexpectSuccess = []
+        self.failureCount = 0
+        self.successCount = 0
+        self.sink = _asSink(sink)
+        self.maxRecords = maxRecords
+
+    def _add(self, records, record):
+        if self.sink is not None:
+            self.sink(record)
+        if self.maxRecords is None or len(records) < self.maxRecords:
+            records.append(record)
 
     def addUnexpectedFailure(self, msg, values):
-        self.unexpectFailure.append((values, msg))
+        self.failureCount += 1
+        self._add(self.unexpectFailure, ValidationRecord(False, values, msg))
 
     def addUnexpectedSuccess(self, values):
-        self.unexpectSuccess.append(values)
+        self.successCount += 1
+        self._add(self.unexpectSuccess, ValidationRecord(True, values))
 
     def __str__(self):
-        result = ''
-        if len(self.unexpectSuccess) > 0:
-            result = result + "Unexpected success for the combination of arguments:"
-            for success in self.unexpectSuccess:
-                values = ', '.join(str(v) for v in success)
-                result = result + '\n> %s' % (values)
-        if len(self.unexpectFailure) > 0:
-            if len(self.unexpectSuccess) > 0:
-                result = result + "\n"
-            result = result + "Unexpected failure for the combination of arguments:"
-            for failure in self.unexpectFailure:
-                values = ', '.join(str(v) for v in failure[0])
-                msg = failure[1]
-                result = result + '\n> %s - %s' % (values, msg)
-        return result
+        lines = []
+        if self.successCount > 0:
+            lines.append("Unexpected success for the combination of arguments:")
+            lines.extend(str(record) for record in self.unexpectSuccess)
+            if self.successCount > len(self.unexpectSuccess):
+                lines.append('> ... (%s more)' % (self.successCount - len(self.unexpectSuccess)))
+        if self.failureCount > 0:
+            lines.append("Unexpected failure for the combination of arguments:")
+            lines.extend(str(record) for record in self.unexpectFailure)
+            if self.failureCount > len(self.unexpectFailure):
+                lines.append('> ... (%s more)' % (self.failureCount - len(self.unexpectFailure)))
+        return '\n'.join(lines)
 
     def hasFailure(self):
-        return len(self.unexpectFailure) > 0 or len(self.unexpectSuccess) > 0
+        return self.failureCount > 0 or self.successCount > 0
+
+    def countFailures(self):
+        return self.failureCount + self.successCount
 
 
 class ValidationTest(object):
     '''
     Abstract class that is used to identify a validation test to a specific argument
+
+    values() caches the generated values, so an instance can be reused by many tests without generate them again.
+    The cache is invalidated when a property changes. The values of a sweep are generated lazily and never cached.
     '''
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        self.__dict__.pop('_values', None)
+
+    def values(self):
+        '''
+        Cached and immutable (goodValue, tuple of successValues, tuple of failureValues).
+        '''
+        if getattr(self, 'sweep', None) is not None:
+            return (self.goodValue(), self.successValues(), self.failureValues())
+        values = self.__dict__.get('_values')
+        if values is None:
+            values = (self.goodValue(), tuple(self.successValues()), tuple(self.failureValues()))
+            self.__dict__['_values'] = values
+        return values
+
     def goodValue(self):
         '''
         Not special case of success
@@ -108,21 +219,148 @@ class ValidationTest(object):
         '''
         pass
 
+    def drawSuccess(self, rnd):
+        '''
+        Random case of success, used by assertRandomValidation. rnd = random.Random
+        '''
+        return rnd.choice(list(self.values()[1]))
+
+    def drawFailure(self, rnd):
+        '''
+        Random case of failure, used by assertRandomValidation. rnd = random.Random
+        '''
+        return rnd.choice(list(self.values()[2]))
+
+    def shrink(self, value, success):
+        '''
+        Simpler values than `value` of the same kind (success or failure), the simplest first.
+        '''
+        return []
+
+
+def _drawSteps(rnd):
+    '''
+    Random number of steps from a boundary, the small ones are more likely (the bugs live near the boundaries).
+    '''
+    return rnd.randint(0, 10 ** rnd.randint(0, 6))
+
+
+def _shrinkSteps(steps):
+    candidates = []
+    for k in (0, steps // 2, steps - 1):
+        if 0 <= k < steps and k not in candidates:
+            candidates.append(k)
+    return candidates
+
+
+def _shrinkTowards(boundary, value, precision):
+    '''
+    Values between the boundary and `value`, the closest to the boundary first.
+    '''
+    steps = int(round(abs(value - boundary) / float(precision)))
+    direction = 1 if value >= boundary else -1
+    return [boundary + direction * k * precision for k in _shrinkSteps(steps)]
+
+
+class Sweep(object):
+    '''
+    Dense grid of values around the boundaries of Min, Max, Positive, Negative and Range. The values are generated
+    lazily, so a sweep of millions of values is never stored in memory.
+
+    Properties:
+    steps = default range(1, 11), multiples k of the precision: boundary+k*precision and boundary-k*precision are
+    generated. It must be iterable more than once (list, xrange etc).
+    samples = default 0, number of random values inside of the valid interval
+    seed = default 0, seed of the random samples, so the sweep is reproducible
+    maxstep = default None (the biggest of the steps), the random samples of Min and Max are at most maxstep*precision
+    far from the boundary
+    '''
+
+    def __init__(self, steps=None, samples=0, seed=0, maxstep=None):
+        self.steps = steps if steps is not None else range(1, 11)
+        self.samples = samples
+        self.seed = seed
+        self.maxstep = maxstep
+
+    def walk(self, boundary, direction, precision, limit=None):
+        '''
+        boundary+k*precision (direction=1) or boundary-k*precision (direction=-1), until the limit (inclusive).
+        '''
+        for k in self.steps:
+            value = boundary + direction * k * precision
+            if limit is not None and (value - limit) * direction > 0:
+                break
+            yield value
+
+    def between(self, low, high, precision):
+        '''
+        low, the walk from low up to high, high and the walk from high down to low, without repeating the values where
+        the walks meet (the steps are increasing).
+        '''
+        yield low
+        highest = low
+        for value in self.walk(low, 1, precision, high):
+            yield value
+            highest = value
+        if highest < high:
+            yield high
+        for value in self.walk(high, -1, precision, low):
+            if value <= highest:
+                break
+            yield value
+
+    def interior(self, low, high):
+        '''
+        Random values between low and high (inclusive).
+        '''
+        rnd = random.Random(self.seed)
+        integers = isinstance(low, compat.integerTypes) and isinstance(high, compat.integerTypes)
+        for i in compat.xrange(self.samples):
+            yield rnd.randint(low, high) if integers else rnd.uniform(low, high)
+
+    def span(self, precision):
+        '''
+        Size of the interval of the random samples of Min and Max: maxstep or the biggest step.
+        '''
+        if not self.samples:
+            return 0
+        if self.maxstep is not None:
+            return self.maxstep * precision
+        if not self.steps:
+            return 0
+        if isinstance(self.steps, compat.xrange): # without walking through it
+            return max(self.steps[0], self.steps[-1]) * precision
+        return max(self.steps) * precision
+
+    def beside(self, boundary, direction, precision):
+        '''
+        Random values between boundary and boundary+span (direction=1) or boundary-span and boundary (direction=-1).
+        The span is computed only when the first value is needed.
+        '''
+        if not self.samples:
+            return
+        span = self.span(precision)
+        low, high = (boundary, boundary + span) if direction > 0 else (boundary - span, boundary)
+        for value in self.interior(low, high):
+            yield value
+
 
 class Min(ValidationTest):
     '''
     Properties:
     min = inclusive
     precision = default 1, the value that will be added to min to create failure cases
+    sweep = default None, a Sweep to generate values around min instead of the following ones
     
     Make the following tests: 
     - Cases of success: min, min+precision, min+10*precision
     - Cases of failure: min-precision, min-10*precision
     '''
 
-    def __init__(self, a_min, precision=1):
+    def __init__(self, a_min, precision=1, sweep=None):
         self.min = a_min
         self.precision = precision
+        self.sweep = sweep
 
     def goodValue(self):
         return self.min + self.precision
@@ -130,42 +368,74 @@ class Min(ValidationTest):
     def successValues(self):
 #        if isinstance(self.value, (str, list, dict, tuple)):
 #          return len(self.value) >= self.requiredValue
+        if self.sweep is not None:
+            return itertools.chain([self.min],
+                                   self.sweep.walk(self.min, 1, self.precision),
+                                   self.sweep.beside(self.min, 1, self.precision))
         return [self.min,
                 self.goodValue(),
                 self.min + (10 * self.precision)]
 
     def failureValues(self):
+        if self.sweep is not None:
+            return self.sweep.walk(self.min, -1, self.precision)
         return [self.min - (10 * self.precision),
                 self.min - self.precision]
 
+    def drawSuccess(self, rnd):
+        return self.min + _drawSteps(rnd) * self.precision
+
+    def drawFailure(self, rnd):
+        return self.min - (_drawSteps(rnd) + 1) * self.precision
+
+    def shrink(self, value, success):
+        return _shrinkTowards(self.min if success else self.min - self.precision, value, self.precision)
+
 
 class Max(ValidationTest):
     '''
     Properties:
     max = inclusive
     precision = default 1, the value that will be added to max to create failure cases
+    sweep = default None, a Sweep to generate values around max instead of the following ones
     
     Make the following tests: 
     - Cases of success: max, max-precision, max-10*precision
     - Cases of failure: max+precision, max+10*precision
     '''
 
-    def __init__(self, a_max, precision=1):
+    def __init__(self, a_max, precision=1, sweep=None):
         self.max = a_max
         self.precision = precision
+        self.sweep = sweep
 
     def goodValue(self):
         return self.max - self.precision
 
     def successValues(self):
+        if self.sweep is not None:
+            return itertools.chain([self.max],
+                                   self.sweep.walk(self.max, -1, self.precision),
+                                   self.sweep.beside(self.max, -1, self.precision))
         return [self.max - (10 * self.precision),
                 self.goodValue(),
                 self.max]
 
     def failureValues(self):
+        if self.sweep is not None:
+            return self.sweep.walk(self.max, 1, self.precision)
         return [self.max + self.precision,
                 self.max + (10 * self.precision)]
 
+    def drawSuccess(self, rnd):
+        return self.max - _drawSteps(rnd) * self.precision
+
+    def drawFailure(self, rnd):
+        return self.max + (_drawSteps(rnd) + 1) * self.precision
+
+    def shrink(self, value, success):
+        return _shrinkTowards(self.max if success else self.max + self.precision, value, self.precision)
+
 
 class Positive(Min):
     '''
@@ -175,12 +445,22 @@ class Positive(Min):
     Similar to Min(1) but with the following difference:
     - Cases of failure: -precision, 0
     '''
-    def __init__(self, precision=1):
-        super(Positive, self).__init__(1, precision)
+    def __init__(self, precision=1, sweep=None):
+        super(Positive, self).__init__(1, precision, sweep)
 
     def failureValues(self):
+        if self.sweep is not None:
+            return itertools.chain([0], self.sweep.walk(0, -1, self.precision))
         return [-self.precision, 0]
 
+    def drawFailure(self, rnd):
+        return -_drawSteps(rnd) * self.precision
+
+    def shrink(self, value, success):
+        if success:
+            return Min.shrink(self, value, success)
+        return _shrinkTowards(0, value, self.precision)
+
 
 class Negative(Max):
     '''
@@ -190,12 +470,22 @@ class Negative(Max):
     Similar to Max(-1) but with the following difference: 
     - Cases of failure: 0, precision
     '''
-    def __init__(self, precision=1):
-        super(Negative, self).__init__(-1, precision)
+    def __init__(self, precision=1, sweep=None):
+        super(Negative, self).__init__(-1, precision, sweep)
 
     def failureValues(self):
+        if self.sweep is not None:
+            return itertools.chain([0], self.sweep.walk(0, 1, self.precision))
         return [0, self.precision]
 
+    def drawFailure(self, rnd):
+        return _drawSteps(rnd) * self.precision
+
+    def shrink(self, value, success):
+        if success:
+            return Max.shrink(self, value, success)
+        return _shrinkTowards(0, value, self.precision)
+
 
 class Range(ValidationTest):
     '''
@@ -203,22 +493,30 @@ class Range(ValidationTest):
     min = inclusive
     max = inclusive
     precision = default 1, the value that will be added to min and max to create failure cases
+    sweep = default None, a Sweep to generate values around min and max (and random values between them) instead of
+    the following ones
 
     Make the following tests: 
     - Cases of success: min, max, (max-min)/2
     - Cases of failure: min-precision, max+precision, min-10*precision, max+10*precision
     '''
 
-    def __init__(self, a_min, a_max, precision=1):
-        if (min > max): raise Exception('min > max, change the order of the arguments.')
+    def __init__(self, a_min, a_max, precision=1, sweep=None):
+        if (a_min > a_max): raise Exception('min > max, change the order of the arguments.')
         self.min = a_min
         self.max = a_max
         self.precision = precision
+        self.sweep = sweep
 
     def goodValue(self):
+        if isinstance(self.min, compat.integerTypes) and isinstance(self.max, compat.integerTypes):
+            return self.min + ((self.max - self.min) // 2)
         return self.min + ((self.max - self.min) / 2)
 
     def successValues(self):
+        if self.sweep is not None:
+            return itertools.chain(self.sweep.between(self.min, self.max, self.precision),
+                                   self.sweep.interior(self.min, self.max))
         if (self.max - self.min) < 2:
             return [self.min, self.max]
         return [self.min,
@@ -226,11 +524,36 @@ class Range(ValidationTest):
                 self.max]
 
     def failureValues(self):
+        if self.sweep is not None:
+            return itertools.chain(self.sweep.walk(self.min, -1, self.precision),
+                                   self.sweep.walk(self.max, 1, self.precision))
         return [self.min - (10 * self.precision),
                 self.min - self.precision,
                 self.max + self.precision,
                 self.max + (10 * self.precision)]
 
+    def drawSuccess(self, rnd):
+        near = rnd.randint(0, 2)
+        if near == 0:
+            return min(self.min + _drawSteps(rnd) * self.precision, self.max)
+        if near == 1:
+            return max(self.max - _drawSteps(rnd) * self.precision, self.min)
+        if isinstance(self.min, compat.integerTypes) and isinstance(self.max, compat.integerTypes):
+            return rnd.randint(self.min, self.max)
+        return rnd.uniform(self.min, self.max)
+
+    def drawFailure(self, rnd):
+        if rnd.randint(0, 1):
+            return self.min - (_drawSteps(rnd) + 1) * self.precision
+        return self.max + (_drawSteps(rnd) + 1) * self.precision
+
+    def shrink(self, value, success):
+        if success:
+            boundary = self.min if value - self.min <= self.max - value else self.max
+        else:
+            boundary = self.min - self.precision if value < self.min else self.max + self.precision
+        return _shrinkTowards(boundary, value, self.precision)
+
 
 class InList(ValidationTest):
     '''
@@ -244,24 +567,39 @@ class InList(ValidationTest):
 
     def __init__(self, a_list):
         if(len(a_list) < 2): raise Exception("If the list has minus of 2 elements, why don't make an exact test?")
-        self.list = a_list
+        self.list = list(a_list) # a copy, the list of the user is never changed
 
     def goodValue(self):
-        return self.list[len(self.list) / 2]
+        return self.list[len(self.list) // 2]
 
     def successValues(self):
         if len(self.list) < 4:
-            return self.list
+            return self.list[:]
         return [self.list[0], self.goodValue(), self.list[len(self.list) - 1]]
 
 
     def failureValues(self):
         try:
-            self.list.sort()
-            return [self.list[0] - 1, self.list[len(self.list) - 1] + 1]
+            sorted_list = sorted(self.list)
+            return [sorted_list[0] - 1, sorted_list[len(sorted_list) - 1] + 1]
         except:
             return []
 
+    def drawSuccess(self, rnd):
+        return rnd.choice(self.list)
+
+    def drawFailure(self, rnd):
+        lowest, highest = InList.failureValues(self)
+        if rnd.randint(0, 1):
+            return lowest - _drawSteps(rnd)
+        return highest + _drawSteps(rnd)
+
+    def shrink(self, value, success):
+        if success:
+            return self.list[:1] if value != self.list[0] else []
+        lowest, highest = InList.failureValues(self)
+        return _shrinkTowards(lowest if value <= lowest else highest, value, 1)
+
 
 class NotInList(InList):
     '''
@@ -288,6 +626,15 @@ class NotInList(InList):
     def failureValues(self):
         return InList.successValues(self)
 
+    def drawSuccess(self, rnd):
+        return InList.drawFailure(self, rnd)
+
+    def drawFailure(self, rnd):
+        return InList.drawSuccess(self, rnd)
+
+    def shrink(self, value, success):
+        return InList.shrink(self, value, not success)
+
 
 class Blank(ValidationTest):
     '''
@@ -341,9 +688,9 @@ class RegExpr(ValidationTest):
     Properties:
     regexpr = regular expression
     
-    Make the following tests: 
-    - Cases of success: []
-    - Cases of failure: None, '', ' '
+    Make the following tests (the strings are synthesized from the parsed regular expression and verified): 
+    - Cases of success: strings that match the regular expression (re.match)
+    - Cases of failure: strings that don't match the regular expression in any position (re.search)
     '''
 
     def __init__(self, regexpr):
@@ -353,121 +700,687 @@ class RegExpr(ValidationTest):
         '''
         You can overwrite/rewrite this method if these values are not good
         '''
-        return 'a'
+        return self.successValues()[0]
 
     def successValues(self):
         '''
         You can overwrite/rewrite this method if these values are not good
         '''
-        self.regexpr[:].replace("+", "")
-        lastchar = self.regexpr[len(self.regexpr) - 1]
-        newchar = chr(ord(lastchar) + 1)
-        return [self.regexpr, 2 * self.regexpr, self.regexpr + newchar]
+        return regexes.matchingValues(self.regexpr)
 
     def failureValues(self):
-        newchar = chr(ord(self.regexpr[0]) + 1)
-        newstr = newchar + self.regexpr[1:]
-        return [newstr, 2 * newstr]
+        return regexes.nonMatchingValues(self.regexpr)
 
+    def drawSuccess(self, rnd):
+        value = regexes.generate(self.regexpr, rnd, regexes.MAX_EXTRA_REPEAT)
+        if regexes.compilePattern(self.regexpr).match(value):
+            return value
+        return ValidationTest.drawSuccess(self, rnd)
 
-def verifySuccess(resultCollectParameter, method, *args):
+
+@instrumentation.instrumented('validation')
+def executeCase(case):
+    '''
+    case = (method, args)
+    Return None if the method was executed without raise an exception, otherwise the message of the exception.
+    '''
+    method, args = case
     try:
-        executeMethod(method, *args)
+        result = executeMethod(method, *args)
     except Exception as e:
-        resultCollectParameter.addUnexpectedFailure(str(e), args)
+        return str(e)
+    if coroutines.isAwaitable(result): # 'asyncio' executor
+        return coroutines.Deferred(result, _errorMessage)
+    return None
 
 
-def verifyFailure(resultCollectParameter, method, *args):
-    try:
-        executeMethod(method, *args)
+def _errorMessage(error):
+    return None if error is None else str(error)
+
+
+def collectCase(resultCollectParameter, expectSuccess, args, error):
+    if expectSuccess and error is not None:
+        resultCollectParameter.addUnexpectedFailure(error, args)
+    elif not expectSuccess and error is None:
         resultCollectParameter.addUnexpectedSuccess(args)
-    except Exception as e: # TODO Exception base exceptionClass=Exception, identificar erro de falha normal
-        pass
-#        print(str(e))
+
+
+def verifySuccess(resultCollectParameter, method, *args):
+    collectCase(resultCollectParameter, True, args, executeCase((method, args)))
+
+
+def verifyFailure(resultCollectParameter, method, *args):
+    collectCase(resultCollectParameter, False, args, executeCase((method, args)))
 
 
 def getGoodValues(args):
     goodValues = []
     for arg in args:
         if isinstance(arg, ValidationTest):
-            goodValues.append(arg.goodValue())
+            goodValues.append(arg.values()[0])
         else:
             goodValues.append(arg)
     return goodValues
 
 
-def assertValidation(method, *args):
+def getDomains(args):
+    domains = []
+    for index, arg in enumerate(args):
+        if isinstance(arg, ValidationTest):
+            goodValue, successValues, failureValues = arg.values()
+            domains.append((index, successValues, failureValues))
+    return domains
+
+
+def executeVectorizedCase(method, values, vectorized, vectorize, column=None):
+    '''
+    Call the method with vectors in the `vectorized` positions. column = (index, list of values) of the argument that
+    is tested, the other vectorized arguments receive vectors with their good value repeated.
+    The method must return one outcome per element: a true value if the element is valid, a false value or an
+    exception instance if it is not. If the method raises an exception, all the elements are invalid.
+    Return a list with the error message of each element (None if the element is valid).
+    '''
+    size = len(column[1]) if column else 1
+    args = []
+    for index, value in enumerate(values):
+        if column and index == column[0]:
+            value = vectorize(list(column[1]))
+        elif index in vectorized:
+            value = vectorize([value] * size)
+        args.append(value)
+    try:
+        outcomes = list(executeMethod(method, *args))
+    except Exception as e:
+        return [str(e)] * size
+    if len(outcomes) != size:
+        raise Exception('The vectorized method must return one outcome per element: expected %s, received %s.' % (size, len(outcomes)))
+    errors = []
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            errors.append(str(outcome))
+        elif outcome:
+            errors.append(None)
+        else:
+            errors.append('invalid element')
+    return errors
+
+
+def _collectVectorized(result, method, args, goodValues, vectorized, vectorize, maxfailures=None):
+    '''
+    The success values and the failure values of a vectorized argument are submitted in one call each. The other
+    arguments are tested one at a time.
+    Return True if it stopped after `maxfailures` unexpected results.
+    '''
+    for index, arg in enumerate(args):
+        if not isinstance(arg, ValidationTest):
+            continue
+        goodValue, successValues, failureValues = arg.values()
+        for expectSuccess, testValues in ((True, successValues), (False, failureValues)):
+            testValues = tuple(testValues)
+            if index in vectorized:
+                calls = [(testValues, (index, testValues))] if testValues else []
+            else:
+                calls = (((v,), None) for v in testValues)
+            for callValues, column in calls:
+                values = list(goodValues)
+                if column is None:
+                    values[index] = callValues[0]
+                with instrumentation.span('executeCase', 'validation', size=len(callValues)):
+                    errors = executeVectorizedCase(method, values, vectorized, vectorize, column)
+                for v, error in zip(callValues, errors):
+                    values[index] = v
+                    collectCase(result, expectSuccess, tuple(values), error)
+                    if maxfailures is not None and result.countFailures() >= maxfailures:
+                        return True
+    return False
+
+
+def _raiseReport(result, aborted):
+    if aborted or result.hasFailure():
+        with instrumentation.span('report', 'validation'):
+            report = str(result)
+        if aborted:
+            raise failureException('%s\nAborted after %s unexpected results.' % (report, result.countFailures()))
+        raise failureException(report)
+
+
+@instrumentation.instrumented('assertion')
+def assertValidation(method, *args, **kwargs):
     '''
     Assert validation of Min, Max, Range, InList, Blank, NonBlank and others constraints. 
+
+    Optional keyword arguments:
+    executor = default 'serial', 'thread', 'process', 'asyncio' or an executor instance (qassertions.executors)
+    workers = default None (number of CPUs), the number of workers of the 'thread' and 'process' executors, or the
+    maximum number of coroutines running at the same time with the 'asyncio' executor (default None, no limit)
+    strategy = default 'oneatatime', 'allpairs', 'product' or a strategy instance (qassertions.strategies)
+    sink = default None, a callable, a file or a logger that receives the unexpected results as soon as they happen
+    maxrecords = default None (no limit), maximum number of unexpected results of each kind kept in the report
+    failfast = default False, stop at the first unexpected success or failure
+    maxfailures = default None (no limit), stop after this number of unexpected successes and failures
+    vectorized = default None, positions of the arguments that the method receives as vectors (element-wise
+    validation). The method must return one outcome per element (see executeVectorizedCase). The success values and
+    the failure values of these arguments are submitted in one call each, in the current thread: executor, workers and
+    strategy can't be used with vectorized (TypeError).
+    vectorize = default numpy.asarray (list if numpy is not installed), function that creates the vectors from lists
+
+    The 'thread' and 'process' executors run the cases concurrently, but the result is always reported in the same order.
+    When the assertion stops earlier, the cases that were not executed yet are cancelled.
     '''
-    result = ValidationTestResult()
+    vectorized = kwargs.pop('vectorized', None)
+    if vectorized:
+        for name in ('executor', 'workers', 'strategy'):
+            if kwargs.get(name) is not None:
+                raise TypeError("assertValidation() got the keyword argument '%s', that can't be used with vectorized" % name)
+    executor = executors.getExecutor(kwargs.pop('executor', None), kwargs.pop('workers', None))
+    strategy = strategies.getStrategy(kwargs.pop('strategy', None))
+    maxfailures = kwargs.pop('maxfailures', None)
+    if kwargs.pop('failfast', False):
+        maxfailures = 1
+    if maxfailures is not None and maxfailures < 1:
+        raise Exception('maxfailures must be greater than 0.')
+    result = ValidationTestResult(sink=kwargs.pop('sink', None), maxRecords=kwargs.pop('maxrecords', None))
+    vectorize = kwargs.pop('vectorize', None) or (numpy.asarray if numpy is not None else list)
+    if kwargs:
+        raise TypeError("assertValidation() got an unexpected keyword argument '%s'" % list(kwargs.keys())[0])
     goodValues = getGoodValues(args)
+    if vectorized:
+        vectorized = frozenset(vectorized)
+        with instrumentation.span('executeCase', 'validation', size=1):
+            error = executeVectorizedCase(method, goodValues, vectorized, vectorize)[0]
+        collectCase(result, True, tuple(goodValues), error)
+        if result.hasFailure():
+            raise failureException('This method appears to have at least a big validation error, try to fix it:\n%s' % str(result))
+        _raiseReport(result, _collectVectorized(result, method, args, goodValues, vectorized, vectorize, maxfailures))
+        return
     verifySuccess(result, method, *tuple(goodValues))
     if result.hasFailure():
         raise failureException('This method appears to have at least a big validation error, try to fix it:\n%s' % str(result))
 
-    for index, arg in enumerate(args):
-        if isinstance(arg, ValidationTest):
-            values = goodValues[:]
-            for v in arg.successValues():
-                values[index] = v
-                verifySuccess(result, method, *tuple(values))
-            for v in arg.failureValues():
-                values[index] = v
-                verifyFailure(result, method, *tuple(values))
+    # The cases are generated lazily (sweeps can have millions of values): the executor consumes them as it runs them
+    # and returns the errors in the same order, so only a bounded window of cases is kept in memory (one case in the
+    # serial executor, executors.WINDOW_PER_WORKER per worker in the pools, coroutines.WINDOW in asyncio)
+    pending = collections.deque()
+    def jobs():
+        cases = strategy.generateCases(goodValues, getDomains(args))
+        for case in instrumentation.traceIterator(cases, 'generateCase', 'validation'):
+            pending.append(case)
+            yield method, case[1]
+    aborted = False
+    try:
+        for error in executor.imap(executeCase, jobs()):
+            expectSuccess, values = pending.popleft()
+            collectCase(result, expectSuccess, values, error)
+            if maxfailures is not None and result.countFailures() >= maxfailures:
+                aborted = True
+                break
+    finally:
+        executor.shutdown()
+    _raiseReport(result, aborted)
 
+
+def randomCases(args, goodValues, rnd, cases):
+    '''
+    Generator of (expectSuccess, values, index) with a random value of one ValidationTest argument (at `index`) at a
+    time, the others receive their good values.
+    '''
+    indexes = [index for index, arg in enumerate(args) if isinstance(arg, ValidationTest)]
+    if not indexes:
+        return
+    hasFailures = dict((index, any(True for v in args[index].values()[2])) for index in indexes)
+    for i in compat.xrange(cases):
+        index = indexes[i % len(indexes)]
+        expectSuccess = not hasFailures[index] or rnd.random() < 0.5
+        values = list(goodValues)
+        values[index] = args[index].drawSuccess(rnd) if expectSuccess else args[index].drawFailure(rnd)
+        yield expectSuccess, tuple(values), index
+
+
+def shrinkCase(method, args, expectSuccess, values, index, error, deadline=None):
+    '''
+    Replace the value at `index` by the first simpler value that still has an unexpected result, until there is no one
+    (or the deadline expires). Return (values, error, number of shrinks).
+    '''
+    shrinks = 0
+    improved = True
+    while improved and (deadline is None or timing.clock() < deadline):
+        improved = False
+        for candidate in args[index].shrink(values[index], expectSuccess):
+            candidateValues = values[:index] + (candidate,) + values[index + 1:]
+            candidateError = executeCase((method, candidateValues))
+            if (candidateError is None) != expectSuccess:
+                values, error, shrinks, improved = candidateValues, candidateError, shrinks + 1, True
+                break
+    return values, error, shrinks
+
+
+@instrumentation.instrumented('assertion')
+def assertRandomValidation(method, *args, **kwargs):
+    '''
+    Property based version of assertValidation: the ValidationTest arguments draw random values of their success and
+    failure domains, one argument at a time. The first unexpected success or failure is shrunk to the simplest value
+    that is still unexpected and it is reported with the seed, so it is possible to reproduce it.
+
+    Optional keyword arguments:
+    cases = default 1000, maximum number of random cases
+    timeout = default None (no limit), seconds (or calibration.Reference) to run the cases. When it expires, the
+    assertion finishes with the cases that were executed.
+    seed = default 0, seed of the random values
+    shrink = default True, shrink the unexpected case
+    executor = default 'serial', 'thread', 'process', 'asyncio' or an executor instance (qassertions.executors)
+    workers = default None (number of CPUs), the number of workers of the executor
+    '''
+    executor = executors.getExecutor(kwargs.pop('executor', None), kwargs.pop('workers', None))
+    cases = kwargs.pop('cases', 1000)
+    timeout = calibration.toSeconds(kwargs.pop('timeout', None))
+    seed = kwargs.pop('seed', 0)
+    shrink = kwargs.pop('shrink', True)
+    if kwargs:
+        raise TypeError("assertRandomValidation() got an unexpected keyword argument '%s'" % list(kwargs.keys())[0])
+    deadline = timing.clock() + timeout if timeout is not None else None
+    result = ValidationTestResult()
+    goodValues = getGoodValues(args)
+    verifySuccess(result, method, *tuple(goodValues))
     if result.hasFailure():
-        raise failureException(str(result))
+        raise failureException('This method appears to have at least a big validation error, try to fix it:\n%s' % str(result))
+
+    pending = collections.deque()
+    def jobs():
+        generated = randomCases(args, goodValues, random.Random(seed), cases)
+        for case in instrumentation.traceIterator(generated, 'generateCase', 'validation'):
+            pending.append(case)
+            yield method, case[1]
+    executed = 0
+    unexpected = None
+    try:
+        for error in executor.imap(executeCase, jobs()):
+            expectSuccess, values, index = pending.popleft()
+            executed += 1
+            if (error is None) != expectSuccess:
+                unexpected = (expectSuccess, values, index, error)
+                break
+            if deadline is not None and timing.clock() > deadline:
+                break
+    finally:
+        executor.shutdown()
+
+    if unexpected is not None:
+        expectSuccess, values, index, error = unexpected
+        shrinks = 0
+        if shrink:
+            values, error, shrinks = shrinkCase(method, args, expectSuccess, values, index, error, deadline)
+        collectCase(result, expectSuccess, values, error)
+        raise failureException('%s\nFalsified after %s random cases (seed %s), shrunk %s times.' % (str(result), executed, seed, shrinks))
 
 # List
 
-def _listIsSorted(a_list, a_cmp=None, key=None, reverse=False):
-    clone = a_list[:]
-    clone.sort(cmp=a_cmp, key=key, reverse=reverse)
-    return clone == a_list
+NUMPY_CHUNK_SIZE = 1 << 20
+
+
+def _asNumericArray(a_list):
+    '''
+    Return a 1-D numeric numpy array that shares the memory of a_list (numpy array, array.array or memoryview), or
+    None if it is not possible.
+    '''
+    if numpy is None:
+        return None
+    try:
+        if isinstance(a_list, numpy.ndarray):
+            values = a_list
+        elif isinstance(a_list, array.array):
+            if len(a_list) == 0 or a_list.typecode in ('c', 'u'):
+                return None
+            values = numpy.frombuffer(a_list, dtype=a_list.typecode)
+        elif isinstance(a_list, memoryview):
+            values = numpy.asarray(a_list)
+        else:
+            return None
+    except (TypeError, ValueError):
+        return None
+    if values.ndim != 1 or values.dtype.kind not in 'biuf':
+        return None
+    return values
+
+
+def _firstUnsortedNumeric(values, reverse=False, strict=False):
+    '''
+    Vectorized version of _firstUnsortedElement for numeric arrays. The array is compared in chunks, so the temporary
+    boolean arrays are small even for huge arrays.
+    '''
+    for start in range(0, max(len(values) - 1, 0), NUMPY_CHUNK_SIZE):
+        previous = values[start:start + NUMPY_CHUNK_SIZE]
+        current = values[start + 1:start + 1 + NUMPY_CHUNK_SIZE]
+        previous = previous[:len(current)]
+        if reverse:
+            outOfOrder = (previous <= current) if strict else (previous < current)
+        else:
+            outOfOrder = (current <= previous) if strict else (current < previous)
+        if outOfOrder.any():
+            index = start + 1 + int(outOfOrder.argmax())
+            return index, values[index - 1].item(), values[index].item()
+    return None
+
 
+def _memoryviewElements(view):
+    '''
+    Elements of the memoryview one by one, without the copy of tolist(). In Python 2 an item is a bytes string, it is unpacked.
+    '''
+    if view.ndim > 1: # memoryview doesn't implement the sub-views of the rows
+        return iter(view.tolist())
+    if compat.PY3:
+        return iter(view)
+    return (struct.unpack(view.format, view[index])[0] for index in compat.xrange(len(view)))
 
-def assertListIsSorted(a_list, a_cmp=None, key=None, reverse=False):
-    sorted_list = sorted(a_list, cmp=a_cmp, key=key, reverse=reverse)
-    if(a_list != sorted_list):
-        raise failureException("List is not sorted. Expected list: %s" % sorted_list)
+
+def _firstUnsortedElement(iterable, a_cmp=None, key=None, reverse=False, strict=False):
+    '''
+    Return (index, previous element, element) of the first element that is out of order, or None if it is sorted.
+    It is the same order of sorted(iterable, cmp=a_cmp, key=key, reverse=reverse), but it makes just one pass in the
+    iterable (lists, generators etc) with O(1) of memory. strict = equal elements are out of order.
+    Numeric numpy arrays, array.array and memoryview are compared with numpy (if it is installed).
+    '''
+    if a_cmp is None and key is None:
+        values = _asNumericArray(iterable)
+        if values is not None:
+            return _firstUnsortedNumeric(values, reverse=reverse, strict=strict)
+    iterator = _memoryviewElements(iterable) if isinstance(iterable, memoryview) else iter(iterable)
+    try:
+        previous = next(iterator)
+    except StopIteration:
+        return None
+    previousKey = key(previous) if key else previous
+    for index, element in enumerate(iterator, 1):
+        elementKey = key(element) if key else element
+        if a_cmp:
+            result = a_cmp(previousKey, elementKey)
+            if reverse:
+                result = -result
+            outOfOrder = result >= 0 if strict else result > 0
+        elif reverse:
+            outOfOrder = not elementKey < previousKey if strict else previousKey < elementKey
+        else:
+            outOfOrder = not previousKey < elementKey if strict else elementKey < previousKey
+        if outOfOrder:
+            return index, previous, element
+        previous, previousKey = element, elementKey
+    return None
 
 
-def assertListIsNotSorted(a_list, a_cmp=None, key=None, reverse=False):
-    sorted_list = sorted(a_list, cmp=a_cmp, key=key, reverse=reverse)
-    if(a_list == sorted_list):
-        raise failureException("List is sorted (%s)." % sorted_list)
+def _listIsSorted(a_list, a_cmp=None, key=None, reverse=False, strict=False):
+    return _firstUnsortedElement(a_list, a_cmp=a_cmp, key=key, reverse=reverse, strict=strict) is None
+
+
+@instrumentation.instrumented('assertion')
+def assertListIsSorted(a_list, a_cmp=None, key=None, reverse=False, strict=False):
+    '''
+    a_list can be any iterable (list, generator etc). It is verified in just one pass.
+    strict = default False, if True equal elements are not accepted (strictly increasing or decreasing).
+    Numeric numpy arrays, array.array and memoryview are verified with vectorized operations if numpy is installed.
+    '''
+    unsorted = _firstUnsortedElement(a_list, a_cmp=a_cmp, key=key, reverse=reverse, strict=strict)
+    if unsorted is not None:
+        index, previous, element = unsorted
+        raise failureException("List is not sorted. Element at index %s (%r) is out of order after %r." % (index, element, previous))
+
+
+@instrumentation.instrumented('assertion')
+def assertListIsNotSorted(a_list, a_cmp=None, key=None, reverse=False, strict=False):
+    '''
+    a_list can be any iterable (list, generator etc). It is verified in just one pass.
+    strict = default False, if True equal elements are not accepted (strictly increasing or decreasing).
+    '''
+    if _listIsSorted(a_list, a_cmp=a_cmp, key=key, reverse=reverse, strict=strict):
+        raise failureException("List is sorted.")
 
 
 # Performance
 
-def assertPerformance(timeout, method, *args):
+@instrumentation.instrumented('assertion')
+def assertPerformance(timeout, method, *args, **kwargs):
     '''
-    timeout in milliseconds
+    timeout in seconds, or calibration.Reference(units) to scale the timeout to the speed of the machine
+
+    Optional keyword arguments:
+    backend = default 'trace', how the method is killed when the timeout expires:
+    'trace' (threading2.KThread) traces every executed line, so it makes the method slower;
+    'async' (threading2.AsyncKThread) raises an asynchronous exception in the thread and doesn't slow the method;
+    'process' (threading2.KProcess) runs the method isolated in a child process, killed when the timeout expires.
+    The 'trace' and 'async' backends reuse the workers of a bounded pool (threading2.getWorkerPool), a killed worker is
+    replaced by a new one.
+
+    profile = default None, 'cprofile' or 'sample' (qassertions.profiling): when the method is too slow, it is executed
+    again under the profiler, for at most the timeout, and its hottest functions are added to the failure message. The
+    profile always runs in a thread of the current process, also with the 'process' backend
+    profiletop = default 10, number of functions in the failure message
+    profilepath = default None (the file is not written), the file where the profile is written (.pstats for
+    'cprofile', collapsed stacks for 'sample', used by the flame graph tools). True means a new temporary file, its path
+    is in the failure message and the caller must remove it.
+
+    Return a TimingResult with the duration (measured inside the worker or the child process) and, for the 'process'
+    backend, the peak memory of the child process.
+    Coroutine functions run in an event loop, that cancels the coroutine when the timeout expires (no backend is used
+    and they are not profiled).
     
     Use this assertion in a specialized suite of performance tests.
     Don't use this assertion inside of a unit test suite, unless the method is too fast.
-    This method don't take care the speed of the CPU, so try to set a big timeout, considering a bad hardware to avoid
-    intermitent tests.
-    TODO: Use PSI (http://www.psychofx.com/psi) to get the CPU speed to be possible to make more precise tests.
+    A timeout in seconds doesn't take care the speed of the CPU, so try to set a big timeout, considering a bad hardware
+    to avoid intermitent tests, or use a calibration.Reference timeout.
     '''
-    startTime = time.clock()
+    backend = kwargs.pop('backend', None)
+    threadClass = threading2.getKThreadClass(backend)
+    profiler = kwargs.pop('profile', None)
+    if profiler is not None:
+        profiling.checkProfiler(profiler)
+    profileTop = kwargs.pop('profiletop', profiling.TOP)
+    profilePath = kwargs.pop('profilepath', None)
+    if kwargs:
+        raise TypeError("assertPerformance() got an unexpected keyword argument '%s'" % list(kwargs.keys())[0])
+    timeout = calibration.toSeconds(timeout)
+    if coroutines.isCoroutineFunction(method):
+        return _assertCoroutinePerformance(timeout, method, *args)
+    startTime = timing.clock()
     thread = None
     try:
-        thread = threading2.KThread(target=method,
-                                    args=args,
-                                    name='Thread-AssertPerformance-' + str(method))
-        thread.start()
-        thread.joinWithTimeout(timeout)
+        if threadClass is threading2.KProcess:
+            thread = threadClass(target=method,
+                                 args=args,
+                                 name='Process-AssertPerformance-' + str(method))
+            thread.start()
+            thread.joinWithTimeout(timeout)
+        else:
+            # The threads are reused, the duration is measured in the worker without the startup of the thread
+            thread = threading2.getWorkerPool(backend).run(timeout, method, args)
         if thread.isExpired():
-            endTime = time.clock()
-            durationTime = endTime - startTime
-            raise failureException("This method is too slow: %s" % str(durationTime))
+            # The time until the timeout expired, without the kill of the worker
+            durationTime = getattr(thread, 'elapsed', None) or timing.clock() - startTime
+            message = "This method is too slow: %s" % str(durationTime)
+            if getattr(thread, 'abandoned', False):
+                message += '\nThe method is still running (blocked in a C call): it was abandoned'
+            if profiler is not None:
+                # A failure of the profile never hides that the method is too slow
+                try:
+                    result = profiling.profile(profiler, method, args, timeout, profilePath)
+                    message += '\n%s' % result.report(profileTop)
+                except Exception as e:
+                    message += '\nThe profile failed: %s: %s' % (e.__class__.__name__, str(e))
+            raise failureException(message)
     except failureException as e:
         raise e
     except Exception as e:
-        raise failureException("This method is bugged, It impossible to measure the performance: %s" % str(e))
+        raise failureException("This method is bugged, It impossible to measure the performance: %s" % threading2.errorMessage(e))
     finally:
-        endTime = time.clock()
+        endTime = timing.clock()
         durationTime = endTime - startTime
+    if getattr(thread, 'duration', None) is not None:
+        durationTime = thread.duration
+    return timing.TimingResult([durationTime], peakMemory=getattr(thread, 'peakMemory', None))
+
+
+def _assertCoroutinePerformance(timeout, method, *args):
+    '''
+    The coroutine is cancelled by the event loop when the timeout expires, without threads.
+    '''
+    startTime = timing.clock()
+    try:
+        coroutines.run(method(*args), timeout)
+    except coroutines.asyncio.TimeoutError:
+        raise failureException("This method is too slow: %s" % str(timing.clock() - startTime))
+    except Exception as e:
+        raise failureException("This method is bugged, It impossible to measure the performance: %s" % str(e))
+    return timing.TimingResult([timing.clock() - startTime])
+
 
+def benchmark(method, *args, **kwargs):
+    '''
+    Execute the method `warmup` times (default 1) without measure it, then measure `repeat` executions (default 10).
+    Return a TimingResult with the durations in seconds.
+    '''
+    warmup = kwargs.pop('warmup', 1)
+    repeat = kwargs.pop('repeat', 10)
+    if kwargs:
+        raise TypeError("benchmark() got an unexpected keyword argument '%s'" % list(kwargs.keys())[0])
+    if repeat < 1: raise Exception('repeat must be greater than 0.')
+    result = timing.TimingResult(warmup=warmup)
+    try:
+        for i in range(warmup):
+            executeMethod(method, *args)
+        for i in range(repeat):
+            startTime = timing.clock()
+            executeMethod(method, *args)
+            result.add(timing.clock() - startTime)
+    except Exception as e:
+        raise failureException("This method is bugged, It impossible to measure the performance: %s" % str(e))
+    return result
+
+
+@instrumentation.instrumented('assertion')
+def assertBenchmark(timeout, method, *args, **kwargs):
+    '''
+    timeout in seconds, or calibration.Reference(units) to scale the timeout to the speed of the machine
+
+    Statistical version of assertPerformance: it is not affected by a single slow execution (GC, scheduler etc).
+    Optional keyword arguments:
+    warmup = default 1, executions that are not measured
+    repeat = default 10, measured executions
+    statistic = default 'median', the statistic compared to the timeout: min, max, mean, median, mean+stddev or
+    p<N> (p95, p99 etc)
+
+    Return the TimingResult.
+    '''
+    statistic = kwargs.pop('statistic', 'median')
+    timeout = calibration.toSeconds(timeout)
+    result = benchmark(method, *args, **kwargs)
+    value = result.statistic(statistic)
+    if value > timeout:
+        raise failureException("This method is too slow: %s of %s > %s (%s)" % (statistic, value, timeout, str(result)))
+    return result
+
+
+@instrumentation.instrumented('assertion')
+def assertBaseline(testId, method, *args, **kwargs):
+    '''
+    Assert that the method is not slower than its baseline: the timing of the same test in the same machine, stored in
+    a previous execution (qassertions.baselines). The first execution of a test records its baseline.
+
+    Optional keyword arguments:
+    tolerance = default 0.15, the method can be up to 15% slower than the baseline
+    mode = default None (environment variable QASSERTIONS_BASELINES or 'compare'), 'compare', 'record' or 'update'
+    store = default None (baselines.BaselineStore(), ~/.qassertions-baselines.json), a BaselineStore or the path of the
+    JSON file
+    statistic, warmup and repeat = the same of assertBenchmark
+
+    Return the TimingResult.
+    '''
+    tolerance = kwargs.pop('tolerance', baselines.TOLERANCE)
+    mode = baselines.getMode(kwargs.pop('mode', None))
+    store = kwargs.pop('store', None)
+    if not isinstance(store, baselines.BaselineStore):
+        store = baselines.BaselineStore(store)
+    statistic = kwargs.pop('statistic', 'median')
+    result = benchmark(method, *args, **kwargs)
+    value = result.statistic(statistic)
+    entry, message = store.submit(testId, value, statistic, mode, tolerance)
+    if message is not None:
+        raise failureException(message)
+    return result
+
+
+@instrumentation.instrumented('assertion')
+def assertThroughput(method, *args, **kwargs):
+    '''
+    Assert the throughput (calls per second) and the tail latency of the method called by concurrent threads,
+    processes or asyncio tasks.
+
+    Optional keyword arguments:
+    executor = default 'thread', 'process' (the method must be CPU bound, without GIL) or 'asyncio' (coroutine
+    functions)
+    concurrency = default 4, number of concurrent threads, processes or asyncio tasks
+    calls = default None, total number of calls (1000 if there is no duration)
+    duration = default None, seconds (or calibration.Reference) of load
+    minops = default None (no limit), minimum of calls per second
+    maxlatency = default None (no limit), maximum latency of a call in seconds (or calibration.Reference)
+    statistic = default 'p99', the statistic of the latencies compared to maxlatency
+
+    Return the timing.ThroughputResult, with the latency histogram.
+    '''
+    executor = kwargs.pop('executor', 'thread')
+    concurrency = kwargs.pop('concurrency', 4)
+    calls = kwargs.pop('calls', None)
+    duration = calibration.toSeconds(kwargs.pop('duration', None))
+    minops = kwargs.pop('minops', None)
+    maxlatency = calibration.toSeconds(kwargs.pop('maxlatency', None))
+    statistic = kwargs.pop('statistic', 'p99')
+    if kwargs:
+        raise TypeError("assertThroughput() got an unexpected keyword argument '%s'" % list(kwargs.keys())[0])
+    if calls is None and duration is None:
+        calls = 1000
+    result, errors = load.generateLoad(method, args, executor, concurrency, calls, duration)
+    if errors:
+        raise failureException("This method is bugged, It impossible to measure the throughput: %s (%s of %s calls)" %
+                               (errors[0], len(errors), result.calls()))
+    if minops is not None and result.opsPerSecond() < minops:
+        raise failureException("The throughput is too low: %.1f ops/sec < %s ops/sec\n%s" % (result.opsPerSecond(), minops, result))
+    if maxlatency is not None and len(result.latencies) and result.latencies.statistic(statistic) > maxlatency:
+        raise failureException("The latency is too high: %s of %.6fs > %s\n%s" %
+                               (statistic, result.latencies.statistic(statistic), maxlatency, result))
+    return result
+
+
+@instrumentation.instrumented('assertion')
+def assertComplexity(bound, method, sizes, **kwargs):
+    '''
+    Assert that the timings of method(input), for a series of input sizes, don't grow faster than the complexity bound.
+    bound = 'O(1)', 'O(log n)', 'O(n)', 'O(n log n)' or 'O(n^2)'
+    sizes = increasing input sizes (at least 3), like [1000, 2000, 4000, 8000, 16000]. Inputs bigger than the caches of
+    the CPU make a linear method look like O(n log n).
+
+    Optional keyword arguments:
+    setup = default None, function that creates the input of the method from a size (it is not measured). By default
+    the input is the size itself.
+    repeat = default 5, samples of each size, the fastest one is used. A sample calls the method as many times as
+    needed to last at least complexity.MIN_SAMPLE_SECONDS, so the method must not change its input.
+    warmup = default 1, executions of each size that are not measured
+    clock = default 'wall', the elapsed time of the samples (it includes the time waiting for I/O, locks etc), or 'cpu',
+    the CPU time of the thread (less noisy on a busy machine, but the time waiting is not measured)
+
+    A more complex class is chosen only if it fits the timings significantly better (complexity.isSignificant), so
+    O(n) and O(n log n) are usually reported as O(n).
+
+    Return the complexity.ComplexityResult.
+    '''
+    setup = kwargs.pop('setup', None)
+    repeat = kwargs.pop('repeat', 5)
+    warmup = kwargs.pop('warmup', 1)
+    clock = kwargs.pop('clock', 'wall')
+    if kwargs:
+        raise TypeError("assertComplexity() got an unexpected keyword argument '%s'" % list(kwargs.keys())[0])
+    boundIndex = complexity.getComplexity(bound)
+    complexity.getClock(clock)
+    try:
+        timings = complexity.measureScaling(method, sizes, setup=setup, repeat=repeat, warmup=warmup, clock=clock)
+    except Exception as e:
+        raise failureException("This method is bugged, It impossible to measure the performance: %s" % str(e))
+    result = complexity.fitComplexity(sizes, timings)
+    if result.best > boundIndex:
+        raise failureException("This method is slower than %s: %s\n%s" % (bound, result.complexity(), result.report()))
+    return result
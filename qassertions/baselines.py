@@ -0,0 +1,196 @@
+'''
+Store of performance baselines used by assertBaseline. The timings are saved in a JSON file, by machine (fingerprint of
+the hardware and of the Python interpreter) and by test id, so the performance of a method is compared to the
+performance of the same method in the same machine, instead of to an absolute timeout.
+
+Modes (environment variable QASSERTIONS_BASELINES or the `mode` argument of assertBaseline):
+compare = default, compare the timing to the baseline (the first timing of a test becomes its baseline)
+record = only append the timing to the history of the test, without compare it
+update = the timing becomes the new baseline of the test
+
+The default file is ~/.qassertions-baselines.json (the baselines are by machine), the environment variable
+QASSERTIONS_BASELINES_FILE or the `store` argument of assertBaseline choose another one (a file in the repository of
+the project to share the baselines of the CI machines, for example).
+The updates are serialized by a lock file (FILE.lock, where fcntl is available) and the file is replaced atomically, so
+parallel test processes don't lose each other's timings.
+
+Command line (VALUE in seconds, exit code 1 if the comparison fails):
+python -m qassertions.baselines [--file FILE] list
+python -m qassertions.baselines [--file FILE] delete TEST_ID
+python -m qassertions.baselines [--file FILE] compare|record|update TEST_ID VALUE [--statistic S] [--tolerance T]
+'''
+
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+
+
+DEFAULT_FILE = os.path.join('~', '.qassertions-baselines.json')
+MODES = ('compare', 'record', 'update')
+HISTORY_SIZE = 50
+TOLERANCE = 0.15
+
+
+def machineDescription():
+    return '%s %s %s, %s CPUs, %s %s' % (platform.system(), platform.machine(), platform.processor(),
+                                         multiprocessing.cpu_count(), platform.python_implementation(),
+                                         platform.python_version())
+
+
+def machineFingerprint():
+    return hashlib.sha1(machineDescription().encode('utf-8')).hexdigest()[:16]
+
+
+def getMode(mode=None):
+    if mode is None:
+        mode = os.environ.get('QASSERTIONS_BASELINES', 'compare')
+    if mode not in MODES:
+        raise Exception("Invalid baseline mode '%s', use one of: %s" % (mode, ', '.join(MODES)))
+    return mode
+
+
+def compare(entry, value, statistic, tolerance=TOLERANCE):
+    '''
+    Return the failure message if the value is more than `tolerance` slower than the baseline of the entry, otherwise
+    None (also when there is no baseline of the statistic).
+    '''
+    if entry is None or entry['statistic'] != statistic:
+        return None
+    limit = entry['baseline'] * (1 + tolerance)
+    if value <= limit:
+        return None
+    slower = (value / entry['baseline'] - 1) * 100 if entry['baseline'] > 0 else float('inf')
+    return "This method is %.1f%% slower than the baseline: %s of %s > %s (baseline %s + %s%%)" % \
+        (slower, statistic, value, limit, entry['baseline'], tolerance * 100)
+
+
+class BaselineStore(object):
+    '''
+    Properties:
+    path = default ~/.qassertions-baselines.json (or the environment variable QASSERTIONS_BASELINES_FILE)
+    fingerprint = default machineFingerprint()
+    '''
+
+    def __init__(self, path=None, fingerprint=None):
+        self.path = os.path.abspath(os.path.expanduser(path or os.environ.get('QASSERTIONS_BASELINES_FILE', DEFAULT_FILE)))
+        self.fingerprint = fingerprint or machineFingerprint()
+
+    @contextlib.contextmanager
+    def locked(self):
+        '''
+        Exclusive lock of the store between processes, for the updates (load, change and save).
+        '''
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + '.lock', 'a') as lockFile:
+            fcntl.flock(lockFile.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lockFile.fileno(), fcntl.LOCK_UN)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {'machines': {}}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def save(self, data):
+        # Write to a temporary file and rename it, so a reader never sees a half written file
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.rename(temporary, self.path)
+
+    def tests(self, data=None):
+        data = data or self.load()
+        machine = data['machines'].setdefault(self.fingerprint, {'description': machineDescription(), 'tests': {}})
+        return machine['tests']
+
+    def get(self, testId):
+        '''
+        Return the stored entry of the test ({'baseline', 'statistic', 'history'}) or None.
+        '''
+        return self.tests().get(testId)
+
+    def record(self, testId, value, statistic, update=False):
+        '''
+        Append the value to the history of the test. The value becomes the baseline if update is True or if the test
+        has no baseline yet. Return the entry of the test.
+        '''
+        return self.submit(testId, value, statistic, 'update' if update else 'record')[0]
+
+    def submit(self, testId, value, statistic, mode='compare', tolerance=TOLERANCE):
+        '''
+        Compare the value to the baseline of the test (only in the 'compare' mode) and record it, in one update of the
+        store. Return (the entry of the test, the failure message of compare or None).
+        '''
+        with self.locked():
+            data = self.load()
+            tests = self.tests(data)
+            previous = tests.get(testId)
+            message = compare(previous, value, statistic, tolerance) if mode == 'compare' else None
+            entry = tests.setdefault(testId, {'baseline': None, 'statistic': statistic, 'history': []})
+            entry['history'] = (entry['history'] + [value])[-HISTORY_SIZE:]
+            if mode == 'update' or entry['baseline'] is None or entry['statistic'] != statistic:
+                entry['baseline'] = value
+                entry['statistic'] = statistic
+            self.save(data)
+        return entry, message
+
+    def delete(self, testId):
+        with self.locked():
+            data = self.load()
+            tests = self.tests(data)
+            if testId in tests:
+                del tests[testId]
+                self.save(data)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m qassertions.baselines')
+    parser.add_argument('--file', help='default ~/.qassertions-baselines.json')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    commands.add_parser('list')
+    commands.add_parser('delete').add_argument('testId')
+    for mode in MODES:
+        command = commands.add_parser(mode)
+        command.add_argument('testId')
+        command.add_argument('value', type=float, help='seconds')
+        command.add_argument('--statistic', default='median')
+        command.add_argument('--tolerance', type=float, default=TOLERANCE)
+    try:
+        options = parser.parse_args(argv)
+    except SystemExit as e:
+        return e.code
+    store = BaselineStore(options.file)
+    if options.command == 'list':
+        for testId, entry in sorted(store.tests().items()):
+            print('%s: %s of %.6fs (%s runs)' % (testId, entry['statistic'], entry['baseline'], len(entry['history'])))
+    elif options.command == 'delete':
+        store.delete(options.testId)
+    else:
+        entry, message = store.submit(options.testId, options.value, options.statistic, options.command,
+                                      options.tolerance)
+        if message is not None:
+            print(message)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
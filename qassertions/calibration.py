@@ -0,0 +1,83 @@
+'''
+Calibration of the performance assertions to the speed of the machine.
+
+A fixed reference workload is executed once per process. The speed factor is the duration of the workload in the
+current machine divided by its duration in the reference machine (REFERENCE_SECONDS), so a timeout given in reference
+units, Reference(0.5), is 0.5 seconds in the reference machine, 1 second in a machine two times slower etc.
+
+The environment variable QASSERTIONS_SPEED_FACTOR overrides the calibration (useful for shared CI runners).
+'''
+
+import os
+
+from . import timing
+
+
+# Duration of referenceWorkload() in the reference machine (best of 5)
+REFERENCE_SECONDS = 0.018
+REPETITIONS = 5
+
+_speedFactor = None
+
+
+def referenceWorkload(n=200000):
+    total = 0
+    table = {}
+    for i in range(n):
+        total += i * i % 7
+        table[i % 1000] = total
+    return total
+
+
+def calibrate(repetitions=REPETITIONS):
+    '''
+    Execute the reference workload and return the speed factor of this machine (the best of the repetitions).
+    '''
+    durations = []
+    for i in range(repetitions):
+        startTime = timing.clock()
+        referenceWorkload()
+        durations.append(timing.clock() - startTime)
+    return min(durations) / REFERENCE_SECONDS
+
+
+def speedFactor():
+    '''
+    The speed factor of this machine, calculated once per process (> 1 means slower than the reference machine).
+    '''
+    global _speedFactor
+    if _speedFactor is None:
+        if os.environ.get('QASSERTIONS_SPEED_FACTOR'):
+            _speedFactor = float(os.environ['QASSERTIONS_SPEED_FACTOR'])
+        else:
+            _speedFactor = calibrate()
+    return _speedFactor
+
+
+def resetCalibration():
+    global _speedFactor
+    _speedFactor = None
+
+
+class Reference(object):
+    '''
+    Timeout in reference units: seconds in the reference machine. Example: assertPerformance(Reference(0.5), method)
+    '''
+
+    def __init__(self, units):
+        self.units = units
+
+    def seconds(self):
+        return self.units * speedFactor()
+
+    def __str__(self):
+        return '%s reference units' % self.units
+
+
+def toSeconds(timeout):
+    '''
+    timeout = seconds or Reference
+    '''
+    if isinstance(timeout, Reference):
+        return timeout.seconds()
+    return timeout
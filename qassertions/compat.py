@@ -0,0 +1,23 @@
+'''
+Names that are different in Python 2 and Python 3. The package runs in both, the coroutine functions (asyncio) need
+Python 3.
+'''
+
+import sys
+
+PY3 = sys.version_info[0] >= 3
+
+if PY3:
+    import pickle
+    xrange = range
+    unichr = chr
+    integerTypes = (int,)
+    stringTypes = (str,)
+    textType = str
+else:
+    import cPickle as pickle
+    xrange = xrange
+    unichr = unichr
+    integerTypes = (int, long)
+    stringTypes = (basestring,)
+    textType = unicode
@@ -0,0 +1,200 @@
+'''
+Fit of the timings of a method, measured for a series of input sizes, to complexity classes. Used by
+assertComplexity to catch algorithmic regressions (O(n) to O(n^2)) that an absolute timeout can't tell from a
+constant factor slowdown.
+
+Each class is fitted by least squares to time = a + b * f(n), the constant a absorbs the overhead of the call. The
+error of a fit is the root mean square of the residuals relative to the mean timing, so it doesn't depend on the
+speed of the machine.
+
+A class is chosen over a simpler one only if it reduces the error significantly (F-test at the 1% level), so the
+noise of the timings doesn't promote a method to a more complex class. O(n) and O(n log n) are almost the same curve
+for the usual sizes, the timings usually can't tell them apart: O(n) is kept in that case. But the inputs bigger than
+the caches of the CPU are slower per item, a linear method bends up as much as O(n log n) does: use sizes whose inputs
+fit in the caches to tell O(n) from O(n log n).
+
+Each timing is the fastest of `repeat` samples. A sample calls the method as many times as needed to last at least
+MIN_SAMPLE_SECONDS (like timeit), so it is well above the resolution of the clock even for fast methods.
+The clock of the samples (CLOCKS):
+'wall' = default, timing.clock, the elapsed time, including the time waiting for I/O, locks or sleeps
+'cpu' = timing.threadClock, the CPU time of the thread: the other processes of the machine don't change it, but the
+time waiting is not measured (a method that sleeps or waits for I/O looks faster than it is)
+'''
+
+import math
+
+from . import compat
+from . import timing
+
+
+# From the simplest to the most complex
+COMPLEXITIES = [
+    ('O(1)', lambda n: 1.0),
+    ('O(log n)', lambda n: math.log(n)),
+    ('O(n)', lambda n: float(n)),
+    ('O(n log n)', lambda n: n * math.log(n)),
+    ('O(n^2)', lambda n: float(n) * n),
+]
+# Critical values of the F distribution with (1, d) degrees of freedom at the 1% level, d = number of sizes - 2
+F_CRITICAL = [(1, 4052.0), (2, 98.5), (3, 34.1), (4, 21.2), (5, 16.3), (6, 13.7), (7, 12.2), (8, 11.3), (9, 10.6),
+              (10, 10.0), (12, 9.33), (15, 8.68), (20, 8.10), (30, 7.56), (60, 7.08)]
+F_CRITICAL_INFINITE = 6.63
+# Minimum growth of the fitted timing from the smallest to the biggest size (relative to the mean timing) of the
+# classes that grow: a smaller growth is noise, even if the fit is significant
+MIN_GROWTH = 0.1
+# Minimum duration of a sample
+MIN_SAMPLE_SECONDS = 0.005
+CLOCKS = {
+    'wall': timing.clock,
+    'cpu': timing.threadClock,
+}
+
+
+def getComplexity(name):
+    names = [complexityName for complexityName, f in COMPLEXITIES]
+    if name not in names:
+        raise Exception("Invalid complexity '%s', use one of: %s" % (name, ', '.join(names)))
+    return names.index(name)
+
+
+def fitLine(xs, ys):
+    '''
+    Least squares of y = a + b * x, with b >= 0 (a class that decreases doesn't describe the growth).
+    Return (a, b, root mean square of the residuals relative to the mean of y).
+    '''
+    count = float(len(xs))
+    meanX = sum(xs) / count
+    meanY = sum(ys) / count
+    varianceX = sum((x - meanX) ** 2 for x in xs)
+    b = sum((x - meanX) * (y - meanY) for x, y in zip(xs, ys)) / varianceX if varianceX > 0 else 0.0
+    b = max(b, 0.0)
+    a = meanY - b * meanX
+    squaredErrors = sum((y - a - b * x) ** 2 for x, y in zip(xs, ys))
+    if meanY <= 0:
+        return a, b, 0.0
+    return a, b, math.sqrt(squaredErrors / count) / meanY
+
+
+class ComplexityResult(object):
+    '''
+    sizes = input sizes
+    timings = seconds per call of each size (the fastest sample)
+    fits = list of (complexity, a, b, relative error), in the order of COMPLEXITIES
+    best = index of the best fit in COMPLEXITIES
+    '''
+
+    def __init__(self, sizes, timings, fits, best):
+        self.sizes = sizes
+        self.timings = timings
+        self.fits = fits
+        self.best = best
+
+    def complexity(self):
+        return COMPLEXITIES[self.best][0]
+
+    def report(self):
+        lines = ['best fit: %s' % self.complexity()]
+        lines.extend('n=%s: %s' % (size, timing.formatSeconds(seconds)) for size, seconds in zip(self.sizes, self.timings))
+        lines.extend('%s: error=%.4f' % (name, error) for name, a, b, error in self.fits)
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+def fCritical(degrees):
+    for maximum, value in F_CRITICAL:
+        if degrees <= maximum:
+            return value
+    return F_CRITICAL_INFINITE
+
+
+def isSignificant(simplerError, error, count):
+    '''
+    True if a fit with `error` explains `count` timings significantly better than a simpler fit with `simplerError`:
+    F = (SSE simpler - SSE) / (SSE / (count - 2)) above the critical value. The errors are relative RMS, so the ratio of
+    the SSEs is the ratio of the squared errors. Only O(1) is nested in the other classes, between two classes with two
+    parameters it is used as a heuristic.
+    '''
+    if error >= simplerError:
+        return False
+    if error == 0:
+        return True
+    degrees = count - 2
+    return degrees * (simplerError ** 2 / error ** 2 - 1) > fCritical(degrees)
+
+
+def fitComplexity(sizes, timings):
+    '''
+    Fit the timings to every class and return a ComplexityResult. Starting from O(1), a more complex class becomes the
+    best fit only if its error is significantly smaller than the error of the current best fit (isSignificant) and
+    its fitted timing grows at least MIN_GROWTH over the sizes.
+    '''
+    if len(sizes) < 3: raise Exception('The complexity needs at least 3 input sizes.')
+    if min(sizes) < 1: raise Exception('The input sizes must be greater than 0.')
+    fits = []
+    for name, f in COMPLEXITIES:
+        a, b, error = fitLine([f(n) for n in sizes], timings)
+        fits.append((name, a, b, error))
+    meanTiming = sum(timings) / float(len(timings))
+    best = 0
+    for index in range(1, len(fits)):
+        f = COMPLEXITIES[index][1]
+        growth = fits[index][2] * (f(max(sizes)) - f(min(sizes)))
+        if growth >= MIN_GROWTH * meanTiming and isSignificant(fits[best][3], fits[index][3], len(sizes)):
+            best = index
+    return ComplexityResult(sizes, timings, fits, best)
+
+
+def getClock(name):
+    if name not in CLOCKS:
+        raise Exception("Invalid clock '%s', use one of: %s" % (name, ', '.join(sorted(CLOCKS.keys()))))
+    return CLOCKS[name]
+
+
+def _timeCalls(method, value, number, clock=timing.clock):
+    startTime = clock()
+    for i in compat.xrange(number):
+        method(value)
+    return clock() - startTime
+
+
+def callsPerSample(method, value, clock=timing.clock):
+    '''
+    Number of calls of method(value) that last at least MIN_SAMPLE_SECONDS (1, 2, 5, 10, 20, 50...) in the clock or in
+    the wall clock, so a method that waits doesn't multiply the calls to fill the CPU time.
+    '''
+    number = 1
+    while True:
+        for multiplier in (1, 2, 5):
+            startTime = timing.clock()
+            if (_timeCalls(method, value, number * multiplier, clock) >= MIN_SAMPLE_SECONDS or
+                    timing.clock() - startTime >= MIN_SAMPLE_SECONDS):
+                return number * multiplier
+        number *= 10
+
+
+def measureScaling(method, sizes, setup=None, repeat=5, warmup=1, clock='wall'):
+    '''
+    Time method(input) for each size, input = setup(size) (not measured) or the size itself. The method is called
+    many times with the same input, so it must not change it. clock = 'wall' or 'cpu' (CLOCKS).
+    The samples are taken in `repeat` rounds, one sample of each size per round, so a transient slowdown of the machine
+    doesn't hit all the samples of one size.
+    Return the timing of each size: seconds per call of the fastest sample.
+    '''
+    if repeat < 1: raise Exception('repeat must be greater than 0.')
+    clock = getClock(clock)
+    values = []
+    numbers = []
+    for size in sizes:
+        value = setup(size) if setup is not None else size
+        for i in range(warmup):
+            method(value)
+        values.append(value)
+        numbers.append(callsPerSample(method, value, clock))
+    timings = [None] * len(sizes)
+    for i in range(repeat):
+        for index, (value, number) in enumerate(zip(values, numbers)):
+            seconds = _timeCalls(method, value, number, clock) / number
+            timings[index] = seconds if timings[index] is None else min(timings[index], seconds)
+    return timings
@@ -0,0 +1,180 @@
+'''
+Support to coroutine functions (asyncio). The assertions detect the awaitable objects returned by the methods and run
+them in an event loop.
+
+run: run an awaitable until it finishes, with an optional timeout (loop cancellation, no threads)
+mapConcurrently: used by the 'asyncio' executor of assertValidation to run the awaitables concurrently
+runLoad: used by assertThroughput to keep a number of awaitables running
+'''
+
+import collections
+import inspect
+import threading
+
+from . import timing
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+
+# Results of mapConcurrently that can be pending (running, waiting or not yet returned) when there is no limit
+WINDOW = 100
+
+_state = threading.local()
+
+
+def checkAsyncio():
+    if asyncio is None:
+        raise Exception('asyncio is not available, use Python 3.5 or newer.')
+
+
+def isAwaitable(value):
+    return asyncio is not None and hasattr(inspect, 'isawaitable') and inspect.isawaitable(value)
+
+
+def isCoroutineFunction(method):
+    return asyncio is not None and asyncio.iscoroutinefunction(method)
+
+
+def isDeferring():
+    '''
+    True while mapConcurrently is collecting the awaitables, so they must not be run synchronously.
+    '''
+    return getattr(_state, 'deferring', False)
+
+
+def run(awaitable, timeout=None):
+    '''
+    Run the awaitable in a new event loop and return its result.
+    timeout = default None, seconds. The awaitable is cancelled and asyncio.TimeoutError is raised when it expires.
+    '''
+    checkAsyncio()
+    loop = asyncio.new_event_loop()
+    try:
+        if timeout is not None and timeout >= 0:
+            awaitable = asyncio.wait_for(awaitable, timeout)
+        return loop.run_until_complete(asyncio.ensure_future(awaitable, loop=loop))
+    finally:
+        loop.close()
+
+
+class Deferred(object):
+    '''
+    An awaitable and the function that converts its exception (or None) to the result of mapConcurrently.
+    '''
+
+    def __init__(self, awaitable, callback):
+        self.awaitable = awaitable
+        self.callback = callback
+
+
+class _Pending(object):
+    '''
+    Result of func(item) in mapConcurrently, ready when it is not a Deferred or when its awaitable finished.
+    '''
+
+    def __init__(self, result):
+        self.result = result
+        self.ready = not isinstance(result, Deferred)
+
+    def finish(self, task):
+        error = asyncio.CancelledError() if task.cancelled() else task.exception()
+        self.result = self.result.callback(error)
+        self.ready = True
+
+
+def mapConcurrently(func, iterable, limit=None, window=None):
+    '''
+    Generator with the results of func(item) in the same order of the items. When func returns a Deferred, its
+    awaitable runs concurrently with the others, at most `limit` at the same time (None means no limit). func runs in
+    the thread of the generator, one item at a time: only the awaitables run concurrently.
+    The items are consumed lazily, at most `window` (default the biggest of limit and WINDOW) results are pending.
+    Closing the generator cancels the awaitables that are still running.
+    '''
+    checkAsyncio()
+    if window is None:
+        window = max(limit or 0, WINDOW)
+    items = iter(iterable)
+    exhausted = False
+    pending = collections.deque()
+    waiting = collections.deque()
+    running = {}
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            while not exhausted and len(pending) < window:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                _state.deferring = True
+                try:
+                    entry = _Pending(func(item))
+                finally:
+                    _state.deferring = False
+                pending.append(entry)
+                if not entry.ready:
+                    waiting.append(entry)
+            while waiting and (limit is None or len(running) < limit):
+                entry = waiting.popleft()
+                running[asyncio.ensure_future(entry.result.awaitable, loop=loop)] = entry
+            while pending and pending[0].ready:
+                yield pending.popleft().result
+            if exhausted and not pending:
+                return
+            if running and (exhausted or len(pending) >= window):
+                done, notDone = loop.run_until_complete(asyncio.wait(list(running.keys()),
+                                                                     return_when=asyncio.FIRST_COMPLETED))
+                for task in done:
+                    running.pop(task).finish(task)
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            loop.run_until_complete(asyncio.wait(list(running.keys())))
+        for entry in waiting:
+            if hasattr(entry.result.awaitable, 'close'):
+                entry.result.awaitable.close() # never awaited
+        loop.close()
+
+
+def runLoad(func, concurrency, claim):
+    '''
+    Keep `concurrency` awaitables of func() running in an event loop while claim() returns True (callbacks instead of
+    coroutines, that are a syntax error in Python 2).
+    Return the list of (latency in seconds, message of the exception or None) of every call.
+    '''
+    checkAsyncio()
+    loop = asyncio.new_event_loop()
+    finished = asyncio.Future(loop=loop)
+    results = []
+    running = [0]
+    def launch():
+        if not claim():
+            if running[0] == 0 and not finished.done():
+                finished.set_result(None)
+            return
+        running[0] += 1
+        startTime = timing.clock()
+        try:
+            task = asyncio.ensure_future(func(), loop=loop)
+        except Exception as e:
+            done(None, startTime, str(e))
+            return
+        task.add_done_callback(lambda task: done(task, startTime))
+    def done(task, startTime, error=None):
+        running[0] -= 1
+        if task is not None:
+            error = 'cancelled' if task.cancelled() else task.exception()
+        results.append((timing.clock() - startTime, None if error is None else str(error)))
+        loop.call_soon(launch)
+    try:
+        for i in range(concurrency):
+            loop.call_soon(launch)
+        loop.run_until_complete(finished)
+    finally:
+        loop.close()
+    return results
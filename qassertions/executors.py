@@ -0,0 +1,155 @@
+'''
+Executors used by assertValidation to run the generated test cases.
+
+SerialExecutor: run the cases one at a time in the current thread (default)
+ThreadExecutor: run the cases concurrently in a pool of threads
+ProcessExecutor: run the cases concurrently in a pool of processes (method and arguments must be picklable)
+AsyncioExecutor: run the cases of coroutine functions concurrently in an event loop
+
+All executors return the results in the same order of the cases, so the report is deterministic. They consume the
+cases lazily: the pools keep at most WINDOW_PER_WORKER cases per worker submitted and not yet returned, and asyncio at
+most coroutines.WINDOW (or `workers`, if bigger), so a sweep of millions of values is never materialized.
+'''
+
+import collections
+import multiprocessing
+import multiprocessing.pool
+
+from . import compat
+from . import coroutines
+
+
+# Cases submitted to the pool and not yet returned, per worker
+WINDOW_PER_WORKER = 4
+
+
+class SerialExecutor(object):
+    '''
+    Run the cases one at a time, in the current thread.
+    '''
+
+    def imap(self, func, iterable):
+        return (func(item) for item in iterable)
+
+    def shutdown(self):
+        pass
+
+
+class PoolExecutor(object):
+    '''
+    Abstract class of the executors that use a pool of workers.
+    workers = default None, the number of workers. None means the number of CPUs.
+    '''
+
+    def __init__(self, workers=None):
+        if workers is not None and workers < 1: raise Exception('The number of workers must be greater than 0.')
+        self.workers = workers
+        self.pool = None
+
+    def createPool(self):
+        pass
+
+    def checkItem(self, item):
+        pass
+
+    def windowSize(self):
+        return (self.workers or multiprocessing.cpu_count()) * WINDOW_PER_WORKER
+
+    def imap(self, func, iterable):
+        if self.pool is None:
+            self.pool = self.createPool()
+        return self._imap(func, iterable)
+
+    def _imap(self, func, iterable):
+        # Pool.imap consumes the whole iterable at once, so the items are submitted one by one in a bounded window
+        window = collections.deque()
+        windowSize = self.windowSize()
+        for item in iterable:
+            self.checkItem(item)
+            window.append(self.pool.apply_async(func, (item,)))
+            if len(window) >= windowSize:
+                yield window.popleft().get()
+        while window:
+            yield window.popleft().get()
+
+    def shutdown(self):
+        '''
+        Cancel the cases that were not executed yet and release the workers.
+        '''
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+
+class ThreadExecutor(PoolExecutor):
+    '''
+    Good for methods that spend their time with I/O (databases, web services etc).
+    '''
+
+    def createPool(self):
+        return multiprocessing.pool.ThreadPool(self.workers)
+
+
+class ProcessExecutor(PoolExecutor):
+    '''
+    Good for CPU bound methods. The method and the arguments must be picklable (module level functions etc).
+    '''
+
+    def createPool(self):
+        return multiprocessing.Pool(self.workers)
+
+    def checkItem(self, item):
+        # The pool hangs if it can not pickle a task, so it is better to check it before
+        try:
+            compat.pickle.dumps(item, compat.pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            raise Exception('The method and the arguments must be picklable to use a process executor: %s' % str(e))
+
+
+class AsyncioExecutor(object):
+    '''
+    Run the awaitables returned by the method (coroutine functions) concurrently in an event loop.
+    workers = default None (no limit), maximum number of awaitables running at the same time.
+    '''
+
+    def __init__(self, workers=None):
+        if workers is not None and workers < 1: raise Exception('The number of workers must be greater than 0.')
+        coroutines.checkAsyncio()
+        self.workers = workers
+        self.results = None
+
+    def imap(self, func, iterable):
+        self.results = coroutines.mapConcurrently(func, iterable, self.workers)
+        return self.results
+
+    def shutdown(self):
+        '''
+        Cancel the awaitables that are still running.
+        '''
+        if self.results is not None:
+            self.results.close()
+            self.results = None
+
+
+EXECUTORS = {
+    'serial': SerialExecutor,
+    'thread': ThreadExecutor,
+    'process': ProcessExecutor,
+    'asyncio': AsyncioExecutor,
+}
+
+
+def getExecutor(executor=None, workers=None):
+    '''
+    executor = None, 'serial', 'thread', 'process', 'asyncio' or an executor instance
+    '''
+    if executor is None:
+        executor = 'serial'
+    if not isinstance(executor, compat.stringTypes):
+        return executor
+    if executor not in EXECUTORS:
+        raise Exception("Invalid executor '%s', use one of: %s" % (executor, ', '.join(sorted(EXECUTORS.keys()))))
+    if executor == 'serial':
+        return SerialExecutor()
+    return EXECUTORS[executor](workers)
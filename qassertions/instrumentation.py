@@ -0,0 +1,275 @@
+'''
+Instrumentation of the assertions: the listeners receive the start and the end of each public assertion (of every
+module) and of each step of assertValidation and assertRandomValidation (generation of a case, execution of a case or
+of a vectorized call, formatting of the report), with the timestamps of timing.clock. The timestamps are monotonic
+when timing.MONOTONIC is True; otherwise they come from the wall clock, that can jump backwards.
+
+addListener / removeListener / listening: register the listeners. Without listeners the hooks cost one check of an
+empty list, so they can stay in the hot paths.
+Listener: base class of the listeners, start(name, category, timestamp, args) and end(...)
+Aggregator: in-memory statistics (count, total, min, max) of each event
+ChromeTraceExporter: trace events in the JSON format of chrome://tracing and Perfetto
+
+The events of the cases executed by the 'process' executor happen in the worker processes, they are not received.
+'''
+
+import functools
+import json
+import os
+import threading
+
+from . import timing
+
+
+# Replaced, never changed in place, so the hooks can iterate it without a lock
+listeners = []
+_lock = threading.Lock()
+
+
+def addListener(listener):
+    global listeners
+    with _lock:
+        listeners = listeners + [listener]
+
+
+def removeListener(listener):
+    global listeners
+    with _lock:
+        listeners = [l for l in listeners if l is not listener]
+
+
+def clearListeners():
+    global listeners
+    with _lock:
+        listeners = []
+
+
+class listening(object):
+    '''
+    Context manager that registers the listener while the block runs:
+    with instrumentation.listening(Aggregator()) as aggregator: ...
+    '''
+
+    def __init__(self, listener):
+        self.listener = listener
+
+    def __enter__(self):
+        addListener(self.listener)
+        return self.listener
+
+    def __exit__(self, *exc_info):
+        removeListener(self.listener)
+        return False
+
+
+class Listener(object):
+    '''
+    name = name of the event ('assertValidation', 'executeCase' etc)
+    category = 'assertion', 'validation' etc
+    timestamp = seconds of timing.clock (monotonic if timing.MONOTONIC)
+    args = dict with details of the event
+    '''
+
+    def start(self, name, category, timestamp, args):
+        pass
+
+    def end(self, name, category, timestamp, args):
+        pass
+
+
+class Span(object):
+    '''
+    Context manager that sends the start and the end of an event to the listeners.
+    '''
+    __slots__ = ('name', 'category', 'args')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        timestamp = timing.clock()
+        for listener in listeners:
+            listener.start(self.name, self.category, timestamp, self.args)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        timestamp = timing.clock()
+        args = self.args
+        if exc_type is not None:
+            args = dict(args, error=exc_type.__name__)
+        for listener in listeners:
+            listener.end(self.name, self.category, timestamp, args)
+        return False
+
+
+class _NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def span(name, category='qassertions', **args):
+    '''
+    with instrumentation.span('report', 'validation'): ...
+    '''
+    if not listeners:
+        return NULL_SPAN
+    return Span(name, category, args)
+
+
+def instrumented(category):
+    '''
+    Decorator that sends an event with the name of the function for each call. The function is in __wrapped__.
+    '''
+    def decorator(func):
+        name = func.__name__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not listeners:
+                return func(*args, **kwargs)
+            with Span(name, category, {}):
+                return func(*args, **kwargs)
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorator
+
+
+def traceIterator(iterable, name, category='qassertions'):
+    '''
+    Send an event for each item produced by the iterable (the time to produce it). Without listeners, the iterable is
+    returned unchanged.
+    '''
+    if not listeners:
+        return iterable
+    return _traceIterator(iter(iterable), name, category)
+
+
+def _traceIterator(iterator, name, category):
+    while True:
+        with Span(name, category, {}):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+class EventStatistics(object):
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.min = duration if self.min is None else min(self.min, duration)
+        self.max = duration if self.max is None else max(self.max, duration)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Aggregator(Listener):
+    '''
+    Statistics of the durations of each event, by (category, name). Thread safe.
+    '''
+
+    def __init__(self):
+        self.statistics = {}
+        self._stacks = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._stacks, 'stack', None)
+        if stack is None:
+            stack = self._stacks.stack = []
+        return stack
+
+    def start(self, name, category, timestamp, args):
+        self._stack().append(timestamp)
+
+    def end(self, name, category, timestamp, args):
+        stack = self._stack()
+        if not stack:
+            return # registered in the middle of the event
+        duration = timestamp - stack.pop()
+        with self._lock:
+            self.statistics.setdefault((category, name), EventStatistics()).add(duration)
+
+    def get(self, name, category=None):
+        '''
+        Statistics of the event (of any category if category is None), None if it didn't happen.
+        '''
+        for (eventCategory, eventName), statistics in self.statistics.items():
+            if eventName == name and category in (None, eventCategory):
+                return statistics
+        return None
+
+    def report(self):
+        '''
+        One line per event, ordered by the total time.
+        '''
+        with self._lock:
+            items = sorted(self.statistics.items(), key=lambda item: item[1].total, reverse=True)
+        return '\n'.join('%s/%s: count=%s total=%s mean=%s min=%s max=%s' % (
+            category, name, s.count, timing.formatSeconds(s.total), timing.formatSeconds(s.mean()),
+            timing.formatSeconds(s.min), timing.formatSeconds(s.max)) for (category, name), s in items)
+
+    def __str__(self):
+        return self.report()
+
+
+class ChromeTraceExporter(Listener):
+    '''
+    Duration events (ph B and E) with timestamps in microseconds, for chrome://tracing and Perfetto. Thread safe.
+    path = default None, file written by close()
+    '''
+
+    def __init__(self, path=None):
+        self.path = path
+        self.events = []
+        self._lock = threading.Lock()
+
+    def _add(self, phase, name, category, timestamp, args):
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': phase,
+            'ts': timestamp * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.current_thread().ident,
+        }
+        if args:
+            event['args'] = dict((key, str(value)) for key, value in args.items())
+        with self._lock:
+            self.events.append(event)
+
+    def start(self, name, category, timestamp, args):
+        self._add('B', name, category, timestamp, args)
+
+    def end(self, name, category, timestamp, args):
+        self._add('E', name, category, timestamp, args)
+
+    def toJSON(self):
+        with self._lock:
+            events = list(self.events)
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            f.write(self.toJSON())
+
+    def close(self):
+        if self.path is not None:
+            self.save(self.path)
@@ -0,0 +1,129 @@
+'''
+Load generation used by assertThroughput: a method is called by concurrent threads, processes or asyncio tasks, for
+a number of calls or for a duration, and the latency of every call is measured.
+
+generateLoad: return a timing.ThroughputResult
+'''
+
+import threading
+
+from . import coroutines
+from . import threading2
+from . import timing
+
+
+EXECUTORS = ('thread', 'process', 'asyncio')
+
+failureException = AssertionError
+
+
+class Claims(object):
+    '''
+    Thread-safe budget of the load: a worker claims every call before it executes it.
+    calls = default None (no limit), number of calls
+    duration = default None (no limit), seconds since start()
+    '''
+
+    def __init__(self, calls=None, duration=None):
+        self.calls = calls
+        self.duration = duration
+        self.claimed = 0
+        self.deadline = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.duration is not None:
+            self.deadline = timing.clock() + self.duration
+
+    def claim(self):
+        with self.lock:
+            if self.calls is not None and self.claimed >= self.calls:
+                return False
+            if self.deadline is not None and timing.clock() >= self.deadline:
+                return False
+            self.claimed += 1
+            return True
+
+
+def callRepeatedly(method, args, claims, latencies, errors):
+    while claims.claim():
+        startTime = timing.clock()
+        try:
+            method(*args)
+        except Exception as e:
+            errors.append(str(e))
+        latencies.append(timing.clock() - startTime)
+
+
+def _threadLoad(method, args, concurrency, claims):
+    '''
+    Return (start time, end time, latencies, errors).
+    '''
+    latencies = []
+    errors = []
+    barrier = threading2.Barrier(concurrency + 1)
+    def worker():
+        barrier.wait()
+        callRepeatedly(method, args, claims, latencies, errors)
+    workers = [threading.Thread(target=worker, name='Thread-AssertThroughput-%s' % index) for index in range(concurrency)]
+    for thread in workers:
+        thread.daemon = True
+        thread.start()
+    claims.start()
+    startTime = timing.clock()
+    barrier.wait() # all the threads start at the same time
+    for thread in workers:
+        thread.join()
+    return startTime, timing.clock(), latencies, errors
+
+
+def _processLoad(method, args, concurrency, calls, duration):
+    '''
+    The calls are divided between the processes, each one runs a single thread. The start and end times are measured
+    in the children, so the startup of the processes is not included. The latencies of every call are sent back (the
+    percentiles need them), KProcess reads them before the join so they can be bigger than the buffer of the pipe.
+    '''
+    processes = []
+    for index in range(concurrency):
+        processCalls = None if calls is None else calls // concurrency + (1 if index < calls % concurrency else 0)
+        processes.append(threading2.KProcess(target=_threadLoad, args=(method, args, 1, Claims(processCalls, duration)),
+                                             name='Process-AssertThroughput-%s' % index))
+    for process in processes:
+        process.start()
+    results = []
+    for process in processes:
+        try:
+            process.joinWithTimeout(-1)
+        except Exception as e: # the load of the process didn't finish (the child died, unpicklable method etc)
+            for other in processes:
+                other.kill()
+            raise failureException('This method is bugged, It impossible to measure the throughput: %s' % threading2.errorMessage(e))
+        results.append(process.result)
+    latencies = [latency for result in results for latency in result[2]]
+    errors = [error for result in results for error in result[3]]
+    return min(result[0] for result in results), max(result[1] for result in results), latencies, errors
+
+
+def _asyncioLoad(method, args, concurrency, claims):
+    claims.start()
+    startTime = timing.clock()
+    results = coroutines.runLoad(lambda: method(*args), concurrency, claims.claim)
+    return startTime, timing.clock(), [latency for latency, error in results], [error for latency, error in results if error is not None]
+
+
+def generateLoad(method, args=(), executor='thread', concurrency=4, calls=None, duration=None):
+    '''
+    Call the method from `concurrency` threads, processes or asyncio tasks (coroutine functions), until the number of
+    calls or the duration (seconds) is reached. Return (ThroughputResult, list of the messages of the exceptions).
+    '''
+    if executor not in EXECUTORS:
+        raise Exception("Invalid executor '%s', use one of: %s" % (executor, ', '.join(EXECUTORS)))
+    if concurrency < 1: raise Exception('The concurrency must be greater than 0.')
+    if calls is None and duration is None: raise Exception('The load needs a number of calls or a duration.')
+    if executor == 'process':
+        startTime, endTime, latencies, errors = _processLoad(method, args, concurrency, calls, duration)
+    elif executor == 'asyncio':
+        startTime, endTime, latencies, errors = _asyncioLoad(method, args, concurrency, Claims(calls, duration))
+    else:
+        startTime, endTime, latencies, errors = _threadLoad(method, args, concurrency, Claims(calls, duration))
+    return timing.ThroughputResult(timing.TimingResult(latencies), endTime - startTime, concurrency), errors
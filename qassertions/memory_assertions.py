@@ -0,0 +1,186 @@
+'''
+This module has assertions about the memory allocated by a method, to catch memory regressions like assertPerformance
+catches the slow ones. It uses the tracemalloc snapshots (Python 3.4+ or pytracemalloc).
+
+assertMemory
+assertPeakMemory
+assertRetainedMemory
+'''
+
+from . import instrumentation
+from . import threading2
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+failureException = AssertionError
+
+
+def checkTracemalloc():
+    if tracemalloc is None:
+        raise Exception('tracemalloc is not available, use Python 3.4 or newer (or pytracemalloc).')
+
+
+class MemoryResult(object):
+    '''
+    peak = maximum of bytes allocated during the execution of the method (all the traced memory, tracemalloc can't
+    filter the peak). Before Python 3.9 (without tracemalloc.reset_peak) it is the maximum since tracemalloc started:
+    it is reliable only if tracemalloc is not running yet, so the assertion starts it for each execution
+    retained = bytes allocated by the method that are still alive after it finishes. It comes from the same filtered
+    snapshots of retainedBlocks and topStats (without the allocations of tracemalloc and of this module)
+    retainedBlocks = number of memory blocks allocated by the method that are still alive after it finishes. It is not
+    the number of allocations: tracemalloc only traces the blocks that are alive, the blocks allocated and freed during
+    the execution are not counted (they are in the peak)
+    topStats = list of (call site, retained bytes, retained blocks) of the call sites that allocated more memory
+    '''
+
+    def __init__(self, peak, retained, retainedBlocks, topStats=None):
+        self.peak = peak
+        self.retained = retained
+        self.retainedBlocks = retainedBlocks
+        self.topStats = topStats or []
+
+    def report(self):
+        lines = ['%s: %s bytes in %s blocks' % (site, size, count) for site, size, count in self.topStats]
+        return '\n'.join(['peak=%s bytes, retained=%s bytes in %s blocks' % (self.peak, self.retained, self.retainedBlocks)] + lines)
+
+    def __str__(self):
+        return self.report()
+
+
+def worstResult(results):
+    '''
+    The biggest peak, retained bytes and retained blocks of all the executions, with the top call sites of the execution
+    that retained more memory.
+    '''
+    worst = max(results, key=lambda r: r.retained)
+    return MemoryResult(max(r.peak for r in results),
+                        worst.retained,
+                        max(r.retainedBlocks for r in results),
+                        worst.topStats)
+
+
+def measureMemory(method, *args, **kwargs):
+    '''
+    Execute the method once tracing the memory allocations. Return a MemoryResult.
+    top = default 10, number of call sites in the MemoryResult.topStats
+    '''
+    top = kwargs.pop('top', 10)
+    checkTracemalloc()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        startMemory = tracemalloc.get_traced_memory()[0]
+        if hasattr(tracemalloc, 'reset_peak'): # the allocations of the snapshot are not in the peak
+            tracemalloc.reset_peak()
+        method(*args, **kwargs)
+        peakMemory = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    # The allocations of tracemalloc and of this module are not interesting
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__.replace('.pyc', '.py'))]
+    stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+    topStats = [(str(stat.traceback), stat.size_diff, stat.count_diff) for stat in stats[:top] if stat.size_diff > 0]
+    return MemoryResult(peakMemory - startMemory,
+                        sum(stat.size_diff for stat in stats),
+                        sum(stat.count_diff for stat in stats),
+                        topStats)
+
+
+def _measureMemoryRepeatedly(method, args, warmup, repeat, top):
+    for i in range(warmup):
+        method(*args)
+    return worstResult([measureMemory(method, *args, top=top) for i in range(repeat)])
+
+
+def checkMemoryBudget(result, peak=None, retained=None, retainedBlocks=None):
+    '''
+    Raise a failureException if the result is greater than any of the budgets (None means no budget).
+    '''
+    errors = []
+    if peak is not None and result.peak > peak:
+        errors.append('peak of %s bytes > %s bytes' % (result.peak, peak))
+    if retained is not None and result.retained > retained:
+        errors.append('retained %s bytes > %s bytes' % (result.retained, retained))
+    if retainedBlocks is not None and result.retainedBlocks > retainedBlocks:
+        errors.append('retained %s blocks > %s blocks' % (result.retainedBlocks, retainedBlocks))
+    if errors:
+        raise failureException('This method uses too much memory: %s\n%s' % (', '.join(errors), result.report()))
+
+
+@instrumentation.instrumented('assertion')
+def assertMemory(method, *args, **kwargs):
+    '''
+    Assert that the memory allocated by the method is inside of the budgets (in bytes).
+
+    Optional keyword arguments:
+    peak = default None, budget of the maximum of bytes allocated during the execution
+    retained = default None, budget of bytes allocated by the method and still alive after it finishes
+    retainedblocks = default None, budget of memory blocks allocated by the method and still alive after it finishes
+    (MemoryResult.retainedBlocks)
+    warmup = default 0, executions that are not measured (to fill caches etc)
+    repeat = default 1, measured executions, the worst one is compared to the budgets
+    top = default 10, number of call sites reported in the failure message
+    backend = default None (current process), or 'process' to measure the method isolated in a child process
+    timeout = default -1 (no timeout), timeout in seconds of the 'process' backend
+
+    Without tracemalloc the assertion raises an exception, it never passes without measuring.
+
+    Return the MemoryResult.
+    '''
+    peak = kwargs.pop('peak', None)
+    retained = kwargs.pop('retained', None)
+    retainedBlocks = kwargs.pop('retainedblocks', None)
+    warmup = kwargs.pop('warmup', 0)
+    repeat = kwargs.pop('repeat', 1)
+    top = kwargs.pop('top', 10)
+    backend = kwargs.pop('backend', None)
+    timeout = kwargs.pop('timeout', -1)
+    if kwargs:
+        raise TypeError("assertMemory() got an unexpected keyword argument '%s'" % list(kwargs.keys())[0])
+    if repeat < 1: raise Exception('repeat must be greater than 0.')
+    if backend not in (None, 'process'): raise Exception("Invalid backend '%s', use None or 'process'" % backend)
+    checkTracemalloc()
+    try:
+        if backend == 'process':
+            process = threading2.KProcess(target=_measureMemoryRepeatedly,
+                                          args=(method, args, warmup, repeat, top),
+                                          name='Process-AssertMemory-' + str(method))
+            process.start()
+            process.joinWithTimeout(timeout)
+            if process.isExpired():
+                raise failureException('This method is too slow to measure the memory: timeout of %s seconds' % timeout)
+            result = process.result
+        else:
+            result = _measureMemoryRepeatedly(method, args, warmup, repeat, top)
+    except failureException as e:
+        raise e
+    except Exception as e:
+        raise failureException("This method is bugged, It impossible to measure the memory: %s" % threading2.errorMessage(e))
+    checkMemoryBudget(result, peak=peak, retained=retained, retainedBlocks=retainedBlocks)
+    return result
+
+
+@instrumentation.instrumented('assertion')
+def assertPeakMemory(peak, method, *args, **kwargs):
+    '''
+    Assert that the method never has more than `peak` bytes allocated during its execution.
+    '''
+    kwargs['peak'] = peak
+    return assertMemory(method, *args, **kwargs)
+
+
+@instrumentation.instrumented('assertion')
+def assertRetainedMemory(retained, method, *args, **kwargs):
+    '''
+    Assert that the method doesn't keep more than `retained` bytes allocated after its execution (memory leaks etc).
+    '''
+    kwargs['retained'] = retained
+    return assertMemory(method, *args, **kwargs)
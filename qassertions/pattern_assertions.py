@@ -6,38 +6,293 @@ This module has additional assertions to facilitate writing good automated tests
 verify design patterns behavior. These assertions make the tests more clean and legible.  
 
 assertSingleton
-assertPrototype
+assertPrototype (analyzeClone, CloneAnalysis)
 '''
 
+import sys
+import threading
+import types
+
+from . import calibration
+from . import compat
+from . import instrumentation
+from . import threading2
+from . import timing
+
+
 failureException = AssertionError
 
 
-def assertSingleton(clazz):
+def instantiateConcurrently(clazz, threads, timeout=None, instances=None):
+    '''
+    Release `threads` threads from a barrier to instantiate the class at the same time.
+    timeout = default None (no limit), seconds to wait for the threads (deadlocks etc)
+    instances = default None, a list that receives the instances (to compare them with the ones of other races)
+    Return (number of different instances, list of the durations of the instantiations, number of threads that didn't
+    finish, the message of the first exception or None).
+    '''
+    barrier = threading2.Barrier(threads)
+    allInstances = instances
+    instances = [None] * threads # keep the instances alive, so their ids are not reused
+    durations = []
+    errors = []
+    def instantiate(index):
+        barrier.wait()
+        startTime = timing.clock()
+        try:
+            instances[index] = clazz()
+        except Exception as e:
+            errors.append(str(e))
+            return
+        durations.append(timing.clock() - startTime)
+    workers = [threading.Thread(target=instantiate, args=(index,), name='Thread-AssertSingleton-%s' % index)
+               for index in range(threads)]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    deadline = timing.clock() + timeout if timeout is not None else None
+    for worker in workers:
+        worker.join(max(0, deadline - timing.clock()) if deadline is not None else None)
+    unfinished = len([worker for worker in workers if worker.is_alive()])
+    created = [instance for instance in instances if instance is not None]
+    if allInstances is not None:
+        allInstances.extend(created)
+    return len(set(id(instance) for instance in created)), durations, unfinished, errors[0] if errors else None
+
+
+def contentionReport(durations):
+    '''
+    Statistics of the concurrent instantiations. The spread (slowest - fastest) is an upper bound of the time that the
+    threads waited for each other (the lock of the singleton, the GIL, the scheduler), not a measure of the lock wait:
+    the lock is inside of the class.
+    '''
+    return 'instantiations: %s\nspread of the instantiation durations: %.6fs' % (durations, durations.max() - durations.min())
+
+
+@instrumentation.instrumented('assertion')
+def assertSingleton(clazz, **kwargs):
     '''
     Assert that class is a implementation of the design pattern Singleton. 
+
+    Optional keyword arguments:
+    threads = default None (two instantiations in the current thread), number of threads released from a barrier to
+    instantiate the class at the same time, to verify the locks of the singleton (double-checked locking etc)
+    processes = default None, number of child processes (fork) that run the threads, each one with its own copy of
+    the state of the class (it is not useful if the instance was created before the fork)
+    repeat = default 1, number of races, the race conditions don't happen every time. Without processes or reset, the
+    first race creates the instance: the next races only verify that all of them get the same instance
+    reset = default None, a callable that drops the instance of the singleton, called before each race (before the fork
+    of the processes), so every race creates it again
+    timeout = default None (no limit), seconds (or calibration.Reference) of each instantiation, to catch slow
+    initializers and deadlocks
+    report = default None, a callable or a file that receives the contentionReport of the concurrent instantiations,
+    also when the assertion passes
+
+    Return a TimingResult with the durations of the concurrent instantiations (None in the default mode).
+    '''
+    threads = kwargs.pop('threads', None)
+    processes = kwargs.pop('processes', None)
+    repeat = kwargs.pop('repeat', 1)
+    reset = kwargs.pop('reset', None)
+    timeout = calibration.toSeconds(kwargs.pop('timeout', None))
+    report = kwargs.pop('report', None)
+    if kwargs:
+        raise TypeError("assertSingleton() got an unexpected keyword argument '%s'" % list(kwargs.keys())[0])
+    if threads is None and processes is None:
+        a = clazz()
+        b = clazz()
+        if (a is not b):
+            raise failureException("The class %s is not a singleton." % (clazz.__name__))
+        return None
+
+    threads = threads or 2
+    if threads < 2: raise Exception('The number of threads must be greater than 1.')
+    durations = timing.TimingResult()
+    instances = [] # instances of the races since the last reset, in this process
+    for i in range(repeat):
+        if reset is not None:
+            reset()
+            instances = []
+        if processes:
+            children = [threading2.KProcess(target=instantiateConcurrently, args=(clazz, threads, timeout),
+                                            name='Process-AssertSingleton-%s' % clazz.__name__)
+                        for p in range(processes)]
+            for child in children:
+                child.start()
+            races = []
+            for child in children:
+                try:
+                    child.joinWithTimeout(-1)
+                except Exception as e: # the child died or the result is not picklable
+                    for other in children:
+                        other.kill()
+                    raise failureException("The concurrent instantiations of the class %s failed in a process: %s" %
+                                           (clazz.__name__, threading2.errorMessage(e)))
+                races.append(child.result)
+        else:
+            races = [instantiateConcurrently(clazz, threads, timeout, instances)]
+        for distinct, raceDurations, unfinished, error in races:
+            for duration in raceDurations:
+                durations.add(duration)
+            if error is not None:
+                raise failureException("The class %s raised an exception in a concurrent instantiation: %s" % (clazz.__name__, error))
+            if unfinished:
+                raise failureException("The class %s is too slow to instantiate: %s of %s threads didn't finish in %s seconds." %
+                                       (clazz.__name__, unfinished, threads, timeout))
+            if distinct > 1:
+                raise failureException("The class %s is not a singleton: %s different instances in %s concurrent instantiations.\n%s" %
+                                       (clazz.__name__, distinct, threads, contentionReport(durations)))
+        distinct = len(set(id(instance) for instance in instances))
+        if distinct > 1:
+            raise failureException("The class %s is not a singleton: %s different instances in %s races.\n%s" %
+                                   (clazz.__name__, distinct, i + 1, contentionReport(durations)))
+    if timeout is not None and durations.max() > timeout:
+        raise failureException("The class %s is too slow to instantiate: %.6fs > %s seconds\n%s" %
+                               (clazz.__name__, durations.max(), timeout, contentionReport(durations)))
+    if report is not None:
+        if hasattr(report, 'write'):
+            report.write(contentionReport(durations) + '\n')
+        else:
+            report(contentionReport(durations))
+    return durations
+
+
+# Objects that don't matter if they are shared or copied
+ATOMIC_TYPES = compat.integerTypes + (type(None), bool, float, complex, str, compat.textType, type, types.FunctionType,
+                                      types.BuiltinFunctionType, types.ModuleType)
+MAX_SHARED_PATHS = 10
+
+
+def _children(obj):
+    '''
+    List of (path, sub-object) of the references of obj: items of lists, tuples and dicts and the attributes.
     '''
-    a = clazz()
-    b = clazz()
-    if (a is not b):
-        raise failureException("The class %s is not a singleton." % (clazz.__name__))
+    if isinstance(obj, dict):
+        return [('[%r]' % key, value) for key, value in obj.items()]
+    if isinstance(obj, (list, tuple)):
+        return [('[%s]' % index, value) for index, value in enumerate(obj)]
+    if hasattr(obj, '__dict__'):
+        return [('.%s' % name, value) for name, value in sorted(vars(obj).items())]
+    return []
 
 
-def assertPrototype(instance, method='clone'):
+class CloneAnalysis(object):
+    '''
+    shared = number of sub-objects of the instance that are shared with the clone
+    copied = number of sub-objects that were copied (the instance included)
+    copiedBytes = sum of the sizes (sys.getsizeof) of the copied sub-objects
+    copyDepth = the depth of the deepest copied sub-object (0 = only the instance was copied, a shallow copy)
+    sharedPaths = paths of the first shared sub-objects, like .items[0]
+    durations = TimingResult of the clones
+    '''
+
+    def __init__(self):
+        self.shared = 0
+        self.copied = 0
+        self.copiedBytes = 0
+        self.copyDepth = 0
+        self.sharedPaths = []
+        self.durations = None
+
+    def report(self):
+        lines = ['shared=%s, copied=%s, copied bytes=%s, copy depth=%s' % (self.shared, self.copied, self.copiedBytes, self.copyDepth)]
+        if self.durations is not None:
+            lines.append('clone: %s' % self.durations)
+        if self.sharedPaths:
+            lines.append('shared: %s' % ', '.join(self.sharedPaths))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+def analyzeClone(instance, clone):
+    '''
+    Walk the object graphs of the instance and of the clone at the same time (once, cycles included) and return a
+    CloneAnalysis. The shared sub-objects are not walked, since everything below them is shared too.
+    '''
+    analysis = CloneAnalysis()
+    visited = set()
+    stack = [('', instance, clone, 0)]
+    while stack:
+        path, original, copy, depth = stack.pop()
+        if isinstance(original, ATOMIC_TYPES) or (id(original), id(copy)) in visited:
+            continue
+        visited.add((id(original), id(copy)))
+        if original is copy:
+            analysis.shared += 1
+            if len(analysis.sharedPaths) < MAX_SHARED_PATHS:
+                analysis.sharedPaths.append(path)
+            continue
+        analysis.copied += 1
+        analysis.copiedBytes += sys.getsizeof(copy)
+        analysis.copyDepth = max(analysis.copyDepth, depth)
+        copyChildren = dict(_children(copy))
+        for childPath, child in reversed(_children(original)):
+            if childPath in copyChildren:
+                stack.append((path + childPath, child, copyChildren[childPath], depth + 1))
+    analysis.sharedPaths.sort()
+    return analysis
+
+
+@instrumentation.instrumented('assertion')
+def assertPrototype(instance, method='clone', **kwargs):
     '''
     Assert that instance is a implementation of the design pattern Prototype. 
+
+    Optional keyword arguments:
+    analyze = default False, time the clones and analyze the last one (CloneAnalysis). The budgets maxdepth, maxbytes
+    and timeout enable it.
+    repeat = default 10, number of clones that are timed
+    maxdepth = default None (no limit), maximum copy depth (0 = shallow copy), to catch clones that copy more than
+    necessary
+    maxbytes = default None (no limit), maximum of bytes copied
+    timeout = default None (no limit), seconds (or calibration.Reference) of the clone
+    statistic = default 'median', the statistic of the durations compared to the timeout
+
+    Return the CloneAnalysis of the last clone (None if there is no analysis).
     '''
+    analyze = kwargs.pop('analyze', False)
+    repeat = kwargs.pop('repeat', 10)
+    maxdepth = kwargs.pop('maxdepth', None)
+    maxbytes = kwargs.pop('maxbytes', None)
+    timeout = calibration.toSeconds(kwargs.pop('timeout', None))
+    statistic = kwargs.pop('statistic', 'median')
+    if kwargs:
+        raise TypeError("assertPrototype() got an unexpected keyword argument '%s'" % list(kwargs.keys())[0])
     clone = instance.__class__.__dict__[method](instance)
     if(instance != clone or id(instance) == id(clone)):
         raise failureException("The class %s is not a prototype." % (instance.__class__.__name__))
+    if not analyze and maxdepth is None and maxbytes is None and timeout is None:
+        return None
+
+    if repeat < 1: raise Exception('repeat must be greater than 0.')
+    durations = timing.TimingResult()
+    for i in range(repeat):
+        startTime = timing.clock()
+        clone = instance.__class__.__dict__[method](instance)
+        durations.add(timing.clock() - startTime)
+    analysis = analyzeClone(instance, clone)
+    analysis.durations = durations
+    name = instance.__class__.__name__
+    if maxdepth is not None and analysis.copyDepth > maxdepth:
+        raise failureException("The class %s copies more than necessary: copy depth of %s > %s\n%s" % (name, analysis.copyDepth, maxdepth, analysis))
+    if maxbytes is not None and analysis.copiedBytes > maxbytes:
+        raise failureException("The class %s copies more than necessary: %s bytes > %s bytes\n%s" % (name, analysis.copiedBytes, maxbytes, analysis))
+    if timeout is not None and durations.statistic(statistic) > timeout:
+        raise failureException("The class %s is too slow to clone: %s of %s > %s\n%s" % (name, statistic, durations.statistic(statistic), timeout, analysis))
+    return analysis
 
 
 # TODO method create may have parameters
-def assertBuilder(builder_class, method='create', object_class):
+@instrumentation.instrumented('assertion')
+def assertBuilder(builder_class, object_class, method='create'):
     instance = builder_class.__dict__[method](builder_class())
     if not isinstance(instance, object_class):
         raise failureException("The class %s is not a builder of %s." % (builder_class.__name__, object_class.__name__))
 
 
+@instrumentation.instrumented('assertion')
 def assertDelegate(method_adapter, method_delegate):
     pass
 
@@ -0,0 +1,235 @@
+'''
+Profile of a slow method, used by assertPerformance to explain the failure "This method is too slow".
+
+The method is executed again in a threading2.AsyncKThread (no line tracing that would distort the profile) for at
+most `timeout` seconds, then it is killed. A method blocked in a C call (sleep, I/O) can't be killed until the call
+returns: its thread is abandoned (daemon) at the deadline and the profile is taken anyway.
+
+'cprofile': deterministic profile (cProfile). The file is a .pstats (pstats, snakeviz, gprof2dot, flameprof).
+Only the functions called by the method are kept. Since Python 3.12 the call that blocks the method at the deadline is
+lost (cProfile records all the threads in one stack, the parent waking up pops it): use 'sample' for blocked methods.
+In Python 3.11, cProfile doesn't record anything while a killed thread is still blocked in a C call (backend 'async').
+'sample': the stack of the thread is sampled at a fixed interval (sys._current_frames), without slowing the method.
+The file has the collapsed stacks (one "caller;callee count" per line) of flamegraph.pl and speedscope.
+A profile without any function (a fast method) is reported as "no samples".
+'''
+
+import collections
+import cProfile
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from . import threading2
+from . import timing
+
+
+PROFILERS = ('cprofile', 'sample')
+TOP = 10
+SAMPLE_INTERVAL = 0.001
+# Seconds to wait for the kill of the profiled thread. The kill of a thread that runs Python code is immediate, a
+# thread blocked in a C call is abandoned after it.
+KILL_TIMEOUT = 0.05
+# Entry of the profiler itself in the cProfile stats
+PROFILER_DISABLE = "<method 'disable' of '_lsprof.Profiler' objects>"
+
+
+def _functionName(filename, line, name):
+    return '%s (%s:%s)' % (name, os.path.basename(filename), line)
+
+
+class ProfileResult(object):
+    '''
+    profiler = 'cprofile' or 'sample'
+    duration = seconds of the profiled execution
+    functions = list of (self seconds or samples, cumulative seconds or samples, function name), hottest first
+    path = file with the profile, None if it was not written
+    '''
+
+    def __init__(self, profiler, duration, functions, path=None):
+        self.profiler = profiler
+        self.duration = duration
+        self.functions = functions
+        self.path = path
+
+    def top(self, count=TOP):
+        return self.functions[:count]
+
+    def report(self, count=TOP):
+        if not self.functions:
+            header = 'no samples'
+            lines = []
+        elif self.profiler == 'cprofile':
+            header = '%10s %10s  function' % ('self', 'cumulative')
+            lines = ['%10s %10s  %s' % (timing.formatSeconds(own), timing.formatSeconds(cumulative), name)
+                     for own, cumulative, name in self.top(count)]
+        else:
+            header = '%10s %10s  function' % ('self', 'total') + ' (samples)'
+            lines = ['%10s %10s  %s' % (own, cumulative, name) for own, cumulative, name in self.top(count)]
+        lines.insert(0, header)
+        title = 'Profile (%s, %s)' % (self.profiler, timing.formatSeconds(self.duration))
+        if self.path is not None:
+            title += ': %s' % self.path
+        return '%s\n%s' % (title, '\n'.join(lines))
+
+    def __str__(self):
+        return self.report()
+
+
+def _startThread(target):
+    # The target starts when the parent is already waiting for the thread: cProfile records the calls of every thread
+    # since Python 3.12, the start of the thread would be in the profile
+    started = threading.Lock()
+    started.acquire()
+    def run():
+        started.acquire()
+        target()
+    thread = threading2.AsyncKThread(target=run, name='Thread-Profile')
+    thread.daemon = True
+    thread.start()
+    started.release()
+    return thread
+
+
+def _stopThread(thread, deadline):
+    # The exceptions of the method are reported by the assertion, they are ignored
+    thread.join(max(deadline - timing.clock(), 0))
+    _killThread(thread)
+
+
+def _killThread(thread):
+    if thread.isAlive():
+        # The profile of a thread is complete only when it stops, but the deadline is enforced even if the method is
+        # blocked: it is not waited for more than KILL_TIMEOUT
+        thread.kill()
+        thread.join(KILL_TIMEOUT)
+        if thread.isAlive():
+            threading2.warnAbandoned(thread)
+
+
+def _callMethod(method, args):
+    method(*args)
+
+
+def _label(function):
+    code = function.__code__
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def _statsOfTheMethod(stats):
+    '''
+    The cProfile stats of the functions called (directly or not) by _callMethod. Since Python 3.12, cProfile records
+    every thread in the same stack: the calls of the parent (the kill of the thread in _killThread) are recorded as
+    calls of the method, they are removed with the calls of the profiler itself.
+    '''
+    excluded = set([_label(_killThread)])
+    callees = collections.defaultdict(list)
+    for function, (primitiveCalls, calls, own, cumulative, callers) in stats.items():
+        if function[2] == PROFILER_DISABLE:
+            excluded.add(function)
+        for caller in callers:
+            callees[caller].append(function)
+    selected = set()
+    pending = list(callees[_label(_callMethod)])
+    while pending:
+        function = pending.pop()
+        if function not in selected and function not in excluded:
+            selected.add(function)
+            pending.extend(callees[function])
+    methodStats = {}
+    for function in selected:
+        primitiveCalls, calls, own, cumulative, callers = stats[function]
+        callers = dict((caller, value) for caller, value in callers.items() if caller in selected)
+        methodStats[function] = (primitiveCalls, calls, own, cumulative, callers)
+    return methodStats
+
+
+def profileCProfile(method, args, timeout, path=None):
+    profiler = cProfile.Profile()
+    startTime = timing.clock()
+    _stopThread(_startThread(lambda: profiler.runcall(_callMethod, method, args)), startTime + timeout)
+    duration = timing.clock() - startTime
+    profiler.create_stats()
+    stats = _statsOfTheMethod(profiler.stats)
+    functions = []
+    for (filename, line, name), (primitiveCalls, calls, own, cumulative, callers) in stats.items():
+        functions.append((own, cumulative, _functionName(filename, line, name)))
+    functions.sort(reverse=True)
+    if path is not None:
+        with open(path, 'wb') as f: # the format of pstats.Stats.dump_stats
+            marshal.dump(stats, f)
+    return ProfileResult('cprofile', duration, functions, path)
+
+
+def _methodName(method):
+    code = getattr(method, '__code__', None)
+    if code is not None:
+        return _functionName(code.co_filename, code.co_firstlineno, code.co_name)
+    return '<%s>' % getattr(method, '__name__', method)
+
+
+def _stack(frame):
+    '''
+    Names of the functions of the stack called by the method, from the outermost to the innermost. None if the thread
+    is not running the method (it is starting or finishing), empty if the method is a builtin (no Python frames).
+    '''
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        if code is _callMethod.__code__:
+            names.reverse()
+            return names
+        names.append(_functionName(code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return None
+
+
+def profileSample(method, args, timeout, path=None, interval=SAMPLE_INTERVAL):
+    stacks = collections.Counter()
+    startTime = timing.clock()
+    deadline = startTime + timeout
+    thread = _startThread(lambda: _callMethod(method, args))
+    builtinStack = (_methodName(method),)
+    while thread.isAlive() and timing.clock() < deadline:
+        frame = sys._current_frames().get(thread.ident)
+        stack = _stack(frame) if frame is not None else None
+        if stack is not None:
+            stacks[tuple(stack) or builtinStack] += 1
+        time.sleep(interval)
+    _stopThread(thread, deadline)
+    duration = timing.clock() - startTime
+    own = collections.Counter()
+    total = collections.Counter()
+    for stack, count in stacks.items():
+        own[stack[-1]] += count
+        for name in set(stack):
+            total[name] += count
+    functions = sorted(((own[name], total[name], name) for name in total), reverse=True)
+    if path is not None:
+        with open(path, 'w') as f:
+            for stack, count in sorted(stacks.items()):
+                f.write('%s %s\n' % (';'.join(stack), count))
+    return ProfileResult('sample', duration, functions, path)
+
+
+def checkProfiler(profiler):
+    if profiler not in PROFILERS:
+        raise Exception("Invalid profiler '%s', use one of: %s" % (profiler, ', '.join(PROFILERS)))
+
+
+def profile(profiler, method, args, timeout, path=None):
+    '''
+    Execute method(*args) for at most `timeout` seconds under the profiler and return a ProfileResult.
+    profiler = 'cprofile' or 'sample'
+    path = default None, the file of the profile. True means a new temporary file, that the caller must remove.
+    '''
+    checkProfiler(profiler)
+    if path is True:
+        handle, path = tempfile.mkstemp(prefix='qassertions-', suffix='.pstats' if profiler == 'cprofile' else '.folded')
+        os.close(handle)
+    if profiler == 'cprofile':
+        return profileCProfile(method, args, timeout, path)
+    return profileSample(method, args, timeout, path)
@@ -0,0 +1,224 @@
+'''
+Regular expressions used by assertExceptionMessage and RegExpr.
+
+compilePattern: bounded LRU cache of compiled patterns. The cache of the re module is cleared when it is full, so the
+big suites that use hundreds of patterns would compile them again and again.
+generate: a string that matches a pattern, built from the parsed pattern (sre_parse)
+matchingValues / nonMatchingValues: the values of RegExpr, verified with the compiled pattern
+'''
+
+import collections
+import re
+import sre_constants
+import sre_parse
+import string
+import sys
+import threading
+
+from . import compat
+
+
+CACHE_SIZE = 512
+# Characters used to build the strings, in order of preference
+ALPHABET = string.ascii_letters + string.digits + string.punctuation + ' \t\n'
+# Maximum number of repetitions of a repeat without maximum (+, *, {n,})
+MAX_EXTRA_REPEAT = 5
+
+_cache = collections.OrderedDict()
+_lock = threading.Lock()
+
+
+def compilePattern(pattern, flags=0):
+    '''
+    re.compile with a bounded LRU cache of CACHE_SIZE patterns.
+    '''
+    key = (pattern, flags)
+    with _lock:
+        compiled = _cache.pop(key, None)
+        if compiled is not None:
+            _cache[key] = compiled # most recently used
+            return compiled
+    compiled = re.compile(pattern, flags)
+    with _lock:
+        _cache[key] = compiled
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def clearCache():
+    with _lock:
+        _cache.clear()
+
+
+def cacheSize():
+    return len(_cache)
+
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: lambda c: c.isdigit(),
+    sre_constants.CATEGORY_NOT_DIGIT: lambda c: not c.isdigit(),
+    sre_constants.CATEGORY_SPACE: lambda c: c.isspace(),
+    sre_constants.CATEGORY_NOT_SPACE: lambda c: not c.isspace(),
+    sre_constants.CATEGORY_WORD: lambda c: c.isalnum() or c == '_',
+    sre_constants.CATEGORY_NOT_WORD: lambda c: not (c.isalnum() or c == '_'),
+}
+
+
+def _inSet(items, c):
+    '''
+    True if the character c matches a set ([...]) of the parsed pattern.
+    '''
+    negate = False
+    for op, av in items:
+        if op == sre_constants.NEGATE:
+            negate = True
+        elif op == sre_constants.LITERAL and ord(c) == av:
+            return not negate
+        elif op == sre_constants.RANGE and av[0] <= ord(c) <= av[1]:
+            return not negate
+        elif op == sre_constants.CATEGORY and _CATEGORIES.get(av, lambda c: False)(c):
+            return not negate
+    return negate
+
+
+def _char(code):
+    # unicode for the non-ASCII characters, so they can be joined with the ASCII ones
+    return compat.unichr(code) if code > 127 else chr(code)
+
+
+def _setChars(items):
+    '''
+    Characters of a set and its neighbours (the literals and the limits of the ranges), for the sets that don't match
+    any character of the ALPHABET ([\\xe0-\\xfc], [\\x80-\\xff], [^\\x00-\\x7f] etc).
+    '''
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            codes = [av, av + 1]
+        elif op == sre_constants.RANGE:
+            codes = [av[0], av[1], av[1] + 1]
+        else:
+            continue
+        for code in codes:
+            if code <= sys.maxunicode:
+                yield _char(code)
+
+
+def _chooseChar(accepts, rnd, fallbacks=()):
+    candidates = [c for c in ALPHABET if accepts(c)]
+    if not candidates:
+        candidates = [c for c in fallbacks if accepts(c)]
+    if not candidates:
+        raise Exception('There is no character of the alphabet that matches the regular expression.')
+    return rnd.choice(candidates) if rnd else candidates[0]
+
+
+def _generate(parsed, groups, rnd, extra):
+    result = []
+    for op, av in parsed:
+        if op == sre_constants.LITERAL:
+            result.append(_char(av))
+        elif op == sre_constants.NOT_LITERAL:
+            result.append(_chooseChar(lambda c: ord(c) != av, rnd))
+        elif op == sre_constants.ANY:
+            result.append(_chooseChar(lambda c: c != '\n', rnd))
+        elif op == sre_constants.IN:
+            result.append(_chooseChar(lambda c: _inSet(av, c), rnd, list(_setChars(av))))
+        elif op == sre_constants.BRANCH:
+            branches = av[1]
+            result.append(_generate(rnd.choice(branches) if rnd else branches[0], groups, rnd, extra))
+        elif op == sre_constants.SUBPATTERN:
+            value = _generate(av[-1], groups, rnd, extra)
+            if av[0] is not None:
+                groups[av[0]] = value
+            result.append(value)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            minimum, maximum, item = av
+            count = min(maximum, minimum + (rnd.randint(0, extra) if rnd else extra))
+            result.extend(_generate(item, groups, rnd, extra) for i in range(count))
+        elif op == sre_constants.GROUPREF:
+            result.append(groups.get(av, ''))
+        # AT (anchors), ASSERT and ASSERT_NOT (lookarounds) don't consume characters
+    return ''.join(result)
+
+
+def generate(pattern, rnd=None, extra=0):
+    '''
+    A string that matches the pattern, in most of the cases (lookarounds and conditional groups are ignored).
+    rnd = default None (the first alternative of each choice), random.Random to choose the characters and branches
+    extra = default 0, repetitions added to the minimum of each repeat (or the maximum of random ones if rnd is used)
+    The string is unicode if it has non-ASCII characters, except for a str pattern (bytes up to \\xff).
+    '''
+    value = _generate(sre_parse.parse(pattern), {}, rnd, min(extra, MAX_EXTRA_REPEAT))
+    text = compat.textType
+    if isinstance(value, text) and not isinstance(pattern, text) and all(ord(c) <= 255 for c in value):
+        value = value.encode('latin-1')
+    return value
+
+
+def _unique(values):
+    seen = set()
+    for value in values:
+        if value not in seen:
+            seen.add(value)
+            yield value
+
+
+def _like(value, character):
+    '''
+    The ASCII character with the type of value: bytes for a bytes pattern in Python 3.
+    '''
+    if isinstance(value, bytes) and not isinstance(character, bytes):
+        return character.encode('ascii')
+    return character
+
+
+def _nextCharacter(character):
+    '''
+    The next ASCII character, character is a string of length 1 (a slice, so a bytes is not indexed as an int).
+    '''
+    return _like(character, chr((ord(character) + 1) % 128))
+
+
+def matchingValues(pattern, count=3):
+    '''
+    Strings that match the pattern (re.match): the shortest one, the shortest one twice, the shortest one with an
+    extra character and one with more repetitions. Only the verified ones are returned.
+    '''
+    compiled = compilePattern(pattern)
+    shortest = generate(pattern)
+    nextChar = _nextCharacter(shortest[-1:]) if shortest else _like(shortest, 'a')
+    candidates = [shortest, 2 * shortest, shortest + nextChar, generate(pattern, extra=2)]
+    values = [value for value in _unique(candidates) if compiled.match(value)]
+    if not values:
+        raise Exception("It was not possible to generate a string that matches the regular expression '%s'" % pattern)
+    return values[:count]
+
+
+def nonMatchingValues(pattern, count=2):
+    '''
+    Strings that don't match the pattern in any position (re.search): the shortest matching string with its first
+    character changed (and twice), the empty string, the shortest matching string without its last character and
+    with each character replaced. Only the verified ones are returned, it can be empty ('a*' matches everything).
+    '''
+    compiled = compilePattern(pattern)
+    shortest = generate(pattern)
+    values = []
+    for value in _unique(_nonMatchingCandidates(shortest)):
+        if not compiled.search(value):
+            values.append(value)
+            if len(values) == count:
+                break
+    return values
+
+
+def _nonMatchingCandidates(shortest):
+    if shortest:
+        changed = _nextCharacter(shortest[:1]) + shortest[1:]
+        yield changed
+        yield 2 * changed
+    yield shortest[:0]
+    yield shortest[:-1]
+    for index in range(len(shortest)):
+        for c in ALPHABET:
+            yield shortest[:index] + _like(shortest, c) + shortest[index + 1:]
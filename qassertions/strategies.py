@@ -0,0 +1,183 @@
+'''
+Strategies used by assertValidation to combine the values of the ValidationTest arguments in test cases.
+
+OneAtATime: change one argument at a time, the others receive their good values (default)
+AllPairs: cover every pair of success values of two different arguments (NWise with strength 2)
+NWise: cover every combination of success values of n different arguments
+FullProduct: every combination of success values of all arguments, limited by a budget of cases
+
+The values of the domains can be lazy iterables (sweeps). OneAtATime consumes them as a stream, the strategies that
+combine the values materialize them.
+
+The failure values are always combined with the good values of the other arguments, since two invalid values in the
+same case could hide a missing validation.
+
+A domain is a tuple (index of the argument, success values, failure values).
+A case is a tuple (expectSuccess, tuple of arguments).
+'''
+
+import itertools
+
+from . import compat
+
+
+def failureCases(goodValues, domains):
+    for index, successValues, failureValues in domains:
+        values = list(goodValues)
+        for v in failureValues:
+            values[index] = v
+            yield False, tuple(values)
+
+
+def materialize(domains):
+    '''
+    The combinations use the values more than once, so the lazy ones (sweeps) are generated here.
+    '''
+    return [(index, tuple(successValues), tuple(failureValues)) for index, successValues, failureValues in domains]
+
+
+def withSuccessValues(domains):
+    return [domain for domain in domains if len(domain[1]) > 0]
+
+
+def combinationCases(goodValues, domains, rows):
+    '''
+    rows = list of indexes of success values, one index per domain
+    '''
+    if not domains:
+        return
+    for row in rows:
+        values = list(goodValues)
+        for (index, successValues, failureValues), valueIndex in zip(domains, row):
+            values[index] = successValues[valueIndex]
+        yield True, tuple(values)
+
+
+def coveringArray(sizes, strength=2):
+    '''
+    Return rows of indexes that cover all the combinations of values of any `strength` parameters, using the IPOG
+    (In-Parameter-Order-General) algorithm. The number of rows grows logarithmically with the number of parameters.
+    sizes = number of values of each parameter
+    '''
+    if len(sizes) <= strength:
+        return [list(row) for row in itertools.product(*[range(size) for size in sizes])]
+    rows = [list(row) for row in itertools.product(*[range(size) for size in sizes[:strength]])]
+    for parameter in range(strength, len(sizes)):
+        uncovered = set()
+        for params in itertools.combinations(range(parameter), strength - 1):
+            for values in itertools.product(*[range(sizes[p]) for p in params]):
+                for value in range(sizes[parameter]):
+                    uncovered.add((params, values + (value,)))
+
+        # Horizontal growth: the new parameter receives the value that covers more combinations in each row (or None)
+        for row in rows:
+            bestValue, bestCovered = None, set()
+            for value in range(sizes[parameter]):
+                covered = set()
+                for params in itertools.combinations(range(parameter), strength - 1):
+                    values = tuple(row[p] for p in params)
+                    if None not in values and (params, values + (value,)) in uncovered:
+                        covered.add((params, values + (value,)))
+                if len(covered) > len(bestCovered):
+                    bestValue, bestCovered = value, covered
+            row.append(bestValue)
+            uncovered -= bestCovered
+
+        # Vertical growth: the combinations not covered yet fill the don't care values (None) or create new rows
+        for params, values in sorted(uncovered):
+            params = params + (parameter,)
+            for row in rows:
+                if all(row[p] is None or row[p] == v for p, v in zip(params, values)):
+                    break
+            else:
+                row = [None] * (parameter + 1)
+                rows.append(row)
+            for p, v in zip(params, values):
+                row[p] = v
+    return [[v if v is not None else 0 for v in row] for row in rows]
+
+
+class OneAtATime(object):
+    '''
+    Change the value of one argument at a time, the other arguments receive their good values.
+    '''
+
+    def generateCases(self, goodValues, domains):
+        for index, successValues, failureValues in domains:
+            values = list(goodValues)
+            for v in successValues:
+                values[index] = v
+                yield True, tuple(values)
+            for v in failureValues:
+                values[index] = v
+                yield False, tuple(values)
+
+
+class NWise(object):
+    '''
+    Properties:
+    strength = default 2, number of arguments that have all the combinations of their success values covered
+    '''
+
+    def __init__(self, strength=2):
+        if strength < 1: raise Exception('The strength must be greater than 0.')
+        self.strength = strength
+
+    def generateCases(self, goodValues, domains):
+        domains = materialize(domains)
+        successDomains = withSuccessValues(domains)
+        rows = coveringArray([len(successValues) for index, successValues, failureValues in successDomains], self.strength)
+        for case in combinationCases(goodValues, successDomains, rows):
+            yield case
+        for case in failureCases(goodValues, domains):
+            yield case
+
+
+class AllPairs(NWise):
+    def __init__(self):
+        super(AllPairs, self).__init__(2)
+
+
+class FullProduct(object):
+    '''
+    Properties:
+    budget = default 1000, maximum number of cases. It raises an exception instead of run more cases than the budget.
+    '''
+
+    def __init__(self, budget=1000):
+        self.budget = budget
+
+    def generateCases(self, goodValues, domains):
+        domains = materialize(domains)
+        successDomains = withSuccessValues(domains)
+        total = 1
+        for index, successValues, failureValues in successDomains:
+            total = total * len(successValues)
+        total = total + sum(len(failureValues) for index, successValues, failureValues in domains)
+        if total > self.budget:
+            raise Exception('The full product has %s cases, more than the budget of %s cases.' % (total, self.budget))
+        rows = itertools.product(*[range(len(successValues)) for index, successValues, failureValues in successDomains])
+        for case in combinationCases(goodValues, successDomains, rows):
+            yield case
+        for case in failureCases(goodValues, domains):
+            yield case
+
+
+STRATEGIES = {
+    'oneatatime': OneAtATime,
+    'allpairs': AllPairs,
+    'product': FullProduct,
+}
+
+
+def getStrategy(strategy=None):
+    '''
+    strategy = None, 'oneatatime', 'allpairs', 'product' or a strategy instance
+    '''
+    if strategy is None:
+        strategy = 'oneatatime'
+    if not isinstance(strategy, compat.stringTypes):
+        return strategy
+    if strategy not in STRATEGIES:
+        raise Exception("Invalid strategy '%s', use one of: %s" % (strategy, ', '.join(sorted(STRATEGIES.keys()))))
+    return STRATEGIES[strategy]()
@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import qassertions as qa
+from qassertions import baselines
+from qassertions.baselines import *
+
+
+def recordValues(path, count):
+    store = BaselineStore(path, fingerprint='machine1')
+    for i in range(count):
+        store.record('test1', i, 'median')
+
+
+class BaselinesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'baselines.json')
+        self.store = BaselineStore(self.path, fingerprint='machine1')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+class BaselineStoreTests(BaselinesTestCase):
+    def testEmptyStore(self):
+        self.assertEqual(None, self.store.get('test1'))
+
+    def testFirstRecordIsTheBaseline(self):
+        self.store.record('test1', 0.5, 'median')
+        self.store.record('test1', 0.7, 'median')
+        self.assertEqual({'baseline': 0.5, 'statistic': 'median', 'history': [0.5, 0.7]}, self.store.get('test1'))
+
+    def testUpdate(self):
+        self.store.record('test1', 0.5, 'median')
+        self.store.record('test1', 0.7, 'median', update=True)
+        self.assertEqual(0.7, self.store.get('test1')['baseline'])
+
+    def testAnotherStatisticReplacesTheBaseline(self):
+        self.store.record('test1', 0.5, 'median')
+        self.store.record('test1', 0.7, 'p95')
+        self.assertEqual(0.7, self.store.get('test1')['baseline'])
+        self.assertEqual('p95', self.store.get('test1')['statistic'])
+
+    def testBaselinesAreByMachine(self):
+        self.store.record('test1', 0.5, 'median')
+        self.assertEqual(None, BaselineStore(self.path, fingerprint='machine2').get('test1'))
+        self.assertEqual(0.5, BaselineStore(self.path, fingerprint='machine1').get('test1')['baseline'])
+
+    def testHistorySize(self):
+        for i in range(HISTORY_SIZE + 5):
+            self.store.record('test1', i, 'median')
+        self.assertEqual(list(range(5, HISTORY_SIZE + 5)), self.store.get('test1')['history'])
+
+    def testDelete(self):
+        self.store.record('test1', 0.5, 'median')
+        self.store.delete('test1')
+        self.assertEqual(None, self.store.get('test1'))
+
+    def testParallelUpdatesAreNotLost(self):
+        processes = [multiprocessing.Process(target=recordValues, args=(self.path, 10)) for i in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(40, len(self.store.get('test1')['history']))
+
+    def testDefaultPathIsInTheHomeDirectory(self):
+        path = os.environ.pop('QASSERTIONS_BASELINES_FILE', None)
+        try:
+            self.assertEqual(os.path.expanduser('~/.qassertions-baselines.json'), BaselineStore().path)
+        finally:
+            if path is not None:
+                os.environ['QASSERTIONS_BASELINES_FILE'] = path
+
+    def testSubmit(self):
+        self.assertEqual(None, self.store.submit('test1', 0.5, 'median')[1])
+        entry, message = self.store.submit('test1', 1.0, 'median', tolerance=0.5)
+        self.assertEqual('This method is 100.0% slower than the baseline: median of 1.0 > 0.75 (baseline 0.5 + 50.0%)', message)
+        self.assertEqual([0.5, 1.0], entry['history'])
+        self.assertEqual(None, self.store.submit('test1', 1.0, 'median', mode='record')[1])
+
+    def testMachineFingerprint(self):
+        self.assertEqual(machineFingerprint(), machineFingerprint())
+        self.assertEqual(16, len(machineFingerprint()))
+
+    def testInvalidMode(self):
+        qa.assertExceptionMessage("Invalid baseline mode 'xpto', use one of: compare, record, update", getMode, 'xpto')
+
+
+class CommandLineTests(BaselinesTestCase):
+    def main(self, *argv):
+        return baselines.main(['--file', self.path] + list(argv))
+
+    def get(self, testId):
+        return BaselineStore(self.path).get(testId) # the command line uses the fingerprint of this machine
+
+    def testRecordAndCompare(self):
+        self.assertEqual(0, self.main('record', 'test1', '0.5'))
+        self.assertEqual(0, self.main('compare', 'test1', '0.55'))
+        self.assertEqual(1, self.main('compare', 'test1', '0.6'))
+        self.assertEqual(0, self.main('compare', 'test1', '0.6', '--tolerance', '0.5'))
+        self.assertEqual(0.5, self.get('test1')['baseline'])
+
+    def testUpdate(self):
+        self.main('record', 'test1', '0.5')
+        self.assertEqual(0, self.main('update', 'test1', '0.7', '--statistic', 'median'))
+        self.assertEqual(0.7, self.get('test1')['baseline'])
+
+    def testDelete(self):
+        self.main('record', 'test1', '0.5')
+        self.assertEqual(0, self.main('delete', 'test1'))
+        self.assertEqual(None, self.get('test1'))
+
+    def testInvalidCommand(self):
+        self.assertEqual(2, self.main('xpto'))
+
+
+class AssertBaselineTests(BaselinesTestCase):
+    def testFirstExecutionRecordsTheBaseline(self):
+        qa.assertBaseline('test1', lambda: None, store=self.store, repeat=3)
+        self.assertEqual(1, len(self.store.get('test1')['history']))
+
+    def testSlowerThanTheBaseline(self):
+        self.store.record('test1', 0.01, 'median')
+        qa.assertExceptionMessage(r"This method is [...]% slower than the baseline: median of [...] > 0.0115 \(baseline 0.01 \+ 15.0%\)",
+                                  qa.assertBaseline, 'test1', time.sleep, 0.05, store=self.store, warmup=0, repeat=1)
+
+    def testTolerance(self):
+        self.store.record('test1', 0.04, 'median')
+        qa.assertBaseline('test1', time.sleep, 0.05, store=self.store, warmup=0, repeat=1, tolerance=2)
+
+    def testRecordModeDontCompare(self):
+        self.store.record('test1', 0.01, 'median')
+        qa.assertBaseline('test1', time.sleep, 0.05, store=self.store, warmup=0, repeat=1, mode='record')
+        self.assertEqual(0.01, self.store.get('test1')['baseline'])
+
+    def testUpdateMode(self):
+        self.store.record('test1', 0.01, 'median')
+        qa.assertBaseline('test1', time.sleep, 0.05, store=self.store, warmup=0, repeat=1, mode='update')
+        self.assertTrue(self.store.get('test1')['baseline'] >= 0.05)
+
+    def testPathOfTheStore(self):
+        qa.assertBaseline('test1', lambda: None, store=self.path, repeat=1)
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import time
+import unittest
+
+import qassertions as qa
+from qassertions.calibration import *
+
+
+class CalibrationTests(unittest.TestCase):
+    def setUp(self):
+        resetCalibration()
+        self.environ = os.environ.get('QASSERTIONS_SPEED_FACTOR')
+
+    def tearDown(self):
+        if self.environ is None:
+            os.environ.pop('QASSERTIONS_SPEED_FACTOR', None)
+        else:
+            os.environ['QASSERTIONS_SPEED_FACTOR'] = self.environ
+        resetCalibration()
+
+    def testCalibrate(self):
+        self.assertTrue(calibrate(repetitions=1) > 0)
+
+    def testSpeedFactorIsCalculatedOncePerProcess(self):
+        factor = speedFactor()
+        os.environ['QASSERTIONS_SPEED_FACTOR'] = '7'
+        self.assertEqual(factor, speedFactor())
+        resetCalibration()
+        self.assertEqual(7, speedFactor())
+
+    def testReference(self):
+        os.environ['QASSERTIONS_SPEED_FACTOR'] = '2.5'
+        self.assertEqual(1.25, Reference(0.5).seconds())
+        self.assertEqual(1.25, toSeconds(Reference(0.5)))
+        self.assertEqual(0.5, toSeconds(0.5))
+
+    def testAssertPerformanceWithReferenceTimeout(self):
+        os.environ['QASSERTIONS_SPEED_FACTOR'] = '0.5'
+        qa.assertPerformance(Reference(0.4), time.sleep, 0.1)
+        qa.assertExceptionMessage("This method is too slow: [...]",
+                                  qa.assertPerformance, Reference(0.3), time.sleep, 0.2)
+
+    def testAssertBenchmarkWithReferenceTimeout(self):
+        os.environ['QASSERTIONS_SPEED_FACTOR'] = '10'
+        qa.assertBenchmark(Reference(0.01), time.sleep, 0.05, warmup=0, repeat=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import math
+import random
+import time
+import unittest
+
+import qassertions as qa
+from qassertions import complexity
+from qassertions.complexity import *
+
+
+SIZES = [1000, 2000, 4000, 8000, 16000, 32000]
+
+
+class FitComplexityTests(unittest.TestCase):
+    def fit(self, f, noise=0.0):
+        timings = [0.001 + f(n) * (1 + (noise if i % 2 else -noise)) for i, n in enumerate(SIZES)]
+        return fitComplexity(SIZES, timings).complexity()
+
+    def testExactCurves(self):
+        self.assertEqual('O(1)', self.fit(lambda n: 0))
+        self.assertEqual('O(log n)', self.fit(lambda n: 1e-4 * math.log(n)))
+        self.assertEqual('O(n)', self.fit(lambda n: 1e-7 * n))
+        self.assertEqual('O(n log n)', self.fit(lambda n: 1e-8 * n * math.log(n)))
+        self.assertEqual('O(n^2)', self.fit(lambda n: 1e-10 * n * n))
+
+    def testNoisyCurves(self):
+        self.assertEqual('O(1)', self.fit(lambda n: 0.001, 0.05))
+        self.assertEqual('O(n)', self.fit(lambda n: 1e-7 * n, 0.05))
+        self.assertEqual('O(n^2)', self.fit(lambda n: 1e-10 * n * n, 0.05))
+
+    def testLinearAndLinearithmicAreNotToldApart(self):
+        self.assertEqual('O(n)', self.fit(lambda n: 1e-8 * n * math.log(n), 0.05))
+
+    def testNoiseIsNotPromoted(self):
+        # The last timing is 5% slower: O(n^2) fits better, but not significantly
+        self.assertEqual('O(1)', fitComplexity(SIZES, [1.0, 1.01, 0.99, 1.0, 1.0, 1.05]).complexity())
+
+    def testSmallGrowthIsIgnored(self):
+        # A perfect linear fit, but the timing grows only 5%
+        timings = [1.0 + 0.05 * (n - SIZES[0]) / (SIZES[-1] - SIZES[0]) for n in SIZES]
+        self.assertEqual('O(1)', fitComplexity(SIZES, timings).complexity())
+
+    def testReport(self):
+        result = fitComplexity([1, 2, 3], [0.5, 1.0, 1.5])
+        lines = result.report().split('\n')
+        self.assertEqual(['best fit: O(n)', 'n=1: 500ms', 'n=2: 1s', 'n=3: 1.5s'], lines[:4])
+        self.assertEqual(9, len(lines))
+
+    def testInvalidSizes(self):
+        qa.assertExceptionMessage('The complexity needs at least 3 input sizes.', fitComplexity, [1, 2], [1, 2])
+        qa.assertExceptionMessage('The input sizes must be greater than 0.', fitComplexity, [0, 1, 2], [1, 2, 3])
+
+
+class IsSignificantTests(unittest.TestCase):
+    def testSignificance(self):
+        self.assertTrue(isSignificant(0.5, 0.01, 5))
+        self.assertTrue(isSignificant(0.5, 0.0, 5))
+        self.assertFalse(isSignificant(0.02, 0.015, 5))
+        self.assertFalse(isSignificant(0.01, 0.02, 5))
+        self.assertFalse(isSignificant(0.0, 0.0, 5))
+
+    def testMoreSizesDetectSmallerImprovements(self):
+        self.assertFalse(isSignificant(0.02, 0.01, 5))
+        self.assertTrue(isSignificant(0.02, 0.01, 30))
+
+
+class VirtualClock(object):
+    '''
+    A clock that only advances when the measured method spends time on it, so the timings don't depend on the load
+    of the machine. noise = maximum slowdown of each call (0.5 is 50%), seeded.
+    '''
+
+    def __init__(self, noise=0.0, seed=0):
+        self.now = 0.0
+        self.noise = noise
+        self.rnd = random.Random(seed)
+
+    def __call__(self):
+        return self.now
+
+    def spend(self, seconds):
+        self.now += seconds * (1 + self.rnd.uniform(0, self.noise))
+
+
+class AssertComplexityTests(unittest.TestCase):
+    def useClock(self, clock):
+        complexity.CLOCKS['virtual'] = clock
+        self.addCleanup(complexity.CLOCKS.pop, 'virtual', None)
+        return clock
+
+    def testLinearMethod(self):
+        clock = self.useClock(VirtualClock())
+        result = qa.assertComplexity('O(n)', lambda values: clock.spend(len(values) * 1e-7),
+                                     [1000, 2000, 4000, 8000, 16000], setup=range, clock='virtual')
+        self.assertTrue(result.best <= complexity.getComplexity('O(n)'))
+
+    def testTheResultIsStable(self):
+        for seed in range(10):
+            clock = self.useClock(VirtualClock(noise=0.5, seed=seed))
+            self.assertEqual('O(1)', qa.assertComplexity('O(n^2)', lambda n: clock.spend(0.001),
+                                                          [1000, 2000, 4000, 8000, 16000], clock='virtual').complexity())
+            clock = self.useClock(VirtualClock(noise=0.5, seed=seed))
+            result = qa.assertComplexity('O(n^2)', lambda values: clock.spend(len(values) * 1e-7),
+                                         [1000, 2000, 4000, 8000, 16000], setup=range, clock='virtual')
+            self.assertEqual('O(n)', result.complexity())
+
+    def testQuadraticMethod(self):
+        clock = self.useClock(VirtualClock(noise=0.5))
+        qa.assertExceptionMessage('This method is slower than O\\(n\\): O\\(n\\^2\\)\nbest fit: O\\(n\\^2\\)',
+                                  qa.assertComplexity, 'O(n)', lambda n: clock.spend(n * n * 1e-8),
+                                  [100, 200, 300, 400, 500], repeat=3, clock='virtual')
+
+    def testTheTimeWaitingIsMeasured(self):
+        startTime = time.time()
+        result = qa.assertComplexity('O(n)', lambda n: time.sleep(n * 1e-5), [100, 200, 400, 800], repeat=2)
+        self.assertTrue(time.time() - startTime < 5)
+        self.assertTrue(result.timings[-1] >= 0.008, result.timings)
+        self.assertEqual('O(n)', result.complexity())
+
+    def testCPUClock(self):
+        result = qa.assertComplexity('O(n)', lambda values: sum(values), [1000, 2000, 4000, 8000, 16000], setup=range,
+                                     clock='cpu')
+        self.assertEqual('O(n)', result.complexity())
+        startTime = time.time()
+        result = qa.assertComplexity('O(n^2)', lambda n: time.sleep(n * 1e-5), [100, 200, 400, 800], repeat=2,
+                                     clock='cpu')
+        self.assertTrue(time.time() - startTime < 5) # the calls are not multiplied to fill the CPU time
+        self.assertTrue(result.timings[-1] < 0.008, result.timings)
+
+    def testInvalidClock(self):
+        qa.assertExceptionMessage("Invalid clock 'xpto', use one of: cpu, wall",
+                                  qa.assertComplexity, 'O(n)', len, [1, 2, 3], clock='xpto')
+
+    def testSetupIsNotMeasured(self):
+        def setup(n):
+            return [0] * (n * n)
+        qa.assertComplexity('O(1)', lambda values: values[0] + sum(range(20000)), [100, 200, 400, 800], setup=setup)
+
+    def testInvalidComplexity(self):
+        qa.assertExceptionMessage("Invalid complexity 'O\\(n\\^3\\)', use one of: O\\(1\\), O\\(log n\\), O\\(n\\), O\\(n log n\\), O\\(n\\^2\\)",
+                                  qa.assertComplexity, 'O(n^3)', len, [1, 2, 3])
+
+    def testBuggedMethod(self):
+        def bugged(n):
+            raise Exception('ops')
+        qa.assertExceptionMessage('This method is bugged, It impossible to measure the performance: ops',
+                                  qa.assertComplexity, 'O(n)', bugged, [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import subprocess
+import time
+import types
+import unittest
+
+import qassertions as qa
+from qassertions import coroutines
+from qassertions import Min
+
+try:
+    from shutil import which
+except ImportError: # Python 2
+    from distutils.spawn import find_executable as which
+
+asyncio = coroutines.asyncio
+PYTHON3 = which('python3')
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(coroutines.__file__)))
+
+
+def failing_coroutine(msg):
+    yield
+    raise Exception(msg)
+
+if asyncio is not None:
+    failing_coroutine = types.coroutine(failing_coroutine)
+    # async def is a syntax error in Python 2
+    namespace = {'asyncio': asyncio}
+    exec('async def sleeping_coroutine(seconds):\n    await asyncio.sleep(seconds)\n', namespace)
+    sleeping_coroutine = namespace['sleeping_coroutine']
+
+
+def some_async_method(value1):
+    if value1 < 7: return failing_coroutine('ops')
+    return asyncio.sleep(0.1)
+
+
+@unittest.skipIf(asyncio is not None, 'asyncio is available')
+class AsyncioNotAvailableTests(unittest.TestCase):
+    def testAsyncioExecutor(self):
+        qa.assertExceptionMessage('asyncio is not available, use Python 3.5 or newer.',
+                                  qa.assertValidation, lambda v: None, Min(7), executor='asyncio')
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class RunTests(unittest.TestCase):
+    def testRun(self):
+        self.assertEqual(5, coroutines.run(asyncio.sleep(0.01, result=5)))
+
+    def testTimeout(self):
+        self.assertRaises(asyncio.TimeoutError, coroutines.run, asyncio.sleep(1), 0.05)
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class AsyncAssertionsTests(unittest.TestCase):
+    def testAssertDontRaiseAnException(self):
+        qa.assertDontRaiseAnException(some_async_method, 7)
+        qa.assertExceptionMessage('ops', some_async_method, 6)
+
+    def testAssertValidation(self):
+        qa.assertValidation(some_async_method, Min(7))
+
+    def testAssertValidationWithAsyncioExecutor(self):
+        start = time.time()
+        qa.assertValidation(some_async_method, Min(7), executor='asyncio')
+        self.assertTrue(time.time() - start < 0.3)
+
+    def testAssertValidationWithAsyncioExecutorFailure(self):
+        def some_bugged_method(value1):
+            if value1 < 6: return failing_coroutine('ops')
+            return asyncio.sleep(0.01)
+        qa.assertExceptionMessage("Unexpected success for the combination of arguments:\n> 6",
+                                  qa.assertValidation, some_bugged_method, Min(7), executor='asyncio', workers=2)
+
+    def testAssertPerformance(self):
+        qa.assertPerformance(0.5, sleeping_coroutine, 0.1)
+
+    def testAssertPerformanceCancelsTheCoroutine(self):
+        start = time.time()
+        qa.assertExceptionMessage('This method is too slow: [...]',
+                                  qa.assertPerformance, 0.1, sleeping_coroutine, 10)
+        self.assertTrue(time.time() - start < 1)
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class RunLoadTests(unittest.TestCase):
+    def testCallsAreConcurrent(self):
+        claims = iter([True] * 6 + [False] * 10)
+        startTime = time.time()
+        results = coroutines.runLoad(lambda: sleeping_coroutine(0.1), 3, lambda: next(claims))
+        self.assertEqual(6, len(results))
+        self.assertTrue(time.time() - startTime < 0.3)
+        self.assertTrue(all(latency >= 0.09 and error is None for latency, error in results), results)
+
+    def testErrors(self):
+        claims = iter([True] * 2 + [False] * 10)
+        results = coroutines.runLoad(lambda: failing_coroutine('ops'), 2, lambda: next(claims))
+        self.assertEqual(['ops', 'ops'], [error for latency, error in results])
+
+    def testAssertThroughput(self):
+        result = qa.assertThroughput(sleeping_coroutine, 0.05, executor='asyncio', calls=20, concurrency=10)
+        self.assertEqual(20, result.calls())
+        self.assertTrue(result.elapsed < 0.2, result.elapsed)
+
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class MapConcurrentlyTests(unittest.TestCase):
+    def testMapConcurrentlyIsLazyAndOrdered(self):
+        consumed = []
+        def items():
+            for i in range(10 ** 9):
+                consumed.append(i)
+                yield i
+        def func(i):
+            if i % 2: return i
+            return coroutines.Deferred(asyncio.sleep(0.01 * (i % 3)), lambda error, i=i: (i, error))
+        results = coroutines.mapConcurrently(func, items(), limit=4)
+        first = [next(results) for i in range(6)]
+        results.close()
+        self.assertEqual([(0, None), 1, (2, None), 3, (4, None), 5], first)
+        self.assertTrue(len(consumed) <= coroutines.WINDOW + 6, len(consumed))
+
+    def testMapConcurrentlyLimit(self):
+        namespace = {'asyncio': asyncio, 'running': [0, 0]}
+        exec('''
+async def job():
+    running[0] += 1
+    running[1] = max(running)
+    await asyncio.sleep(0.05)
+    running[0] -= 1
+''', namespace)
+        start = time.time()
+        list(coroutines.mapConcurrently(lambda i: coroutines.Deferred(namespace['job'](), lambda error: error),
+                                        range(8), limit=4))
+        elapsed = time.time() - start
+        self.assertEqual(4, namespace['running'][1])
+        self.assertTrue(0.1 <= elapsed < 0.2, elapsed)
+
+    def testClosingMapConcurrentlyCancelsTheAwaitables(self):
+        errors = []
+        results = coroutines.mapConcurrently(
+            lambda i: coroutines.Deferred(asyncio.sleep(i and 10), lambda error: errors.append(error)), range(3),
+            window=3)
+        next(results)
+        results.close()
+        self.assertEqual([None], errors) # the cancelled ones are not reported
+
+
+@unittest.skipIf(asyncio is not None or PYTHON3 is None, 'asyncio is available or there is no python3')
+class Python3Tests(unittest.TestCase):
+    '''
+    The tests of the coroutine functions need asyncio, so they are executed by a python3 process when the suite runs in
+    Python 2.
+    '''
+
+    def testCoroutinesInPython3(self):
+        process = subprocess.Popen([PYTHON3, '-m', 'unittest', '-v', __name__], cwd=ROOT_DIR,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        output = process.communicate()[0].decode('utf-8', 'replace')
+        self.assertEqual(0, process.returncode, output)
+        self.assertFalse("skipped 'asyncio is not available'" in output, output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import json
+import os
+import tempfile
+import unittest
+
+import qassertions as qa
+from qassertions import instrumentation, memory_assertions, pattern_assertions
+from qassertions.instrumentation import *
+
+
+def validMethod(value):
+    if value < 1: raise Exception('invalid')
+
+
+class RecordingListener(Listener):
+    def __init__(self):
+        self.events = []
+
+    def start(self, name, category, timestamp, args):
+        self.events.append(('start', name, category, timestamp))
+
+    def end(self, name, category, timestamp, args):
+        self.events.append(('end', name, category, timestamp))
+
+    def names(self, phase):
+        return [event[1] for event in self.events if event[0] == phase]
+
+
+class ListenersTests(unittest.TestCase):
+    def tearDown(self):
+        clearListeners()
+
+    def testWithoutListenersNothingIsWrapped(self):
+        self.assertTrue(span('report') is NULL_SPAN)
+        cases = [1, 2]
+        self.assertTrue(traceIterator(cases, 'generateCase') is cases)
+
+    def testAddAndRemoveListener(self):
+        listener = RecordingListener()
+        addListener(listener)
+        with span('step', 'test'):
+            pass
+        removeListener(listener)
+        with span('step', 'test'):
+            pass
+        self.assertEqual(['step'], listener.names('start'))
+        self.assertEqual(['step'], listener.names('end'))
+
+    def testListening(self):
+        with listening(RecordingListener()) as listener:
+            self.assertEqual([listener], instrumentation.listeners)
+        self.assertEqual([], instrumentation.listeners)
+
+    def testTimestampsAreMonotonic(self):
+        with listening(RecordingListener()) as listener:
+            with span('outer'):
+                with span('inner'):
+                    pass
+        timestamps = [event[3] for event in listener.events]
+        self.assertEqual(sorted(timestamps), timestamps)
+        self.assertEqual(['outer', 'inner'], listener.names('start'))
+        self.assertEqual(['inner', 'outer'], listener.names('end'))
+
+    def testErrorIsSentToTheEnd(self):
+        errors = []
+        class ErrorListener(Listener):
+            def end(self, name, category, timestamp, args):
+                errors.append(args.get('error'))
+        with listening(ErrorListener()):
+            try:
+                with span('step'):
+                    raise ValueError('xpto')
+            except ValueError:
+                pass
+        self.assertEqual(['ValueError'], errors)
+
+    def testTraceIterator(self):
+        with listening(RecordingListener()) as listener:
+            self.assertEqual([1, 2], list(traceIterator([1, 2], 'item')))
+        self.assertEqual(['item'] * 3, listener.names('start')) # the last one is the end of the iteration
+        self.assertEqual(['item'] * 3, listener.names('end'))
+
+    def testInstrumented(self):
+        @instrumented('test')
+        def method(a, b=1):
+            return a + b
+        self.assertEqual('method', method.__name__)
+        self.assertEqual(3, method(1, b=2))
+        with listening(RecordingListener()) as listener:
+            self.assertEqual(2, method(1))
+        self.assertEqual([('start', 'method', 'test'), ('end', 'method', 'test')], [e[:3] for e in listener.events])
+        self.assertEqual('method', method.__wrapped__.__name__)
+
+
+class AssertionsHooksTests(unittest.TestCase):
+    def testAssertValidation(self):
+        with listening(Aggregator()) as aggregator:
+            qa.assertValidation(validMethod, qa.Min(1))
+        self.assertEqual(1, aggregator.get('assertValidation', 'assertion').count)
+        generated = aggregator.get('generateCase', 'validation').count # the cases + the end of the generator
+        self.assertTrue(generated > 1)
+        self.assertEqual(generated, aggregator.get('executeCase', 'validation').count) # the cases + the good values
+        self.assertEqual(None, aggregator.get('report'))
+
+    def testReportOfTheFailure(self):
+        with listening(Aggregator()) as aggregator:
+            self.assertRaises(AssertionError, qa.assertValidation, lambda value: None, qa.Min(1))
+        self.assertEqual(1, aggregator.get('report', 'validation').count)
+
+    def testAssertRandomValidation(self):
+        with listening(Aggregator()) as aggregator:
+            qa.assertRandomValidation(validMethod, qa.Min(1), cases=10)
+        self.assertEqual(1, aggregator.get('assertRandomValidation').count)
+        self.assertEqual(11, aggregator.get('executeCase').count)
+
+    def testListAssertions(self):
+        with listening(Aggregator()) as aggregator:
+            qa.assertListIsSorted([1, 2, 3])
+            qa.assertListIsNotSorted([2, 1])
+        self.assertEqual(1, aggregator.get('assertListIsSorted').count)
+        self.assertEqual(1, aggregator.get('assertListIsNotSorted').count)
+
+    def testAssertPerformance(self):
+        with listening(Aggregator()) as aggregator:
+            qa.assertPerformance(1, lambda: None)
+        self.assertEqual(1, aggregator.get('assertPerformance', 'assertion').count)
+
+    def testVectorizedValidation(self):
+        with listening(Aggregator()) as aggregator:
+            qa.assertValidation(lambda values: [value >= 1 for value in values], qa.Min(1), vectorized=[0], vectorize=list)
+        self.assertEqual(3, aggregator.get('executeCase', 'validation').count) # the good values, successes, failures
+
+    def testEveryAssertionIsInstrumented(self):
+        for module in [qa, memory_assertions, pattern_assertions]:
+            for name in dir(module):
+                if name.startswith('assert') and getattr(getattr(module, name), '__module__', None) == module.__name__:
+                    self.assertTrue(hasattr(getattr(module, name), '__wrapped__'), '%s.%s' % (module.__name__, name))
+
+
+class AggregatorTests(unittest.TestCase):
+    def testStatistics(self):
+        aggregator = Aggregator()
+        for duration in [1.0, 3.0]:
+            aggregator.start('step', 'test', 10.0, {})
+            aggregator.end('step', 'test', 10.0 + duration, {})
+        statistics = aggregator.get('step', 'test')
+        self.assertEqual(2, statistics.count)
+        self.assertEqual(4.0, statistics.total)
+        self.assertEqual(2.0, statistics.mean())
+        self.assertEqual(1.0, statistics.min)
+        self.assertEqual(3.0, statistics.max)
+        self.assertEqual(None, aggregator.get('step', 'other'))
+        self.assertEqual('test/step: count=2 total=4s mean=2s min=1s max=3s', aggregator.report())
+
+    def testEndWithoutStartIsIgnored(self):
+        aggregator = Aggregator()
+        aggregator.end('step', 'test', 1.0, {})
+        self.assertEqual({}, aggregator.statistics)
+
+
+class ChromeTraceExporterTests(unittest.TestCase):
+    def testEvents(self):
+        exporter = ChromeTraceExporter()
+        exporter.start('step', 'test', 1.5, {'size': 3})
+        exporter.end('step', 'test', 2.0, {})
+        trace = json.loads(exporter.toJSON())
+        events = trace['traceEvents']
+        self.assertEqual(['B', 'E'], [event['ph'] for event in events])
+        self.assertEqual([1500000.0, 2000000.0], [event['ts'] for event in events])
+        self.assertEqual({'size': '3'}, events[0]['args'])
+        self.assertEqual(os.getpid(), events[0]['pid'])
+        self.assertEqual(events[0]['tid'], events[1]['tid'])
+
+    def testSaveOnClose(self):
+        path = os.path.join(tempfile.mkdtemp(), 'trace.json')
+        with listening(ChromeTraceExporter(path)) as exporter:
+            qa.assertValidation(validMethod, qa.Min(1))
+        exporter.close()
+        with open(path) as f:
+            events = json.load(f)['traceEvents']
+        self.assertEqual('assertValidation', events[0]['name'])
+        self.assertEqual('E', events[-1]['ph'])
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+import qassertions as qa
+from qassertions import memory_assertions as ma
+from qassertions.memory_assertions import *
+
+
+class MemoryResultTests(unittest.TestCase):
+    def testReport(self):
+        result = MemoryResult(300, 200, 3, [('a.py:1', 150, 2), ('b.py:2', 50, 1)])
+        self.assertEqual('peak=300 bytes, retained=200 bytes in 3 blocks\na.py:1: 150 bytes in 2 blocks\nb.py:2: 50 bytes in 1 blocks',
+                          str(result))
+
+    def testWorstResult(self):
+        result = worstResult([MemoryResult(300, 100, 3, [('a.py:1', 100, 3)]),
+                              MemoryResult(200, 150, 1, [('b.py:2', 150, 1)])])
+        self.assertEqual(300, result.peak)
+        self.assertEqual(150, result.retained)
+        self.assertEqual(3, result.retainedBlocks)
+        self.assertEqual([('b.py:2', 150, 1)], result.topStats)
+
+
+class CheckMemoryBudgetTests(unittest.TestCase):
+    def setUp(self):
+        self.result = MemoryResult(300, 200, 3, [('a.py:1', 200, 3)])
+
+    def testInsideOfTheBudgets(self):
+        checkMemoryBudget(self.result)
+        checkMemoryBudget(self.result, peak=300, retained=200, retainedBlocks=3)
+
+    def testOutsideOfTheBudgets(self):
+        qa.assertExceptionMessage('This method uses too much memory: peak of 300 bytes > 299 bytes, retained 3 blocks > 2 blocks\npeak=300 [...]\na.py:1: 200 bytes in 3 blocks',
+                                  checkMemoryBudget, self.result, peak=299, retained=200, retainedBlocks=2)
+
+
+class AssertMemoryTests(unittest.TestCase):
+    def testInvalidBackend(self):
+        qa.assertExceptionMessage("Invalid backend 'xpto', use None or 'process'",
+                                  ma.assertMemory, lambda: None, backend='xpto')
+
+    @unittest.skipIf(ma.tracemalloc is not None, 'tracemalloc is available')
+    def testTracemallocNotAvailable(self):
+        qa.assertExceptionMessage(r'tracemalloc is not available, use Python 3.4 or newer \(or pytracemalloc\).',
+                                  ma.assertMemory, lambda: None)
+        qa.assertExceptionMessage(r'tracemalloc is not available, use Python 3.4 or newer \(or pytracemalloc\).',
+                                  ma.assertPeakMemory, 1000, lambda: None, backend='process')
+        qa.assertExceptionMessage(r'tracemalloc is not available, use Python 3.4 or newer \(or pytracemalloc\).',
+                                  ma.measureMemory, lambda: None)
+
+    @unittest.skipIf(ma.tracemalloc is None, 'tracemalloc is not available')
+    def testRetainedMemory(self):
+        leak = []
+        def some_leaking_method():
+            leak.append(' ' * 100000)
+        result = ma.assertRetainedMemory(200000, some_leaking_method)
+        self.assertTrue(result.retained >= 100000)
+        qa.assertExceptionMessage('This method uses too much memory: retained [...] bytes > 1000 bytes[...]',
+                                  ma.assertRetainedMemory, 1000, some_leaking_method)
+
+    @unittest.skipIf(ma.tracemalloc is None, 'tracemalloc is not available')
+    def testRetainedBytesAndBlocksComeFromTheSameSnapshots(self):
+        result = ma.measureMemory(lambda: None)
+        # The interpreter can allocate a few blocks in the call of the method (Python 3.12+)
+        self.assertTrue(0 <= result.retained < 1000, result)
+        self.assertEqual(result.retained == 0, result.retainedBlocks == 0, result)
+        leak = []
+        result = ma.measureMemory(lambda: leak.append(' ' * 100000))
+        self.assertTrue(100000 <= result.retained <= sum(size for site, size, count in result.topStats), result)
+
+    @unittest.skipIf(ma.tracemalloc is None, 'tracemalloc is not available')
+    def testPeakMemory(self):
+        def some_method():
+            return len(' ' * 1000000)
+        result = ma.assertPeakMemory(2000000, some_method, repeat=3)
+        self.assertTrue(result.peak >= 1000000)
+        self.assertTrue(result.retained < 1000000)
+        qa.assertExceptionMessage('This method uses too much memory: peak of [...] bytes > 1000 bytes[...]',
+                                  ma.assertPeakMemory, 1000, some_method)
+
+    @unittest.skipIf(ma.tracemalloc is None, 'tracemalloc is not available')
+    def testProcessBackend(self):
+        leak = []
+        def some_leaking_method():
+            leak.append(' ' * 100000)
+        result = ma.assertRetainedMemory(200000, some_leaking_method, backend='process', timeout=5)
+        self.assertTrue(result.retained >= 100000)
+        self.assertEqual([], leak)
+
+    @unittest.skipIf(ma.tracemalloc is None, 'tracemalloc is not available')
+    def testBuggedMethod(self):
+        def some_bugged_method():
+            raise Exception('ops')
+        qa.assertExceptionMessage('This method is bugged, It impossible to measure the memory: ops',
+                                  ma.assertMemory, some_bugged_method)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,14 @@
+import threading
+import time
 import unittest
 
 import qassertions as qa
 from qassertions import pattern_assertions as pa
-from qassertions.pattern_assertions import *
+
+try:
+    from StringIO import StringIO
+except ImportError: # Python 3
+    from io import StringIO
 
 
 class Singleton(object):
@@ -29,6 +35,119 @@ class DesignPattern_AssertSingletonTests(unittest.TestCase):
                                   pa.assertSingleton, NotSingleton)
 
 
+class RacySingleton(object):
+    instance = None
+    def __new__(cls):
+        if cls.instance is None:
+            time.sleep(0.01) # slow initialization
+            cls.instance = super(RacySingleton, cls).__new__(cls)
+        return cls.instance
+
+
+class LockedSingleton(object):
+    instance = None
+    creations = 0
+    lock = threading.Lock()
+    def __new__(cls):
+        if cls.instance is None:
+            with cls.lock:
+                if cls.instance is None: # double-checked locking
+                    time.sleep(0.01)
+                    cls.creations += 1
+                    cls.instance = super(LockedSingleton, cls).__new__(cls)
+        return cls.instance
+
+
+class DesignPattern_AssertSingletonConcurrentTests(unittest.TestCase):
+    def setUp(self):
+        RacySingleton.instance = None
+        LockedSingleton.instance = None
+        LockedSingleton.creations = 0
+
+    def test_thread_safe_singleton_get_success(self):
+        durations = pa.assertSingleton(LockedSingleton, threads=8)
+        self.assertEqual(8, len(durations))
+        self.assertEqual(1, LockedSingleton.creations) # the threads waited for the lock
+
+    def test_race_condition_throws_an_assertion_error(self):
+        qa.assertExceptionMessage('The class RacySingleton is not a singleton: [0-9]+ different instances in 8 concurrent instantiations.\n'
+                                  'instantiations: runs=8, [...]\nspread of the instantiation durations: [...]',
+                                  pa.assertSingleton, RacySingleton, threads=8)
+
+    def test_report_when_the_assertion_passes(self):
+        reports = []
+        durations = pa.assertSingleton(LockedSingleton, threads=4, report=reports.append)
+        self.assertEqual([pa.contentionReport(durations)], reports)
+        output = StringIO()
+        pa.assertSingleton(LockedSingleton, threads=4, processes=2, report=output)
+        self.assertTrue(output.getvalue().startswith('instantiations: runs=8, '), output.getvalue())
+
+    def test_serial_mode_does_not_detect_the_race_condition(self):
+        pa.assertSingleton(RacySingleton)
+
+    def test_processes(self):
+        durations = pa.assertSingleton(LockedSingleton, threads=4, processes=2)
+        self.assertEqual(8, len(durations))
+        qa.assertExceptionMessage('The class RacySingleton is not a singleton: [...]',
+                                  pa.assertSingleton, RacySingleton, threads=4, processes=2)
+
+    def test_repeat(self):
+        self.assertEqual(12, len(pa.assertSingleton(MySingleton, threads=4, repeat=3)))
+
+    def test_reset_before_each_race(self):
+        resets = []
+        def reset():
+            resets.append(1)
+            LockedSingleton.instance = None
+        self.assertEqual(12, len(pa.assertSingleton(LockedSingleton, threads=4, repeat=3, reset=reset)))
+        self.assertEqual(3, len(resets))
+        def resetRacySingleton():
+            RacySingleton.instance = None
+        qa.assertExceptionMessage('The class RacySingleton is not a singleton: [0-9]+ different instances in 4 concurrent instantiations.[...]',
+                                  pa.assertSingleton, RacySingleton, threads=4, repeat=5, reset=resetRacySingleton)
+
+    def test_instances_are_compared_between_the_races(self):
+        class ForgetfulSingleton(object):
+            instance = None
+            calls = 0
+            lock = threading.Lock()
+            def __new__(cls):
+                with cls.lock:
+                    cls.calls += 1
+                    if cls.instance is None:
+                        cls.instance = super(ForgetfulSingleton, cls).__new__(cls)
+                    instance = cls.instance
+                    if cls.calls == 4: # the instance is lost after the first race
+                        cls.instance = None
+                    return instance
+        qa.assertExceptionMessage('The class ForgetfulSingleton is not a singleton: 2 different instances in 2 races.[...]',
+                                  pa.assertSingleton, ForgetfulSingleton, threads=4, repeat=3)
+
+    def test_slow_initializer(self):
+        qa.assertExceptionMessage('The class LockedSingleton is too slow to instantiate: [...]',
+                                  pa.assertSingleton, LockedSingleton, threads=4, timeout=0.001)
+
+    def test_deadlock(self):
+        lock = threading.Lock()
+        class DeadlockSingleton(object):
+            def __new__(cls):
+                lock.acquire()
+                return object.__new__(cls)
+        qa.assertExceptionMessage("The class DeadlockSingleton is too slow to instantiate: 3 of 4 threads didn't finish in 0.1 seconds.",
+                                  pa.assertSingleton, DeadlockSingleton, threads=4, timeout=0.1)
+
+    def test_exception_in_the_initializer(self):
+        class BuggedSingleton(object):
+            def __new__(cls):
+                raise Exception('ops')
+        qa.assertExceptionMessage('The class BuggedSingleton raised an exception in a concurrent instantiation: ops',
+                                  pa.assertSingleton, BuggedSingleton, threads=2)
+
+    def test_invalid_number_of_threads(self):
+        qa.assertExceptionMessage('The number of threads must be greater than 1.',
+                                  pa.assertSingleton, MySingleton, threads=1)
+
+
 class MyPrototype(object):
     def __init__(self, x=3):
         self.x = x
@@ -62,6 +181,79 @@ class DesignPattern_AssertPrototypeTests(unittest.TestCase):
                                   pa.assertPrototype, NotPrototype())
 
 
+class Catalog(object):
+    def __init__(self, products, settings):
+        self.products = products
+        self.settings = settings
+
+    def __eq__(self, other):
+        return self.products == other.products and self.settings == other.settings
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def deep(self):
+        import copy
+        return copy.deepcopy(self)
+
+    def shallow(self):
+        import copy
+        return copy.copy(self)
+
+    def copy_on_write(self):
+        return Catalog(list(self.products), self.settings)
+
+
+class DesignPattern_AssertPrototypeAnalysisTests(unittest.TestCase):
+    def setUp(self):
+        self.catalog = Catalog([{'name': 'a', 'tags': ['x']}, {'name': 'b', 'tags': []}], {'currency': 'BRL'})
+
+    def test_deep_copy(self):
+        analysis = pa.assertPrototype(self.catalog, 'deep', analyze=True, repeat=3)
+        self.assertEqual(0, analysis.shared)
+        self.assertEqual(7, analysis.copied) # catalog, __dict__ items: products, 2 dicts, 2 tags lists, settings
+        self.assertEqual(3, analysis.copyDepth)
+        self.assertEqual(3, len(analysis.durations))
+
+    def test_shared_sub_objects(self):
+        analysis = pa.assertPrototype(self.catalog, 'copy_on_write', analyze=True, repeat=1)
+        self.assertEqual(3, analysis.shared)
+        self.assertEqual(2, analysis.copied)
+        self.assertEqual(1, analysis.copyDepth)
+        self.assertEqual(['.products[0]', '.products[1]', '.settings'], analysis.sharedPaths)
+        self.assertTrue(analysis.copiedBytes > 0)
+
+    def test_default_values_do_not_enable_the_analysis(self):
+        self.assertEqual(None, pa.assertPrototype(self.catalog, 'deep', repeat=10, maxdepth=None, statistic='median'))
+        self.assertEqual(None, pa.assertPrototype(self.catalog, 'deep', analyze=False))
+        self.assertEqual(7, pa.assertPrototype(self.catalog, 'deep', maxdepth=3).copied)
+
+    def test_copy_depth_budget(self):
+        pa.assertPrototype(self.catalog, 'shallow', maxdepth=0)
+        qa.assertExceptionMessage('The class Catalog copies more than necessary: copy depth of 3 > 1\nshared=0, [...]',
+                                  pa.assertPrototype, self.catalog, 'deep', maxdepth=1)
+
+    def test_bytes_budget(self):
+        qa.assertExceptionMessage('The class Catalog copies more than necessary: [0-9]+ bytes > 10 bytes\n[...]',
+                                  pa.assertPrototype, self.catalog, 'deep', maxbytes=10)
+
+    def test_time_budget(self):
+        pa.assertPrototype(self.catalog, 'shallow', timeout=1)
+        qa.assertExceptionMessage('The class Catalog is too slow to clone: median of [...] > 0\nshared=[...]\nclone: runs=10[...]',
+                                  pa.assertPrototype, self.catalog, 'deep', timeout=0)
+
+    def test_cycles(self):
+        import copy
+        self.catalog.settings['catalog'] = self.catalog
+        analysis = pa.analyzeClone(self.catalog, copy.deepcopy(self.catalog))
+        self.assertEqual(7, analysis.copied)
+
+    def test_report(self):
+        analysis = pa.analyzeClone(self.catalog, self.catalog.copy_on_write())
+        self.assertEqual('shared=3, copied=2, copied bytes=%s, copy depth=1\nshared: .products[0], .products[1], .settings' % analysis.copiedBytes,
+                          str(analysis))
+
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -0,0 +1,131 @@
+import os
+import pstats
+import sys
+import threading
+import time
+import unittest
+
+import qassertions as qa
+from qassertions import compat
+from qassertions import threading2
+from qassertions.profiling import *
+
+
+def hotFunction(n):
+    total = 0
+    for i in compat.xrange(n):
+        total += i * i
+    return total
+
+
+def slowMethod():
+    while True:
+        hotFunction(10000)
+
+
+def shortMethod():
+    time.sleep(0.002)
+
+
+class ProfileTests(unittest.TestCase):
+    def tearDown(self):
+        # The profiled threads of the next tests don't run while a killed thread is still blocked (Python 3.11)
+        for thread in threading.enumerate():
+            if isinstance(thread, threading2.AsyncKThread) and thread.killed:
+                thread.join(5)
+
+    def testCProfile(self):
+        result = profile('cprofile', slowMethod, (), 0.2)
+        self.assertEqual('cprofile', result.profiler)
+        self.assertTrue(0.2 <= result.duration < 1, result.duration)
+        self.assertEqual(None, result.path)
+        names = [name for own, cumulative, name in result.top(3)]
+        self.assertTrue(any(name.startswith('hotFunction (test_profiling.py:') for name in names), names)
+
+    def testCProfileFile(self):
+        result = profile('cprofile', slowMethod, (), 0.1, path=True)
+        self.assertTrue(result.path.endswith('.pstats'))
+        stats = pstats.Stats(result.path)
+        self.assertTrue(any(name == 'hotFunction' for filename, line, name in stats.stats))
+        os.remove(result.path)
+
+    def testSample(self):
+        result = profile('sample', slowMethod, (), 0.2)
+        own, total, name = result.top(1)[0]
+        self.assertTrue(name.startswith('hotFunction (test_profiling.py:'), name)
+        self.assertTrue(own > 0)
+
+    def testSampleFile(self):
+        result = profile('sample', slowMethod, (), 0.1, path=True)
+        self.assertTrue(result.path.endswith('.folded'))
+        with open(result.path) as f:
+            lines = f.read().splitlines()
+        os.remove(result.path)
+        self.assertTrue(lines)
+        for line in lines: # no frame of the thread (__bootstrap etc)
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith('slowMethod (test_profiling.py:'), stack)
+            self.assertTrue(int(count) > 0)
+
+    def testSamplesOutsideOfTheMethodAreIgnored(self):
+        for i in range(20): # the thread is sampled while it starts and finishes
+            result = profile('sample', shortMethod, (), 1)
+            self.assertTrue(set(name.split(' ')[0] for own, total, name in result.functions) <= set(['shortMethod']),
+                            result.functions)
+
+    def testProfilerIsNotInTheCProfile(self):
+        result = profile('cprofile', slowMethod, (), 0.1)
+        self.assertFalse([name for own, cumulative, name in result.functions if 'lsprof' in name])
+
+    def testFastMethod_CProfile(self):
+        for i in range(20):
+            result = profile('cprofile', shortMethod, (), 1)
+            self.assertTrue(set(name.split(' ')[0] for own, total, name in result.functions) <=
+                            set(['shortMethod', '<time.sleep>', '<built-in']), result.functions)
+
+    def testOnlyTheFunctionsOfTheMethodAreInTheCProfile(self):
+        result = profile('cprofile', slowMethod, (), 0.1)
+        names = [name.split(' ')[0] for own, cumulative, name in result.functions]
+        self.assertTrue('slowMethod' in names, names)
+        self.assertFalse([name for name in names if name in ('_stopThread', 'join', '_wait_for_tstate_lock', '_callMethod')],
+                         names)
+
+    def testBlockedMethodIsAbandonedAtTheDeadline(self):
+        for profiler in PROFILERS:
+            startTime = time.time()
+            result = profile(profiler, time.sleep, (2,), 0.2)
+            self.assertTrue(time.time() - startTime < 0.6, profiler)
+            self.assertTrue(result.duration < 0.6, result.duration)
+            if profiler == 'cprofile' and sys.version_info >= (3, 12):
+                continue # the blocking call is lost
+            own, total, name = result.top(1)[0]
+            self.assertTrue('sleep' in name, name)
+
+    def testFastMethod(self):
+        result = profile('sample', lambda: None, (), 1)
+        self.assertTrue(result.duration < 1)
+
+    def testInvalidProfiler(self):
+        qa.assertExceptionMessage("Invalid profiler 'xpto', use one of: cprofile, sample",
+                                  profile, 'xpto', slowMethod, (), 0.1)
+
+
+class ProfileResultTests(unittest.TestCase):
+    def testReport(self):
+        result = ProfileResult('cprofile', 0.5, [(0.3, 0.4, 'b (m.py:2)'), (0.1, 0.5, 'a (m.py:1)')], 'x.pstats')
+        self.assertEqual('Profile (cprofile, 500ms): x.pstats\n'
+                          '      self cumulative  function\n'
+                          '     300ms      400ms  b (m.py:2)', result.report(1))
+
+    def testReportWithoutSamples(self):
+        self.assertEqual('Profile (cprofile, 1ms)\nno samples', ProfileResult('cprofile', 0.001, []).report())
+
+    def testSampleReport(self):
+        result = ProfileResult('sample', 1, [(3, 5, 'b (m.py:2)')])
+        self.assertEqual('Profile (sample, 1s)\n'
+                          '      self      total  function (samples)\n'
+                          '         3          5  b (m.py:2)', str(result))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,27 @@
+import array
+import itertools
+import os
+import random
+import re
+import sys
+import threading
 import time
 import unittest
 
 import qassertions as qa
 from qassertions import *
+from qassertions import compat
+from qassertions import profiling
+from qassertions import threading2
+
+try:
+    from StringIO import StringIO
+except ImportError: # Python 3
+    from io import StringIO
+
+
+def cmp(a, b): # the builtin was removed in Python 3
+    return (a > b) - (a < b)
 
 
 class AssertDontRaiseAnExceptionTests(unittest.TestCase):
@@ -17,8 +36,8 @@ class AssertDontRaiseAnExceptionTests(unittest.TestCase):
                 raise Exception("Some msg")
         try:
             qa.assertDontRaiseAnException(some_method, 1)
-        except AssertionError, e:
-            self.assertEquals("It was not expect an exception, but it get a Exception: Some msg",
+        except AssertionError as e:
+            self.assertEqual("It was not expect an exception, but it get a Exception: Some msg",
                               str(e))
 
 
@@ -43,8 +62,8 @@ class AssertExceptionMessageTests(unittest.TestCase):
             raise Exception("some msg: 0.134")
         try:
             qa.assertExceptionMessage("some msg2: [...]", some_method)
-        except AssertionError, e:
-            self.assertEquals("It was expected an exception with message 'some msg2: [...]', but receive 'some msg: 0.134'",
+        except AssertionError as e:
+            self.assertEqual("It was expected an exception with message 'some msg2: [...]', but receive 'some msg: 0.134'",
                               str(e))
 
     def test_ButNoExceptionIsRaised(self):
@@ -52,16 +71,16 @@ class AssertExceptionMessageTests(unittest.TestCase):
             pass
         try:
             qa.assertExceptionMessage("some msg", some_method)
-        except AssertionError, e:
-            self.assertEquals("It was expected an exception.", str(e))
+        except AssertionError as e:
+            self.assertEqual("It was expected an exception.", str(e))
 
     def test_GetAnExceptionButWithADifferentMessage(self):
         def some_method():
             raise Exception("some msg2")
         try:
             qa.assertExceptionMessage("some msg", some_method)
-        except AssertionError, e:
-            self.assertEquals("It was expected an exception with message 'some msg', but receive 'some msg2'",
+        except AssertionError as e:
+            self.assertEqual("It was expected an exception with message 'some msg', but receive 'some msg2'",
                               str(e))
 
 
@@ -71,18 +90,18 @@ class ValidationTestResultTests(unittest.TestCase):
 
     def testAddUnexpectedSuccess(self):
         self.result.addUnexpectedSuccess([1, 2, ''])
-        self.assertEquals('Unexpected success for the combination of arguments:\n> 1, 2, ''', str(self.result))
+        self.assertEqual('Unexpected success for the combination of arguments:\n> 1, 2, ''', str(self.result))
 
     def testAddUnexpectedFailure(self):
         self.result.addUnexpectedFailure('some error msg', [1, 2, ''])
-        self.assertEquals('Unexpected failure for the combination of arguments:\n> 1, 2, '' - some error msg', str(self.result))
+        self.assertEqual('Unexpected failure for the combination of arguments:\n> 1, 2, '' - some error msg', str(self.result))
 
     def testAddUnexpectedFailureAndSuccess(self):
         self.result.addUnexpectedSuccess([1, 2, 'a'])
         self.result.addUnexpectedFailure('some error msg', [8, 7, 'b'])
         self.result.addUnexpectedSuccess([3, 4, 'c'])
         self.result.addUnexpectedFailure('some error msg2', [5, 6, ''])
-        self.assertEquals(
+        self.assertEqual(
 '''Unexpected success for the combination of arguments:
 > 1, 2, a
 > 3, 4, c
@@ -101,82 +120,251 @@ Unexpected failure for the combination of arguments:
         self.result.addUnexpectedFailure('', ['1'])
         self.assertTrue(self.result.hasFailure())
 
+    def testValuesAreTruncated(self):
+        self.result.addUnexpectedFailure('e' * 200, ['a' * 200, 1])
+        self.assertEqual('Unexpected failure for the combination of arguments:\n> %s..., 1 - %s...' % ('a' * 97, 'e' * 97),
+                          str(self.result))
+
+    def testRecordsDontKeepTheArguments(self):
+        class SomeClass(object): pass
+        instance = SomeClass()
+        self.result.addUnexpectedSuccess([instance])
+        self.assertFalse(self.result.unexpectSuccess[0].values is instance)
+        self.assertTrue(isinstance(self.result.unexpectSuccess[0].values, str))
+
+    def testMaxRecords(self):
+        result = ValidationTestResult(maxRecords=2)
+        for i in range(5):
+            result.addUnexpectedSuccess([i])
+        result.addUnexpectedFailure('ops', [9])
+        self.assertEqual(2, len(result.unexpectSuccess))
+        self.assertEqual(6, result.countFailures())
+        self.assertEqual('Unexpected success for the combination of arguments:\n> 0\n> 1\n> ... (3 more)\n'
+                          'Unexpected failure for the combination of arguments:\n> 9 - ops', str(result))
+
+    def testCallableSink(self):
+        records = []
+        result = ValidationTestResult(sink=records.append, maxRecords=0)
+        result.addUnexpectedSuccess([1, 2])
+        result.addUnexpectedFailure('ops', [3])
+        self.assertEqual(['> 1, 2', '> 3 - ops'], [str(r) for r in records])
+        self.assertEqual([], result.unexpectSuccess)
+        self.assertTrue(result.hasFailure())
+
+    def testFileSink(self):
+        output = StringIO()
+        result = ValidationTestResult(sink=output)
+        result.addUnexpectedSuccess([1, 2])
+        result.addUnexpectedFailure('ops', [3])
+        self.assertEqual('Unexpected success: 1, 2\nUnexpected failure: 3 - ops\n', output.getvalue())
+
+    def testLoggerSink(self):
+        import logging
+        class Handler(logging.Handler):
+            def __init__(self):
+                logging.Handler.__init__(self)
+                self.messages = []
+            def emit(self, record):
+                self.messages.append(record.getMessage())
+        handler = Handler()
+        logger = logging.getLogger('qassertions.tests.sink')
+        logger.addHandler(handler)
+        result = ValidationTestResult(sink=logger)
+        result.addUnexpectedFailure('ops', [3])
+        self.assertEqual(['Unexpected failure: 3 - ops'], handler.messages)
+
+    def testInvalidSink(self):
+        qa.assertExceptionMessage('Invalid sink, use a callable, a file or a logger.', ValidationTestResult, sink=1)
+
+    def testCountFailures(self):
+        self.assertEqual(0, self.result.countFailures())
+        self.result.addUnexpectedFailure('', ['1'])
+        self.result.addUnexpectedSuccess(['2'])
+        self.assertEqual(2, self.result.countFailures())
+
+
+class ValidationTestValuesTests(unittest.TestCase):
+    def testValuesAreCachedAndImmutable(self):
+        spy = []
+        class SomeValidation(Min):
+            def successValues(self):
+                spy.append(1)
+                return Min.successValues(self)
+        validation = SomeValidation(5)
+        self.assertEqual((6, (5, 6, 15), (-5, 4)), validation.values())
+        self.assertTrue(validation.values() is validation.values())
+        self.assertEqual(1, len(spy))
+
+    def testCacheIsInvalidatedWhenAPropertyChanges(self):
+        validation = Min(5)
+        self.assertEqual((6, (5, 6, 15), (-5, 4)), validation.values())
+        validation.min = 10
+        self.assertEqual((11, (10, 11, 20), (0, 9)), validation.values())
+
+    def testInListDontChangeTheListOfTheUser(self):
+        a_list = [11, 3, 16, 25]
+        validation = InList(a_list)
+        validation.values()
+        validation.failureValues()
+        self.assertEqual([11, 3, 16, 25], a_list)
+        self.assertEqual([11, 16, 25], validation.successValues())
+
+    def testAssertValidationUsesTheCachedValues(self):
+        spy = []
+        class SomeValidation(Min):
+            def failureValues(self):
+                spy.append(1)
+                return Min.failureValues(self)
+        def some_method(value1):
+            if value1 < 7: raise Exception('ops')
+        validation = SomeValidation(7)
+        qa.assertValidation(some_method, validation)
+        qa.assertValidation(some_method, validation)
+        self.assertEqual(1, len(spy))
+
 
 class MinValidationTests(unittest.TestCase):
     def testMinSuccessValues(self):
-        self.assertEquals([5, 6, 15], Min(5).successValues())
-        self.assertEquals([5.123, 6.123, (5.123 + 10)], Min(5.123).successValues())
-        self.assertEquals([5.123, 5.223, 6.123], Min(5.123, 0.1).successValues())
+        self.assertEqual([5, 6, 15], Min(5).successValues())
+        self.assertEqual([5.123, 6.123, (5.123 + 10)], Min(5.123).successValues())
+        self.assertEqual([5.123, 5.223, 6.123], Min(5.123, 0.1).successValues())
 
     def testMinSuccessValuesForNegativeNumbers(self):
-        self.assertEquals([-5, -4, 5], Min(-5).successValues())
+        self.assertEqual([-5, -4, 5], Min(-5).successValues())
 
     def testMinFailureValues(self):
-        self.assertEquals([-5, 4], Min(5).failureValues())
-        self.assertEquals([4, 4.9], Min(5, 0.1).failureValues())
+        self.assertEqual([-5, 4], Min(5).failureValues())
+        self.assertEqual([4, 4.9], Min(5, 0.1).failureValues())
 
     def testMinFailureValuesForNegativeNumbers(self):
-        self.assertEquals([-15, -6], Min(-5).failureValues())
+        self.assertEqual([-15, -6], Min(-5).failureValues())
 
 
 class MaxValidationTests(unittest.TestCase):
     def testMaxSuccessValues(self):
-        self.assertEquals([-4, 5, 6], Max(6).successValues())
-        self.assertEquals([5, 5.9, 6], Max(6, 0.1).successValues())
+        self.assertEqual([-4, 5, 6], Max(6).successValues())
+        self.assertEqual([5, 5.9, 6], Max(6, 0.1).successValues())
 
     def testMaxSuccessValuesForNegativeNumbers(self):
-        self.assertEquals([-15, -6, -5], Max(-5).successValues())
+        self.assertEqual([-15, -6, -5], Max(-5).successValues())
 
     def testMaxFailureValues(self):
-        self.assertEquals([6, 15], Max(5).failureValues())
-        self.assertEquals([5.1, 6], Max(5, 0.1).failureValues())
+        self.assertEqual([6, 15], Max(5).failureValues())
+        self.assertEqual([5.1, 6], Max(5, 0.1).failureValues())
 
     def testMaxFailureValuesForNegativeNumbers(self):
-        self.assertEquals([-4, 5], Max(-5).failureValues())
+        self.assertEqual([-4, 5], Max(-5).failureValues())
 
 
 class PositiveValidationTests(unittest.TestCase):
     def testMinSuccessValues(self):
-        self.assertEquals([1, 2, 11], Positive().successValues())
-        self.assertEquals([1, 1.1, 2], Positive(0.1).successValues())
+        self.assertEqual([1, 2, 11], Positive().successValues())
+        self.assertEqual([1, 1.1, 2], Positive(0.1).successValues())
 
     def testMinFailureValues(self):
-        self.assertEquals([-1, 0], Positive().failureValues())
-        self.assertEquals([-0.1, 0], Positive(0.1).failureValues())
+        self.assertEqual([-1, 0], Positive().failureValues())
+        self.assertEqual([-0.1, 0], Positive(0.1).failureValues())
 
 
 class  NegativeValidationTests(unittest.TestCase):
     def testMaxSuccessValues(self):
-        self.assertEquals([-11, -2, -1], Negative().successValues())
-        self.assertEquals([-2, -1.1, -1], Negative(0.1).successValues())
+        self.assertEqual([-11, -2, -1], Negative().successValues())
+        self.assertEqual([-2, -1.1, -1], Negative(0.1).successValues())
 
     def testMaxFailureValues(self):
-        self.assertEquals([0, 1], Negative().failureValues())
-        self.assertEquals([0, 0.1], Negative(0.1).failureValues())
+        self.assertEqual([0, 1], Negative().failureValues())
+        self.assertEqual([0, 0.1], Negative(0.1).failureValues())
 
 
 class RangeValidationTests(unittest.TestCase):
     def testRangeMaxLowerThanMin(self):
         try:
             Range(2, 1)
-        except Exception, e:
-            self.assertEquals('min > max, change the order of the arguments.', str(e))
+        except Exception as e:
+            self.assertEqual('min > max, change the order of the arguments.', str(e))
 
     def testRangeSuccessValues(self):
-        self.assertEquals([3, 4], Range(3, 4).successValues())
-        self.assertEquals([3, 4, 5], Range(3, 5).successValues())
-        self.assertEquals([56, 423, 790], Range(56, 790).successValues())
-        self.assertEquals([56, 423, 791], Range(56, 791).successValues())
-        self.assertEquals([3, 4], Range(3, 4, 0.1).successValues())
-        self.assertEquals([3, 4, 5], Range(3, 5, 0.1).successValues())
+        self.assertEqual([3, 4], Range(3, 4).successValues())
+        self.assertEqual([3, 4, 5], Range(3, 5).successValues())
+        self.assertEqual([56, 423, 790], Range(56, 790).successValues())
+        self.assertEqual([56, 423, 791], Range(56, 791).successValues())
+        self.assertEqual([3, 4], Range(3, 4, 0.1).successValues())
+        self.assertEqual([3, 4, 5], Range(3, 5, 0.1).successValues())
+        self.assertEqual([0.0, 2.5, 5.0], Range(0.0, 5.0, 0.1).successValues())
 
     def testRangeFailureValues(self):
-        self.assertEquals([-7, 2, 5, 14], Range(3, 4).failureValues())
-        self.assertEquals([-7, 2, 6, 15], Range(3, 5).failureValues())
-        self.assertEquals([46, 55, 791, 800], Range(56, 790).failureValues())
-        self.assertEquals([46, 55, 792, 801], Range(56, 791).failureValues())
-        self.assertEquals([2, 2.9, 4.1, 5], Range(3, 4, 0.1).failureValues())
-        self.assertEquals([2, 2.9, 5.1, 6], Range(3, 5, 0.1).failureValues())
+        self.assertEqual([-7, 2, 5, 14], Range(3, 4).failureValues())
+        self.assertEqual([-7, 2, 6, 15], Range(3, 5).failureValues())
+        self.assertEqual([46, 55, 791, 800], Range(56, 790).failureValues())
+        self.assertEqual([46, 55, 792, 801], Range(56, 791).failureValues())
+        self.assertEqual([2, 2.9, 4.1, 5], Range(3, 4, 0.1).failureValues())
+        self.assertEqual([2, 2.9, 5.1, 6], Range(3, 5, 0.1).failureValues())
+
+
+class CountedSteps(list):
+    def __init__(self, steps):
+        list.__init__(self, steps)
+        self.walks = 0
+
+    def __iter__(self):
+        self.walks += 1
+        return list.__iter__(self)
+
+
+class SweepValidationTests(unittest.TestCase):
+    def testMinSweep(self):
+        self.assertEqual([7, 8, 9, 10], list(Min(7, sweep=Sweep([1, 2, 3])).successValues()))
+        self.assertEqual([6, 5, 4], list(Min(7, sweep=Sweep([1, 2, 3])).failureValues()))
+
+    def testMaxSweep(self):
+        self.assertEqual([3, 1, -1], list(Max(3, sweep=Sweep([2, 4])).successValues()))
+        self.assertEqual([5, 7], list(Max(3, sweep=Sweep([2, 4])).failureValues()))
+
+    def testPositiveAndNegativeSweep(self):
+        self.assertEqual([0, -1, -2], list(Positive(sweep=Sweep([1, 2])).failureValues()))
+        self.assertEqual([0, 0.5, 1.0], list(Negative(0.5, sweep=Sweep([1, 2])).failureValues()))
+
+    def testRangeSweepStopsAtTheOtherBoundary(self):
+        self.assertEqual([3, 4, 5], list(Range(3, 5, sweep=Sweep([1, 2, 3])).successValues()))
+        self.assertEqual([3, 4, 5, 6], list(Range(3, 6, sweep=Sweep([1, 2, 3])).successValues()))
+        self.assertEqual([0, 1, 2, 100, 99, 98], list(Range(0, 100, sweep=Sweep([1, 2])).successValues()))
+        self.assertEqual([7], list(Range(7, 7, sweep=Sweep([1, 2])).successValues()))
+        self.assertEqual([2, 1, 0, 6, 7, 8], list(Range(3, 5, sweep=Sweep([1, 2, 3])).failureValues()))
+
+    def testRandomInteriorSamplesAreReproducible(self):
+        values = list(Range(0, 1000, sweep=Sweep([], samples=5, seed=3)).successValues())[2:]
+        self.assertEqual(5, len(values))
+        self.assertTrue(all(0 <= v <= 1000 for v in values))
+        self.assertEqual(values, list(Range(0, 1000, sweep=Sweep([], samples=5, seed=3)).successValues())[2:])
+        self.assertNotEqual(values, list(Range(0, 1000, sweep=Sweep([], samples=5, seed=4)).successValues())[2:])
+
+    def testFloatSamples(self):
+        values = list(Min(0.5, 0.1, sweep=Sweep([1, 10], samples=10)).successValues())[3:]
+        self.assertTrue(all(0.5 <= v <= 1.5 for v in values), values)
+
+    def testSweepIsLazy(self):
+        values = Range(0, 10 ** 9, sweep=Sweep(compat.xrange(1, 10 ** 9))).successValues()
+        self.assertEqual([0, 1, 2], list(itertools.islice(values, 3)))
+
+    def testSpanOfTheSamplesIsLazy(self):
+        steps = CountedSteps([1, 2])
+        values = Max(3, sweep=Sweep(steps, samples=2)).successValues()
+        self.assertEqual([3, 2, 1], list(itertools.islice(values, 3)))
+        self.assertEqual(1, steps.walks) # the biggest step is computed only for the samples
+        self.assertEqual(2, len([v for v in values if -1 <= v <= 3]))
+
+    def testSpanOfTheSamples(self):
+        self.assertEqual(10 ** 9 - 1, Sweep(compat.xrange(1, 10 ** 9), samples=1).span(1))
+        self.assertEqual(50, Sweep([1, 2], samples=1, maxstep=5).span(10))
+        self.assertEqual(0, Sweep(compat.xrange(1, 1), samples=1).span(1))
+        self.assertEqual([5, 5, 5], list(Max(5, sweep=Sweep(compat.xrange(1, 1), samples=2)).successValues()))
+        values = list(Min(0, sweep=Sweep([], samples=10, maxstep=3)).successValues())[1:]
+        self.assertTrue(all(0 <= v <= 3 for v in values), values)
+
+    def testSweepValuesAreNotCached(self):
+        sweep = Min(7, sweep=Sweep([1]))
+        self.assertEqual([7, 8], list(sweep.values()[1]))
+        self.assertEqual([7, 8], list(sweep.values()[1]))
 
 
 class InListValidationTests(unittest.TestCase):
@@ -185,32 +373,32 @@ class InListValidationTests(unittest.TestCase):
                                   InList, [3])
 
     def testInListSuccessValues(self):
-        self.assertEquals([1, 2], InList([1, 2]).successValues())
-        self.assertEquals([1, 3, 4], InList([1, 2, 3, 4]).successValues())
-        self.assertEquals([1, 3, 5], InList([1, 2, 3, 4, 5]).successValues())
+        self.assertEqual([1, 2], InList([1, 2]).successValues())
+        self.assertEqual([1, 3, 4], InList([1, 2, 3, 4]).successValues())
+        self.assertEqual([1, 3, 5], InList([1, 2, 3, 4, 5]).successValues())
 
     def testInListFailureValuesOfNumbers(self):
-        self.assertEquals([2, 26], InList([11, 3, 16, 25]).failureValues())
+        self.assertEqual([2, 26], InList([11, 3, 16, 25]).failureValues())
 
     def testInListFailureValuesOfStrings(self):
-        self.assertEquals([], InList(["A", "B"]).failureValues())
+        self.assertEqual([], InList(["A", "B"]).failureValues())
 
     def testInListFailureValuesOfObjects(self):
         class SomeClass(object): pass
-        self.assertEquals([], InList([SomeClass(), SomeClass()]).failureValues())
+        self.assertEqual([], InList([SomeClass(), SomeClass()]).failureValues())
 
 
 class RegExprValidationTests(unittest.TestCase):
     def helper_success_values(self, regexpr, a_list):
         REGEXPR = regexpr
-        self.assertEquals(a_list, RegExpr(REGEXPR).successValues())
+        self.assertEqual(a_list, RegExpr(REGEXPR).successValues())
         for s in RegExpr(REGEXPR).successValues():
             self.assertTrue(re.match(REGEXPR, s), str(s))
             self.assertTrue(re.search(REGEXPR, s), str(s))
 
     def helper_failure_values(self, regexpr, a_list):
         REGEXPR = regexpr
-        self.assertEquals(a_list, RegExpr(REGEXPR).failureValues())
+        self.assertEqual(a_list, RegExpr(REGEXPR).failureValues())
         for s in RegExpr(REGEXPR).failureValues():
             self.assertFalse(re.match(REGEXPR, s), str(s))
             self.assertFalse(re.search(REGEXPR, s), str(s))
@@ -228,6 +416,30 @@ class RegExprValidationTests(unittest.TestCase):
     def test_FailureValues_SimpleRegExpr(self):
         self.helper_failure_values(r"abc", ["bbc", "bbcbbc"])
 
+    def test_BytesRegExpr(self):
+        self.helper_success_values(b"abc", [b"abc", b"abcabc", b"abcd"])
+        self.helper_failure_values(b"abc", [b"bbc", b"bbcbbc"])
+
+    def test_SuccessValues_RegExpr_with_plus(self):
+        self.helper_success_values(r"abc+", ["abc", "abcabc", "abcd"])
+
+    def test_SuccessValues_RegExpr_with_anchors(self):
+        self.helper_success_values(r"^\d{3}-[a-z]+$", ["000-a", "000-ab", "000-aaa"])
+
+    def test_FailureValues_RegExpr_with_classes(self):
+        self.helper_failure_values(r"\d+", ["", "a"])
+
+    def test_RegExpr_random_values(self):
+        rnd = random.Random(0)
+        for i in range(20):
+            self.assertTrue(re.match(r"(ab|c)+\d", RegExpr(r"(ab|c)+\d").drawSuccess(rnd)))
+
+    def test_RegExpr_with_non_ascii_sets(self):
+        for pattern in [u'[\xe0-\xfc]+', r'[\x80-\xff]']:
+            def some_method(value):
+                if not re.match(pattern, value): raise Exception('ops')
+            qa.assertValidation(some_method, RegExpr(pattern))
+
     # TODO I stopped here
 #    def test_SuccessValues_RegExpr_with_plus_greedy(self):
 #        self.helper_success_values(r"abc+", ["abc", "abcabc", "abcd"])
@@ -292,19 +504,19 @@ class QAssertionsTests(unittest.TestCase):
         def some_method():
             return 13
         spy = qa.executeMethod(some_method)
-        self.assertEquals(13, spy)
+        self.assertEqual(13, spy)
 
     def testExecuteMethodWithOneArgument(self):
         def some_method(value1):
             return value1
         spy = qa.executeMethod(some_method, 5)
-        self.assertEquals(5, spy)
+        self.assertEqual(5, spy)
 
     def testExecuteMethodWithArguments(self):
         def some_method(value1, value2):
             return value1 + value2
         spy = qa.executeMethod(some_method, 5, 6)
-        self.assertEquals(11, spy)
+        self.assertEqual(11, spy)
 
 
 class AssertValidationTests(unittest.TestCase):
@@ -366,13 +578,311 @@ class AssertValidationTests(unittest.TestCase):
         qa.assertDontRaiseAnException(qa.assertValidation, some_method, InList([3, 4]))
 
 
+def picklable_method_with_minimum(value1):
+    if value1 < 7: raise Exception('ops')
+
+
+class AssertValidationWithExecutorTests(unittest.TestCase):
+    def test_thread_executor_for_valid_method(self):
+        def some_method(value1, value2):
+            if value1 < 7: raise Exception('ops')
+            if value2 > 3: raise Exception('ops')
+        qa.assertDontRaiseAnException(qa.assertValidation, some_method, Min(7), Max(3), executor='thread', workers=4)
+
+    def test_thread_executor_reports_in_the_same_order_of_serial_executor(self):
+        def some_method(value1, value2):
+            time.sleep(0.05 / (abs(value1) + 1))
+            if value1 < 6: raise Exception('ops1')
+            if value2 > 4: raise Exception('ops2')
+        try:
+            qa.assertValidation(some_method, Min(7), Max(3))
+        except AssertionError as e:
+            serial = str(e)
+        else: self.fail()
+        qa.assertExceptionMessage(serial, qa.assertValidation, some_method, Min(7), Max(3), executor='thread', workers=8)
+
+    def test_process_executor_for_valid_method(self):
+        qa.assertDontRaiseAnException(qa.assertValidation, picklable_method_with_minimum, Min(7), executor='process', workers=2)
+
+    def test_process_executor_for_not_picklable_method(self):
+        def some_method(value1):
+            pass
+        qa.assertExceptionMessage('The method and the arguments must be picklable to use a process executor: [...]',
+                                  qa.assertValidation, some_method, Min(7), executor='process')
+
+    def test_pool_executors_consume_the_cases_lazily(self):
+        for executor in [executors.ThreadExecutor(2), executors.ProcessExecutor(2)]:
+            consumed = []
+            def cases():
+                for i in itertools.count():
+                    consumed.append(i)
+                    yield -i
+            try:
+                results = executor.imap(abs, cases())
+                self.assertEqual([0, 1, 2], [next(results) for i in range(3)])
+                self.assertTrue(len(consumed) <= 3 + 2 * executors.WINDOW_PER_WORKER, len(consumed))
+            finally:
+                executor.shutdown()
+
+    def test_sweep_is_consumed_as_a_stream_by_the_thread_executor(self):
+        def some_method(value1):
+            if value1 > 5: raise Exception('ops')
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 6 - ops\nAborted after 1 unexpected results.",
+                                  qa.assertValidation, some_method, Positive(sweep=Sweep(compat.xrange(1, 10 ** 9))), failfast=True,
+                                  executor='thread', workers=2)
+
+    def test_invalid_executor(self):
+        def some_method(value1):
+            pass
+        qa.assertExceptionMessage("Invalid executor 'xpto', use one of: asyncio, process, serial, thread",
+                                  qa.assertValidation, some_method, Min(7), executor='xpto')
+
+
+class AssertValidationWithStrategyTests(unittest.TestCase):
+    def test_allpairs_finds_an_interaction_between_two_arguments(self):
+        def some_method(value1, value2, value3):
+            if value1 < 7: raise Exception('ops')
+            if value2 > 3: raise Exception('ops')
+            if value3 < 0: raise Exception('ops')
+            if value1 == 17 and value2 == -7: raise Exception('interaction')
+        qa.assertDontRaiseAnException(qa.assertValidation, some_method, Min(7), Max(3), Min(0))
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 17, -7, [...] - interaction",
+                                  qa.assertValidation, some_method, Min(7), Max(3), Min(0), strategy='allpairs')
+
+    def test_product_for_valid_method(self):
+        def some_method(value1, value2):
+            if value1 < 7: raise Exception('ops')
+            if value2 > 3: raise Exception('ops')
+        qa.assertDontRaiseAnException(qa.assertValidation, some_method, Min(7), Max(3), strategy='product')
+
+
+class AssertValidationFailFastTests(unittest.TestCase):
+    def bugged_method(self, spy):
+        def some_method(value1, value2):
+            spy.append((value1, value2))
+            if value1 < 6: raise Exception('ops')
+            if value2 > 4: raise Exception('ops')
+        return some_method
+
+    def test_failfast_stops_at_the_first_unexpected_result(self):
+        spy = []
+        qa.assertExceptionMessage("Unexpected success for the combination of arguments:\n> 6, 2\nAborted after 1 unexpected results.",
+                                  qa.assertValidation, self.bugged_method(spy), Min(7), Max(3), failfast=True)
+        self.assertEqual((6, 2), spy[-1])
+
+    def test_maxfailures(self):
+        spy = []
+        qa.assertExceptionMessage("Unexpected success for the combination of arguments:\n> 6, 2\n> 8, 4\nAborted after 2 unexpected results.",
+                                  qa.assertValidation, self.bugged_method(spy), Min(7), Max(3), maxfailures=2)
+        self.assertEqual((8, 4), spy[-1])
+
+    def test_sink_and_maxrecords(self):
+        records = []
+        qa.assertExceptionMessage("Unexpected success for the combination of arguments:\n> 6, 2\n> ... \\(1 more\\)",
+                                  qa.assertValidation, self.bugged_method([]), Min(7), Max(3), sink=records.append, maxrecords=1)
+        self.assertEqual(['> 6, 2', '> 8, 4'], [str(r) for r in records])
+
+    def test_maxfailures_not_reached(self):
+        qa.assertExceptionMessage("Unexpected success for the combination of arguments:\n> 6, 2\n> 8, 4",
+                                  qa.assertValidation, self.bugged_method([]), Min(7), Max(3), maxfailures=3)
+
+    def test_failfast_cancels_the_cases_of_the_thread_executor(self):
+        spy = []
+        def some_method(value1):
+            time.sleep(0.05)
+            spy.append(value1)
+            if value1 < 0: raise Exception('ops')
+        cases = len(Min(7).successValues() + Min(7).failureValues())
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 7 - [...]",
+                                  qa.assertValidation, lambda v: some_method(-1 if v == 7 else v), Min(7),
+                                  failfast=True, executor='thread', workers=1)
+        time.sleep(0.2)
+        self.assertTrue(len(spy) < cases + 1, spy)
+
+
+class AssertValidationWithSweepTests(unittest.TestCase):
+    def test_sweep(self):
+        spy = []
+        def some_method(value1):
+            spy.append(value1)
+            if value1 < 7: raise Exception('ops')
+        qa.assertValidation(some_method, Min(7, sweep=Sweep(range(1, 101))))
+        self.assertEqual(1 + 1 + 100 + 100, len(spy))
+
+    def test_sweep_is_consumed_as_a_stream(self):
+        def some_method(value1):
+            if value1 > 5: raise Exception('ops')
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 6 - ops\nAborted after 1 unexpected results.",
+                                  qa.assertValidation, some_method, Positive(sweep=Sweep(compat.xrange(1, 10 ** 9))), failfast=True)
+
+    def test_sweep_with_a_combination_strategy(self):
+        def some_method(value1, value2):
+            if value1 < 3 or value2 > 3: raise Exception('ops')
+        qa.assertValidation(some_method, Min(3, sweep=Sweep([1, 2])), Max(3, sweep=Sweep([1, 2])), strategy='allpairs')
+
+
+class RandomValuesTests(unittest.TestCase):
+    def draw(self, validation, success, count=200):
+        rnd = random.Random(0)
+        return [validation.drawSuccess(rnd) if success else validation.drawFailure(rnd) for i in range(count)]
+
+    def test_random_values_are_inside_of_the_domains(self):
+        self.assertTrue(all(v >= 7 for v in self.draw(Min(7), True)))
+        self.assertTrue(all(v < 7 for v in self.draw(Min(7), False)))
+        self.assertTrue(all(v <= 3 for v in self.draw(Max(3, 0.5), True)))
+        self.assertTrue(all(v > 3 for v in self.draw(Max(3, 0.5), False)))
+        self.assertTrue(all(v <= 0 for v in self.draw(Positive(), False)))
+        self.assertTrue(all(v >= 0 for v in self.draw(Negative(), False)))
+        self.assertTrue(all(3 <= v <= 50 for v in self.draw(Range(3, 50), True)))
+        self.assertTrue(all(v < 3 or v > 50 for v in self.draw(Range(3, 50), False)))
+        self.assertTrue(all(v in [2, 4, 9] for v in self.draw(InList([2, 4, 9]), True)))
+        self.assertTrue(all(v not in [2, 4, 9] for v in self.draw(InList([2, 4, 9]), False)))
+        self.assertTrue(all(v not in [2, 4, 9] for v in self.draw(NotInList([2, 4, 9]), True)))
+        self.assertTrue(all(v in ['', ' ', '\t'] for v in self.draw(Blank(), True)))
+
+    def test_random_values_are_reproducible(self):
+        self.assertEqual(self.draw(Range(3, 50), True), self.draw(Range(3, 50), True))
+
+    def test_shrink(self):
+        self.assertEqual([7, 507, 1006], Min(7).shrink(1007, True))
+        self.assertEqual([6, 5, 4], Min(7).shrink(3, False))
+        self.assertEqual([3], Max(3).shrink(2, True))
+        self.assertEqual([], Max(3).shrink(3, True))
+        self.assertEqual([0, -5, -9], Positive().shrink(-10, False))
+        self.assertEqual([50, 48, 47], Range(3, 50).shrink(46, True))
+        self.assertEqual([2], InList([2, 4, 9]).shrink(9, True))
+        self.assertEqual([], Blank().shrink('', True))
+
+
+class AssertRandomValidationTests(unittest.TestCase):
+    def test_valid_method(self):
+        def some_method(value1, value2, value3):
+            if value1 < 7 or value2 > 3 or not (-5 <= value3 <= 5): raise Exception('ops')
+        qa.assertRandomValidation(some_method, Min(7), Max(3), Range(-5, 5))
+
+    def test_counterexample_is_shrunk(self):
+        def some_method(value1, value2):
+            if value1 < 7 or value1 > 100: raise Exception('ops')
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 101, 2 - ops\n"
+                                  "Falsified after [0-9]+ random cases \(seed 0\), shrunk [0-9]+ times.",
+                                  qa.assertRandomValidation, some_method, Min(7), 2)
+
+    def test_unexpected_success_is_shrunk(self):
+        def some_method(value1):
+            if value1 < -3: raise Exception('ops')
+        qa.assertExceptionMessage("Unexpected success for the combination of arguments:\n> 0\n",
+                                  qa.assertRandomValidation, some_method, Positive(), seed=5)
+
+    def test_without_shrink(self):
+        def some_method(value1):
+            if value1 > 100: raise Exception('ops')
+        try:
+            qa.assertRandomValidation(some_method, Min(7), shrink=False)
+            self.fail('It was expected an exception.')
+        except AssertionError as e:
+            self.assertTrue(str(e).endswith('shrunk 0 times.'), str(e))
+            self.assertFalse('> 101 - ops' in str(e), str(e))
+
+    def test_cases_budget(self):
+        spy = []
+        def some_method(value1):
+            spy.append(value1)
+            if value1 is None: raise Exception('ops')
+        qa.assertRandomValidation(some_method, Blank(), cases=20)
+        self.assertEqual(21, len(spy))
+
+    def test_timeout_budget(self):
+        spy = []
+        def some_method(value1):
+            spy.append(value1)
+            time.sleep(0.01)
+            if value1 is None: raise Exception('ops')
+        qa.assertRandomValidation(some_method, Blank(), cases=10 ** 6, timeout=0.1)
+        self.assertTrue(len(spy) < 50, len(spy))
+
+    def test_thread_executor(self):
+        def some_method(value1):
+            if value1 < 7 or value1 > 100: raise Exception('ops')
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 101 - ops\n",
+                                  qa.assertRandomValidation, some_method, Min(7), executor='thread', workers=4)
+
+
+class AssertValidationVectorizedTests(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def vectorized_method(self, minimum, maximum):
+        def some_method(values1, value2):
+            self.calls.append((list(values1), value2))
+            if value2 > maximum: raise Exception('ops')
+            return [v >= minimum for v in values1]
+        return some_method
+
+    def test_vectorized_argument_is_submitted_in_one_call(self):
+        qa.assertValidation(self.vectorized_method(7, 3), Min(7), Max(3), vectorized=[0], vectorize=list)
+        self.assertEqual([([8], 2), ([7, 8, 17], 2), ([-3, 6], 2), ([8], -7), ([8], 2), ([8], 3), ([8], 4), ([8], 13)],
+                          self.calls)
+
+    def test_per_element_outcomes(self):
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 7, 2 - invalid element",
+                                  qa.assertValidation, self.vectorized_method(7.5, 3), Min(7), Max(3), vectorized=[0], vectorize=list)
+        qa.assertExceptionMessage("Unexpected success for the combination of arguments:\n> 6, 2",
+                                  qa.assertValidation, self.vectorized_method(5.5, 3), Min(7), Max(3), vectorized=[0], vectorize=list)
+
+    def test_exception_instances_as_outcomes(self):
+        def some_method(values1):
+            return [True if v >= 8 else Exception('lower than 8') for v in values1]
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 7 - lower than 8",
+                                  qa.assertValidation, some_method, Min(7), vectorized=[0], vectorize=list)
+
+    def test_exception_fails_all_the_elements(self):
+        def some_method(values1, value2):
+            if value2 > 2: raise Exception('ops')
+            return [v >= 7 for v in values1]
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 8, 3 - ops",
+                                  qa.assertValidation, some_method, Min(7), Max(3), vectorized=[0], vectorize=list)
+
+    def test_invalid_number_of_outcomes(self):
+        def some_method(values1):
+            return [True]
+        qa.assertExceptionMessage('The vectorized method must return one outcome per element: expected 3, received 1.',
+                                  qa.assertValidation, some_method, Min(7), vectorized=[0], vectorize=list)
+
+    def test_failfast(self):
+        qa.assertExceptionMessage("Unexpected failure for the combination of arguments:\n> 8, 3 - ops\nAborted after 1 unexpected results.",
+                                  qa.assertValidation, self.vectorized_method(7, 2), Min(7), Max(3), vectorized=[0],
+                                  vectorize=list, failfast=True)
+        self.assertEqual(([8], 3), self.calls[-1])
+
+    def test_maxfailures_inside_of_a_vector(self):
+        qa.assertExceptionMessage("Unexpected success for the combination of arguments:\n> -3, 2\nAborted after 1 unexpected results.",
+                                  qa.assertValidation, lambda values1, value2: [True] * len(values1), Min(7), Max(3),
+                                  vectorized=[0], vectorize=list, maxfailures=1)
+
+    def test_executor_and_strategy_are_not_supported(self):
+        for name, value in [('executor', 'thread'), ('workers', 2), ('strategy', 'product')]:
+            qa.assertExceptionMessage("assertValidation\\(\\) got the keyword argument '%s', that can't be used with vectorized" % name,
+                                      qa.assertValidation, self.vectorized_method(7, 3), Min(7), vectorized=[0], **{name: value})
+
+    def test_instrumentation(self):
+        with instrumentation.listening(instrumentation.Aggregator()) as aggregator:
+            qa.assertValidation(self.vectorized_method(7, 3), Min(7), Max(3), vectorized=[0], vectorize=list)
+        self.assertEqual(len(self.calls), aggregator.get('executeCase', 'validation').count)
+
+    @unittest.skipIf(qa.numpy is None, 'numpy is not installed')
+    def test_numpy_vectors(self):
+        def some_method(values1):
+            return values1 >= 7
+        qa.assertValidation(some_method, Min(7), vectorized=[0])
+
+
 class AssertListIsSortedTests(unittest.TestCase):
     def test_CaseOfSuccess(self):
         qa.assertListIsSorted([1, 2, 3])
 
     def test_CaseOfSuccess_of_custom_list(self):
         qa.assertListIsSorted([3, 2, 1], reverse=True)
-        qa.assertListIsSorted(['D', 'b', 'c'], key=lambda s: s.upper)
+        qa.assertListIsSorted(['b', 'C', 'd'], key=lambda s: s.upper())
 
     def test_CaseOfFailure(self):
         qa.assertExceptionMessage("List is not sorted.",
@@ -380,7 +890,72 @@ class AssertListIsSortedTests(unittest.TestCase):
 
     def test_CaseOfFailure_of_custom_list(self):
         qa.assertExceptionMessage("List is not sorted.",
-                                  qa.assertListIsSorted, ['D', 'b', 'E'], key=lambda s: s.upper)
+                                  qa.assertListIsSorted, ['D', 'b', 'E'], key=lambda s: s.upper())
+
+    def test_CaseOfFailure_reports_the_first_element_out_of_order(self):
+        qa.assertExceptionMessage(r"List is not sorted. Element at index 3 \(2\) is out of order after 5.",
+                                  qa.assertListIsSorted, [1, 3, 5, 2, 0])
+
+    def test_repeated_elements(self):
+        qa.assertListIsSorted([1, 1, 2, 2])
+        qa.assertListIsSorted([2, 2, 1, 1], reverse=True)
+
+    def test_cmp(self):
+        qa.assertListIsSorted([3, 2, 1], a_cmp=lambda a, b: cmp(b, a))
+        qa.assertExceptionMessage("List is not sorted.",
+                                  qa.assertListIsSorted, [1, 2, 3], a_cmp=lambda a, b: cmp(b, a))
+        qa.assertListIsSorted([1, 2, 3], a_cmp=lambda a, b: cmp(b, a), reverse=True)
+
+    def test_strict(self):
+        qa.assertListIsSorted([1, 2, 3], strict=True)
+        qa.assertListIsSorted([3, 2, 1], reverse=True, strict=True)
+        qa.assertListIsSorted([3, 2, 1], a_cmp=lambda a, b: cmp(b, a), strict=True)
+        qa.assertExceptionMessage(r"List is not sorted. Element at index 2 \(2\) is out of order after 2.",
+                                  qa.assertListIsSorted, [1, 2, 2], strict=True)
+        qa.assertExceptionMessage(r"List is not sorted. Element at index 1 \(2\) is out of order after 2.",
+                                  qa.assertListIsSorted, [2, 2, 1], reverse=True, strict=True)
+        qa.assertExceptionMessage(r"List is not sorted. Element at index 1 \(2\) is out of order after 2.",
+                                  qa.assertListIsSorted, [2, 2, 1], a_cmp=lambda a, b: cmp(b, a), strict=True)
+
+    def test_buffers(self):
+        qa.assertListIsSorted(array.array('d', [1.5, 2, 3]))
+        qa.assertListIsSorted(array.array('i', [3, 2, 1]), reverse=True)
+        qa.assertListIsSorted(array.array('i'))
+        qa.assertListIsSorted(memoryview(b'abc'))
+        qa.assertExceptionMessage(r"List is not sorted. Element at index 2 \(1\) is out of order after 3.",
+                                  qa.assertListIsSorted, array.array('l', [2, 3, 1]))
+        qa.assertExceptionMessage("List is not sorted. Element at index 2 [...]",
+                                  qa.assertListIsSorted, memoryview(b'aca'))
+        qa.assertListIsSorted(memoryview(b'cba'), key=lambda byte: -byte)
+        qa.assertExceptionMessage(r"List is not sorted. Element at index 2 \(97\) is out of order after 99.",
+                                  qa.assertListIsSorted, memoryview(b'aca'), key=lambda byte: byte)
+        qa.assertListIsSorted(memoryview(b'cba'), a_cmp=lambda a, b: cmp(b, a))
+
+    @unittest.skipIf(qa.numpy is None, 'numpy is not installed')
+    def test_numpy_arrays(self):
+        numpy = qa.numpy
+        qa.assertListIsSorted(numpy.arange(10 ** 6))
+        qa.assertListIsSorted(numpy.arange(10 ** 6)[::-1], reverse=True, strict=True)
+        qa.assertListIsSorted(numpy.zeros(10))
+        qa.assertListIsSorted(numpy.array([], dtype=float))
+        qa.assertExceptionMessage(r"List is not sorted. Element at index 1 \(0.0\) is out of order after 0.0.",
+                                  qa.assertListIsSorted, numpy.zeros(10), strict=True)
+        values = numpy.arange(3 * qa.NUMPY_CHUNK_SIZE)
+        values[2 * qa.NUMPY_CHUNK_SIZE + 7] = -1
+        qa.assertExceptionMessage("List is not sorted. Element at index %s [...]" % (2 * qa.NUMPY_CHUNK_SIZE + 7),
+                                  qa.assertListIsSorted, values)
+        values = numpy.arange(qa.NUMPY_CHUNK_SIZE + 1)
+        values[qa.NUMPY_CHUNK_SIZE] = -1
+        qa.assertExceptionMessage("List is not sorted. Element at index %s [...]" % qa.NUMPY_CHUNK_SIZE,
+                                  qa.assertListIsSorted, values)
+
+    def test_iterables(self):
+        qa.assertListIsSorted(x * 2 for x in compat.xrange(1000))
+        qa.assertListIsSorted(compat.xrange(1000))
+        qa.assertListIsSorted(iter([]))
+        qa.assertListIsSorted('abc')
+        qa.assertExceptionMessage(r"List is not sorted. Element at index 500 \(0\) is out of order after 499.",
+                                  qa.assertListIsSorted, (x % 500 for x in compat.xrange(1000)))
 
 
 class AssertListIsNotSortedTests(unittest.TestCase):
@@ -389,7 +964,7 @@ class AssertListIsNotSortedTests(unittest.TestCase):
 
     def test_CaseOfSuccess_of_custom_list(self):
         qa.assertListIsNotSorted([1, 2, 3], reverse=True)
-        qa.assertListIsNotSorted(['D', 'b', 'E'], key=lambda s: s.upper)
+        qa.assertListIsNotSorted(['D', 'b', 'E'], key=lambda s: s.upper())
 
     def test_CaseOfFailure(self):
         qa.assertExceptionMessage("List is sorted.",
@@ -397,10 +972,21 @@ class AssertListIsNotSortedTests(unittest.TestCase):
 
     def test_CaseOfFailure_of_custom_list(self):
         qa.assertExceptionMessage("List is sorted.",
-                                  qa.assertListIsNotSorted, ['D', 'b', 'c'], key=lambda s: s.upper)
+                                  qa.assertListIsNotSorted, ['b', 'C', 'd'], key=lambda s: s.upper())
+
+    def test_iterables(self):
+        qa.assertListIsNotSorted(x % 500 for x in compat.xrange(1000))
+        qa.assertExceptionMessage("List is sorted.",
+                                  qa.assertListIsNotSorted, (x for x in compat.xrange(1000)))
 
 
 class AssertPerformanceTests(unittest.TestCase):
+    def tearDown(self):
+        # The traced threads of the next tests don't run while a killed AsyncKThread is still blocked (Python 3.11)
+        for thread in threading.enumerate():
+            if isinstance(thread, threading2.AsyncKThread) and thread.killed:
+                thread.join(5)
+
     def testAssertPerformance_BuggedMethod(self):
         def some_bugged_method():
             raise Exception("ops")
@@ -423,6 +1009,231 @@ class AssertPerformanceTests(unittest.TestCase):
         qa.assertExceptionMessage("This method is too slow: [...]",
                                   qa.assertPerformance, 0.2, some_slow_method)
 
+    def testAssertPerformance_AsyncBackend(self):
+        def some_slow_method():
+            time.sleep(0.1)
+        qa.assertPerformance(0.2, some_slow_method, backend='async')
+
+    def testAssertPerformance_AsyncBackend_ErrorSituation(self):
+        def some_slow_method():
+            while True:
+                pass
+        qa.assertExceptionMessage("This method is too slow: [...]",
+                                  qa.assertPerformance, 0.2, some_slow_method, backend='async')
+
+    def testAssertPerformance_Profile(self):
+        def hot_function():
+            while True:
+                pass
+        def some_slow_method():
+            hot_function()
+        qa.assertExceptionMessage("This method is too slow: [...]\nProfile \\(cprofile, [...]\\)[...]",
+                                  qa.assertPerformance, 0.1, some_slow_method, profile='cprofile', profilepath=None)
+        try:
+            qa.assertPerformance(0.1, some_slow_method, profile='sample', profiletop=1)
+            self.fail()
+        except AssertionError as e:
+            lines = str(e).split('\n')
+            self.assertEqual(4, len(lines))
+            self.assertTrue(lines[1].endswith(')'), lines[1]) # no file by default
+            self.assertTrue(lines[3].endswith('hot_function (test_qassertions.py:%s)' % hot_function.__code__.co_firstlineno), lines[3])
+
+    def testAssertPerformance_ProfileOfAMethodThatIsSlowJustOnce(self):
+        calls = []
+        def some_flaky_method():
+            calls.append(1)
+            if len(calls) > 1:
+                raise Exception('ops')
+            time.sleep(0.3)
+        qa.assertExceptionMessage("This method is too slow: [...]\nProfile \\(cprofile, [...]\\)[...]",
+                                  qa.assertPerformance, 0.1, some_flaky_method, profile='cprofile')
+
+    def testAssertPerformance_FailureOfTheProfileIsAppended(self):
+        def failedProfile(*args):
+            raise Exception('ops')
+        profile, profiling.profile = profiling.profile, failedProfile
+        try:
+            qa.assertExceptionMessage("This method is too slow: [...]\nThe profile failed: Exception: ops",
+                                      qa.assertPerformance, 0.1, time.sleep, 0.3, profile='cprofile')
+        finally:
+            profiling.profile = profile
+
+    def testAssertPerformance_DurationOfABlockedMethodIsTheTimeout(self):
+        for backend in ['trace', 'async']:
+            try:
+                qa.assertPerformance(0.2, time.sleep, 1.5, backend=backend)
+                self.fail()
+            except AssertionError as e:
+                lines = str(e).split('\n')
+                duration = float(lines[0].split(': ')[1])
+                self.assertTrue(0.2 <= duration < 0.5, str(e))
+                self.assertEqual('The method is still running (blocked in a C call): it was abandoned', lines[1])
+
+    def testAssertPerformance_ProfileOfABlockedMethod(self):
+        for profiler in ['cprofile', 'sample']:
+            if profiler == 'cprofile' and sys.version_info >= (3, 11):
+                continue # the blocking call is lost (3.12+), nothing is recorded after the async kill (3.11)
+            startTime = time.time()
+            qa.assertExceptionMessage("This method is too slow: [...]\n[...]abandoned\nProfile \\(%s, [...]\\)\n[...]\n[...]sleep[...]" % profiler,
+                                      qa.assertPerformance, 0.2, time.sleep, 2, profile=profiler, backend='async')
+            self.assertTrue(time.time() - startTime < 1.9)
+
+    def testAssertPerformance_InvalidProfiler(self):
+        qa.assertExceptionMessage("Invalid profiler 'xpto', use one of: cprofile, sample",
+                                  qa.assertPerformance, 1, lambda: None, profile='xpto')
+
+    def testAssertPerformance_ProcessBackend(self):
+        def some_slow_method():
+            time.sleep(0.1)
+        result = qa.assertPerformance(0.5, some_slow_method, backend='process')
+        self.assertTrue(0.1 <= result.max() < 0.5, result.max())
+        self.assertTrue(result.peakMemory > 0)
+
+    def testAssertPerformance_ProcessBackend_BigResult(self):
+        result = qa.assertPerformance(5, lambda: range(100000), backend='process')
+        self.assertTrue(result.max() < 5, result.max())
+
+    def testAssertPerformance_ProcessBackend_ErrorSituation(self):
+        def some_slow_method():
+            while True:
+                pass
+        qa.assertExceptionMessage("This method is too slow: [...]",
+                                  qa.assertPerformance, 0.2, some_slow_method, backend='process')
+
+    def testAssertPerformance_ProcessBackend_BuggedMethod(self):
+        def some_bugged_method():
+            raise Exception("ops")
+        try:
+            qa.assertPerformance(0.5, some_bugged_method, backend='process')
+        except AssertionError as e:
+            lines = str(e).split('\n')
+            self.assertEqual(['This method is bugged, It impossible to measure the performance: ops',
+                              'Traceback (most recent call last):'], lines[:2])
+            self.assertTrue('some_bugged_method' in str(e), str(e))
+            self.assertEqual('Exception: ops', lines[-1])
+        else:
+            self.fail()
+
+    def testAssertPerformance_ReturnTheDuration(self):
+        def some_slow_method():
+            time.sleep(0.1)
+        result = qa.assertPerformance(0.5, some_slow_method)
+        self.assertEqual(1, len(result))
+        self.assertEqual(None, result.peakMemory)
+
+    def testAssertPerformance_AsyncBackend_BuggedMethod(self):
+        def some_bugged_method():
+            raise Exception("ops")
+        qa.assertExceptionMessage("This method is bugged, It impossible to measure the performance: ops",
+                                  qa.assertPerformance, 0.1, some_bugged_method, backend='async')
+
+    def testAssertPerformance_ReusesTheThreads(self):
+        threads = []
+        def some_fast_method():
+            threads.append(threading.currentThread())
+        for i in range(5):
+            qa.assertPerformance(1, some_fast_method)
+        self.assertEqual(1, len(set(threads)))
+
+    def testAssertPerformance_ExpiredThreadIsReplaced(self):
+        threads = []
+        def some_method(slow):
+            threads.append(threading.currentThread())
+            while slow:
+                pass
+        qa.assertExceptionMessage("This method is too slow: [...]", qa.assertPerformance, 0.1, some_method, True)
+        qa.assertPerformance(1, some_method, False)
+        self.assertNotEqual(threads[0], threads[1])
+        self.assertFalse(threads[0].is_alive())
+
+class AssertBenchmarkTests(unittest.TestCase):
+    def testBenchmark(self):
+        spy = []
+        result = qa.benchmark(spy.append, 1, warmup=2, repeat=5)
+        self.assertEqual(7, len(spy))
+        self.assertEqual(5, len(result))
+        self.assertEqual(2, result.warmup)
+
+    def testAssertBenchmark_BuggedMethod(self):
+        def some_bugged_method():
+            raise Exception("ops")
+        qa.assertExceptionMessage("This method is bugged, It impossible to measure the performance: ops",
+                                  qa.assertBenchmark, 0.1, some_bugged_method)
+
+    def testAssertBenchmark_FastMethod(self):
+        def some_fast_method():
+            return 13
+        result = qa.assertBenchmark(1, some_fast_method, repeat=20, statistic='p95')
+        self.assertEqual(20, len(result))
+
+    def testAssertBenchmark_OneSlowExecutionDontChangeTheMedian(self):
+        spy = []
+        def some_method():
+            spy.append(1)
+            if len(spy) % 6 == 3: time.sleep(0.3)
+        qa.assertBenchmark(0.2, some_method, warmup=1, repeat=5)
+        qa.assertExceptionMessage("This method is too slow: max of [...] > 0.2 ([...])",
+                                  qa.assertBenchmark, 0.2, some_method, warmup=1, repeat=5, statistic='max')
+
+class AssertThroughputTests(unittest.TestCase):
+    def test_calls(self):
+        spy = []
+        result = qa.assertThroughput(spy.append, 1, calls=100, concurrency=3)
+        self.assertEqual(100, len(spy))
+        self.assertEqual(100, result.calls())
+        self.assertEqual(3, result.concurrency)
+
+    def test_duration(self):
+        result = qa.assertThroughput(time.sleep, 0.01, duration=0.2, concurrency=4)
+        self.assertTrue(0.2 <= result.elapsed < 0.4, result.elapsed)
+        self.assertTrue(40 <= result.calls() <= 100, result.calls())
+
+    def test_concurrent_calls(self):
+        result = qa.assertThroughput(time.sleep, 0.05, calls=8, concurrency=8, minops=50)
+        self.assertTrue(result.elapsed < 0.1, result.elapsed)
+
+    def test_minimum_throughput(self):
+        qa.assertExceptionMessage('The throughput is too low: [0-9.]+ ops/sec < 1000 ops/sec\ncalls=10, concurrency=1, [...]',
+                                  qa.assertThroughput, time.sleep, 0.01, calls=10, concurrency=1, minops=1000)
+
+    def test_maximum_latency(self):
+        def some_method(value):
+            if value.pop(): time.sleep(0.05)
+        values = [True] + [False] * 99
+        qa.assertExceptionMessage('The latency is too high: max of [0-9.]+s > 0.01\n[...]',
+                                  qa.assertThroughput, some_method, values, calls=100, maxlatency=0.01, statistic='max')
+
+    def test_bugged_method(self):
+        def some_method():
+            raise Exception('ops')
+        qa.assertExceptionMessage('This method is bugged, It impossible to measure the throughput: ops \\(10 of 10 calls\\)',
+                                  qa.assertThroughput, some_method, calls=10)
+
+    def test_processes(self):
+        result = qa.assertThroughput(time.sleep, 0.05, executor='process', calls=4, concurrency=4)
+        self.assertEqual(4, result.calls())
+        self.assertTrue(result.elapsed < 0.1, result.elapsed)
+
+    def test_process_that_dies(self):
+        try:
+            qa.assertThroughput(os._exit, 3, executor='process', calls=4, concurrency=2)
+        except AssertionError as e:
+            self.assertEqual('This method is bugged, It impossible to measure the throughput: The process finished with exit code 3', str(e))
+        else:
+            self.fail()
+
+    def test_processes_with_many_calls(self):
+        # The latencies of the children are bigger than the buffer of the pipe
+        result = qa.assertThroughput(lambda: None, executor='process', concurrency=2, calls=40000)
+        self.assertEqual(40000, result.calls())
+
+    def test_invalid_arguments(self):
+        qa.assertExceptionMessage("Invalid executor 'xpto', use one of: thread, process, asyncio",
+                                  qa.assertThroughput, time.sleep, 0, executor='xpto')
+        qa.assertExceptionMessage('The concurrency must be greater than 0.',
+                                  qa.assertThroughput, time.sleep, 0, concurrency=0)
+
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
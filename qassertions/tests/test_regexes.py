@@ -0,0 +1,102 @@
+import random
+import re
+import unittest
+
+from qassertions import regexes
+
+
+class CompilePatternTests(unittest.TestCase):
+    def setUp(self):
+        regexes.clearCache()
+
+    def tearDown(self):
+        regexes.clearCache()
+
+    def test_compiled_patterns_are_cached(self):
+        self.assertTrue(regexes.compilePattern('a+b') is regexes.compilePattern('a+b'))
+        self.assertFalse(regexes.compilePattern('a+b') is regexes.compilePattern('a+b', re.I))
+        self.assertEqual(2, regexes.cacheSize())
+
+    def test_cache_is_bounded(self):
+        size = regexes.CACHE_SIZE
+        try:
+            regexes.CACHE_SIZE = 3
+            first = regexes.compilePattern('a0')
+            for i in range(1, 4):
+                regexes.compilePattern('a%s' % i)
+            self.assertEqual(3, regexes.cacheSize())
+            re.purge()
+            self.assertFalse(first is regexes.compilePattern('a0'))
+        finally:
+            regexes.CACHE_SIZE = size
+
+    def test_least_recently_used_pattern_is_removed(self):
+        size = regexes.CACHE_SIZE
+        try:
+            regexes.CACHE_SIZE = 2
+            first = regexes.compilePattern('a0')
+            second = regexes.compilePattern('a1')
+            regexes.compilePattern('a0')
+            regexes.compilePattern('a2')
+            re.purge()
+            self.assertTrue(first is regexes.compilePattern('a0'))
+            self.assertFalse(second is regexes.compilePattern('a1'))
+        finally:
+            regexes.CACHE_SIZE = size
+
+
+class GenerateTests(unittest.TestCase):
+    PATTERNS = [r'abc', r'abc+', r'a.?c*', r'(a|bc)\d{2,}[^x-z]', r'(\w)\1', r'^[A-Z][a-z]+$', r'[\s]x', r'a{3}',
+                r'(?:ab)+?', r'[^\W\d]+', r'\d+(\.\d{2})?']
+
+    def test_shortest_string(self):
+        self.assertEqual('abc', regexes.generate('abc+'))
+        self.assertEqual('a00a', regexes.generate(r'(a|bc)\d{2,}[^x-z]'))
+        self.assertEqual('aa', regexes.generate(r'(\w)\1'))
+
+    def test_extra_repetitions(self):
+        self.assertEqual('abccc', regexes.generate('abc+', extra=2))
+        self.assertEqual('ab', regexes.generate('abc?', extra=0))
+
+    def test_generated_strings_match(self):
+        rnd = random.Random(0)
+        for pattern in self.PATTERNS:
+            for i in range(20):
+                value = regexes.generate(pattern, rnd, 3)
+                self.assertTrue(re.match(pattern, value), (pattern, value))
+
+    def test_matching_values(self):
+        for pattern in self.PATTERNS:
+            values = regexes.matchingValues(pattern)
+            self.assertTrue(values)
+            for value in values:
+                self.assertTrue(re.match(pattern, value), (pattern, value))
+
+    def test_non_matching_values(self):
+        for pattern in self.PATTERNS:
+            for value in regexes.nonMatchingValues(pattern):
+                self.assertFalse(re.search(pattern, value), (pattern, value))
+
+    def test_non_matching_values_of_a_pattern_that_matches_everything(self):
+        self.assertEqual([], regexes.nonMatchingValues('a*'))
+
+    def test_bytes_patterns(self):
+        for pattern in [b'abc', b'a+b?', b'[0-9]{2}x', b'a*']:
+            values = regexes.matchingValues(pattern)
+            self.assertTrue(values)
+            for value in values:
+                self.assertTrue(isinstance(value, bytes), value)
+                self.assertTrue(re.match(pattern, value), (pattern, value))
+            for value in regexes.nonMatchingValues(pattern):
+                self.assertTrue(isinstance(value, bytes), value)
+                self.assertFalse(re.search(pattern, value), (pattern, value))
+        self.assertEqual([b'bbc', b'bbcbbc'], regexes.nonMatchingValues(b'abc'))
+
+    def test_non_ascii_sets(self):
+        for pattern in [u'[\xe0-\xfc]+', r'[\x80-\xff]', u'[^\x00-\x7f]', u'\u4e00[\u4e00-\u9fff]{2}', u'[\xe9]x']:
+            for value in regexes.matchingValues(pattern):
+                self.assertTrue(re.match(pattern, value), (pattern, value))
+            for value in regexes.nonMatchingValues(pattern):
+                self.assertFalse(re.search(pattern, value), (pattern, value))
+        self.assertEqual(u'\xe0', regexes.generate(u'[\xe0-\xfc]'))
+        self.assertEqual('\x80', regexes.generate(r'[\x80-\xff]')) # bytes for a str pattern
@@ -0,0 +1,79 @@
+import itertools
+import unittest
+
+from qassertions.strategies import *
+
+
+class CoveringArrayTests(unittest.TestCase):
+    def assertCovers(self, rows, sizes, strength):
+        for params in itertools.combinations(range(len(sizes)), strength):
+            for values in itertools.product(*[range(sizes[p]) for p in params]):
+                self.assertTrue(any(tuple(row[p] for p in params) == values for row in rows), str((params, values)))
+
+    def testLessParametersThanStrengthIsTheFullProduct(self):
+        self.assertEqual([[0, 0], [0, 1], [1, 0], [1, 1], [2, 0], [2, 1]], coveringArray([3, 2], 2))
+
+    def testCoversAllPairs(self):
+        sizes = [3, 2, 3, 4, 2, 3, 3]
+        self.assertCovers(coveringArray(sizes, 2), sizes, 2)
+
+    def testCoversAllTriples(self):
+        sizes = [2, 3, 2, 2, 3]
+        self.assertCovers(coveringArray(sizes, 3), sizes, 3)
+
+    def testNumberOfRowsGrowsSlowlyWithTheNumberOfParameters(self):
+        rows = coveringArray([3] * 20, 2)
+        self.assertCovers(rows, [3] * 20, 2)
+        self.assertTrue(len(rows) < 25, len(rows))
+
+
+class OneAtATimeTests(unittest.TestCase):
+    def testCases(self):
+        cases = list(OneAtATime().generateCases([1, 'x', 2], [(0, [0, 1], [-1]), (2, [2], [3, 4])]))
+        self.assertEqual([(True, (0, 'x', 2)), (True, (1, 'x', 2)), (False, (-1, 'x', 2)),
+                           (True, (1, 'x', 2)), (False, (1, 'x', 3)), (False, (1, 'x', 4))], cases)
+
+
+class AllPairsTests(unittest.TestCase):
+    def testFailureValuesAreCombinedWithGoodValues(self):
+        cases = list(AllPairs().generateCases([1, 2], [(0, [0, 1], [-1]), (1, [2, 3], [9])]))
+        self.assertEqual([(True, (0, 2)), (True, (0, 3)), (True, (1, 2)), (True, (1, 3)),
+                           (False, (-1, 2)), (False, (1, 9))], cases)
+
+    def testArgumentsWithoutSuccessValues(self):
+        cases = list(AllPairs().generateCases([1, 2], [(0, [0, 1], [-1]), (1, [], [9])]))
+        self.assertEqual([(True, (0, 2)), (True, (1, 2)), (False, (-1, 2)), (False, (1, 9))], cases)
+
+
+class FullProductTests(unittest.TestCase):
+    def testCases(self):
+        cases = list(FullProduct().generateCases([1, 2, 3], [(0, [0, 1], []), (1, [2, 3], []), (2, [3, 4], [])]))
+        self.assertEqual(8, len(cases))
+
+    def testBudget(self):
+        strategy = FullProduct(budget=7)
+        try:
+            list(strategy.generateCases([1, 2, 3], [(0, [0, 1], []), (1, [2, 3], []), (2, [3, 4], [])]))
+        except Exception as e:
+            self.assertEqual('The full product has 8 cases, more than the budget of 7 cases.', str(e))
+        else: self.fail()
+
+
+class GetStrategyTests(unittest.TestCase):
+    def testDefaultStrategy(self):
+        self.assertTrue(isinstance(getStrategy(), OneAtATime))
+
+    def testStrategyInstance(self):
+        strategy = NWise(3)
+        self.assertTrue(strategy is getStrategy(strategy))
+
+    def testInvalidStrategy(self):
+        try:
+            getStrategy('xpto')
+        except Exception as e:
+            self.assertEqual("Invalid strategy 'xpto', use one of: allpairs, oneatatime, product", str(e))
+        else: self.fail()
+
+
+if __name__ == "__main__":
+    unittest.main()
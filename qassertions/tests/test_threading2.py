@@ -1,8 +1,12 @@
+import os
+import sys
 import threading
 import time
 import unittest
+import warnings
 
 from qassertions import threading2
+from qassertions import timing
 
 
 class KThreadTests(unittest.TestCase):
@@ -27,12 +31,12 @@ class KThreadTests(unittest.TestCase):
         self.thread = threading2.KThread(target=func, args=[spy])
         numberOfThreads = threading.activeCount()
         self.thread.start()
-        self.assertEquals(numberOfThreads + 1, threading.activeCount())
+        self.assertEqual(numberOfThreads + 1, threading.activeCount())
         self.assertTrue(self.thread.isAlive())
         self.thread.join(0.5)
         self.thread.kill()
         self.thread.join()
-        self.assertEquals(numberOfThreads, threading.activeCount())
+        self.assertEqual(numberOfThreads, threading.activeCount())
         self.assertFalse(self.thread.isAlive())
         self.assertTrue(len(spy) < 3)
 
@@ -50,7 +54,7 @@ class KThreadTests(unittest.TestCase):
         self.thread = threading2.KThread(target=func, args=[spy])
         self.thread.start()
         self.thread.joinWithTimeout(0.5)
-        self.assertEquals(numberOfThreads, threading.activeCount())
+        self.assertEqual(numberOfThreads, threading.activeCount())
         self.assertFalse(self.thread.isAlive())
         self.assertTrue(self.thread.isExpired())
         self.assertTrue(len(spy) < 3)
@@ -69,7 +73,7 @@ class KThreadTests(unittest.TestCase):
         self.thread = threading2.KThread(target=func, args=[spy])
         self.thread.start()
         self.thread.joinWithTimeout(1)
-        self.assertEquals(numberOfThreads, threading.activeCount())
+        self.assertEqual(numberOfThreads, threading.activeCount())
         self.assertFalse(self.thread.isAlive())
         self.assertFalse(self.thread.isExpired())
         self.assertTrue(len(spy) == 3)
@@ -89,7 +93,7 @@ class KThreadTests(unittest.TestCase):
         self.thread = threading2.KThread(target=func, args=[spy])
         self.thread.start()
         self.thread.joinWithTimeout(-1)
-        self.assertEquals(numberOfThreads, threading.activeCount())
+        self.assertEqual(numberOfThreads, threading.activeCount())
         self.assertFalse(self.thread.isAlive())
         self.assertFalse(self.thread.isExpired())
         self.assertTrue(len(spy) == 3)
@@ -102,8 +106,8 @@ class KThreadTests(unittest.TestCase):
         try:
             self.thread.start()
             self.thread.joinWithTimeout(-1)
-        except Exception, e:
-            self.assertEquals('Exception in Thread-33: some msg', e.message)
+        except Exception as e:
+            self.assertEqual('Exception in Thread-33: some msg', e.message)
         else: self.fail()
 
     def testKThreadMustNotRaiseAnExceptionToParentThreadIfTimeoutExpired(self):
@@ -113,7 +117,7 @@ class KThreadTests(unittest.TestCase):
         try:
             self.thread.start()
             self.thread.joinWithTimeout(0.1)
-        except Exception, e:
+        except Exception as e:
             self.fail()
         else: pass
 
@@ -125,9 +129,9 @@ class KThreadTests(unittest.TestCase):
         try:
             self.thread.start()
             self.thread.joinWithTimeout(-1)
-        except Exception, e:
-            self.assertEquals('MyException in Some Thread: some msg', e.message)
-            self.assertEquals('some msg', str(e))
+        except Exception as e:
+            self.assertEqual('MyException in Some Thread: some msg', e.message)
+            self.assertEqual('some msg', str(e))
         else:
             self.fail()
 
@@ -136,13 +140,379 @@ class KThreadTests(unittest.TestCase):
             time.sleep(0.1)
         self.thread = threading2.KThread(target=func, name='Some Thread')
         self.thread.daemon = True
-        start = time.clock()
+        start = timing.clock()
         self.thread.start()
         self.thread.joinWithTimeout(10000)
-        end = time.clock()
+        end = timing.clock()
         print(end - start)
         self.assertTrue(end - start < 1)
 
+class AsyncKThreadTests(unittest.TestCase):
+    def setUp(self):
+        self.thread = None
+
+    def tearDown(self):
+        if self.thread.isAlive():
+            self.thread.kill()
+            self.thread.join()
+
+    def testKillAsyncKThreadInABusyLoop(self):
+        spy = []
+        def func(spy):
+            while True:
+                spy.append(1)
+                del spy[:]
+
+        self.thread = threading2.AsyncKThread(target=func, args=[spy])
+        self.thread.start()
+        self.thread.joinWithTimeout(0.2)
+        self.assertFalse(self.thread.isAlive())
+        self.assertTrue(self.thread.isExpired())
+
+    def testAsyncKThreadDoesNotInstallATrace(self):
+        spy = []
+        def func(spy):
+            spy.append(sys.gettrace())
+
+        self.thread = threading2.AsyncKThread(target=func, args=[spy])
+        self.thread.start()
+        self.thread.joinWithTimeout(1)
+        self.assertEqual([None], spy)
+
+    def testAsyncKThreadMustRaiseAnExceptionToParentThreadIfOccurs(self):
+        def func():
+            raise Exception('some msg')
+        self.thread = threading2.AsyncKThread(target=func, name='Thread-33')
+        try:
+            self.thread.start()
+            self.thread.joinWithTimeout(-1)
+        except Exception as e:
+            self.assertEqual('Exception in Thread-33: some msg', e.message)
+        else: self.fail()
+
+    def joinInAnotherThread(self, timeout):
+        joiner = threading.Thread(target=self.thread.joinWithTimeout, args=(timeout,))
+        joiner.daemon = True
+        startTime = time.time()
+        joiner.start()
+        joiner.join(5)
+        self.assertFalse(joiner.is_alive(), 'joinWithTimeout hangs')
+        return time.time() - startTime
+
+    def testKillAsyncKThreadBlockedInACCall(self):
+        # The SystemExit is delivered only after the sleep, when the target may have returned
+        for i in range(4):
+            self.thread = threading2.AsyncKThread(target=time.sleep, args=(0.3,))
+            self.thread.start()
+            self.joinInAnotherThread(0.1)
+            self.assertTrue(self.thread.isExpired())
+            self.thread.join(2)
+            self.assertFalse(self.thread.isAlive(), 'The thread never notified the join')
+
+    def testThreadBlockedAfterTheKillIsAbandoned(self):
+        killTimeout, threading2.KILL_TIMEOUT = threading2.KILL_TIMEOUT, 0.1
+        try:
+            self.thread = threading2.AsyncKThread(target=time.sleep, args=(1,))
+            self.thread.daemon = True
+            self.thread.start()
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                self.assertTrue(self.joinInAnotherThread(0.1) < 0.8)
+            self.assertTrue(self.thread.isExpired())
+            self.assertTrue(self.thread.abandoned)
+            caught = [warning for warning in caught if warning.category is RuntimeWarning]
+            self.assertEqual(1, len(caught))
+            self.assertTrue('abandoned' in str(caught[0].message), caught[0].message)
+        finally:
+            threading2.KILL_TIMEOUT = killTimeout
+
+    def testKillFinishedAsyncKThread(self):
+        self.thread = threading2.AsyncKThread(target=lambda: None)
+        self.thread.start()
+        self.thread.join()
+        self.thread.kill()
+
+
+class KProcessTests(unittest.TestCase):
+    def setUp(self):
+        self.process = None
+
+    def tearDown(self):
+        if self.process.isAlive():
+            self.process.kill()
+            self.process.join()
+
+    def testProcessWithTimeoutExpiring(self):
+        def func():
+            while True:
+                pass
+        self.process = threading2.KProcess(target=func)
+        self.process.start()
+        self.process.joinWithTimeout(0.2)
+        self.assertFalse(self.process.isAlive())
+        self.assertTrue(self.process.isExpired())
+        self.assertEqual(None, self.process.duration)
+
+    def testProcessWithTimeoutWithoutExpiring(self):
+        def func(seconds):
+            time.sleep(seconds)
+        self.process = threading2.KProcess(target=func, args=[0.1])
+        self.process.start()
+        self.process.joinWithTimeout(1)
+        self.assertFalse(self.process.isAlive())
+        self.assertFalse(self.process.isExpired())
+        self.assertTrue(0.1 <= self.process.duration < 1)
+        self.assertTrue(self.process.peakMemory > 0)
+
+    def testStartupOfTheProcessIsNotInTheTimeout(self):
+        runInProcess = threading2._runInProcess
+        def slowStartup(*args):
+            time.sleep(0.5)
+            runInProcess(*args)
+        threading2._runInProcess = slowStartup
+        try:
+            self.process = threading2.KProcess(target=time.sleep, args=[0.1])
+            self.process.start()
+            self.process.joinWithTimeout(0.3)
+        finally:
+            threading2._runInProcess = runInProcess
+        self.assertFalse(self.process.isExpired())
+        self.assertTrue(0.1 <= self.process.duration < 0.3)
+
+    def testElapsedTimeOfAnExpiredProcess(self):
+        self.process = threading2.KProcess(target=time.sleep, args=[2])
+        self.process.start()
+        self.process.joinWithTimeout(0.2)
+        self.assertTrue(self.process.isExpired())
+        self.assertTrue(0.2 <= self.process.elapsed < 0.5, self.process.elapsed)
+
+    def testProcessResult(self):
+        self.process = threading2.KProcess(target=lambda x: x * 2, args=[21])
+        self.process.start()
+        self.process.joinWithTimeout(-1)
+        self.assertEqual(42, self.process.result)
+
+    def testBigResultIsNotTakenAsTimeout(self):
+        # Bigger than the buffer of the pipe, the child blocks in send() until the parent reads it
+        self.process = threading2.KProcess(target=lambda: 'x' * (1 << 20))
+        self.process.start()
+        self.process.joinWithTimeout(5)
+        self.assertFalse(self.process.isExpired())
+        self.assertEqual(1 << 20, len(self.process.result))
+        self.process = threading2.KProcess(target=lambda: 'x' * (1 << 20))
+        self.process.start()
+        self.process.joinWithTimeout(-1)
+        self.assertEqual(1 << 20, len(self.process.result))
+
+    def testProcessIsIsolated(self):
+        spy = []
+        self.process = threading2.KProcess(target=spy.append, args=[1])
+        self.process.start()
+        self.process.joinWithTimeout(-1)
+        self.assertEqual([], spy)
+
+    def testExceptionMessageMustHaveTypeAndProcessName(self):
+        class MyException(Exception): pass
+        def func():
+            raise MyException('some msg')
+        self.process = threading2.KProcess(target=func, name='Some Process')
+        try:
+            self.process.start()
+            self.process.joinWithTimeout(-1)
+        except Exception as e:
+            self.assertEqual('MyException in Some Process: some msg', e.message)
+            self.assertEqual('some msg', str(e))
+        else:
+            self.fail()
+
+    def testTracebackOfTheChild(self):
+        def func():
+            raise ValueError('some msg')
+        self.process = threading2.KProcess(target=func)
+        try:
+            self.process.start()
+            self.process.joinWithTimeout(-1)
+        except Exception as e:
+            self.assertTrue(e.traceback.startswith('Traceback (most recent call last):'), e.traceback)
+            self.assertTrue(e.traceback.endswith('ValueError: some msg\n'), e.traceback)
+            self.assertEqual(e.traceback, self.process.traceback)
+            self.assertEqual('some msg\n' + e.traceback.rstrip(), threading2.errorMessage(e))
+        else:
+            self.fail()
+
+    def testProcessThatDiesWithoutResult(self):
+        def func():
+            os._exit(3)
+        self.process = threading2.KProcess(target=func, name='Some Process')
+        try:
+            self.process.start()
+            self.process.joinWithTimeout(-1)
+        except Exception as e:
+            self.assertEqual('The process finished with exit code 3', str(e))
+        else:
+            self.fail()
+
+
+class GetKThreadClassTests(unittest.TestCase):
+    def testBackends(self):
+        self.assertEqual(threading2.KThread, threading2.getKThreadClass())
+        self.assertEqual(threading2.KThread, threading2.getKThreadClass('trace'))
+        self.assertEqual(threading2.AsyncKThread, threading2.getKThreadClass('async'))
+        self.assertEqual(threading2.KProcess, threading2.getKThreadClass('process'))
+
+    def testInvalidBackend(self):
+        try:
+            threading2.getKThreadClass('xpto')
+        except Exception as e:
+            self.assertEqual("Invalid backend 'xpto', use one of: async, process, trace", str(e))
+        else: self.fail()
+
+class BarrierTests(unittest.TestCase):
+    def testThreadsAreReleasedTogether(self):
+        barrier = threading2.Barrier(3)
+        spy = []
+        def func(index):
+            spy.append(('arrived', index))
+            barrier.wait()
+            spy.append(('released', index))
+        threads = [threading.Thread(target=func, args=(i,)) for i in range(3)]
+        for thread in threads[:2]:
+            thread.start()
+        time.sleep(0.1)
+        self.assertEqual([], [event for event in spy if event[0] == 'released'])
+        threads[2].start()
+        for thread in threads:
+            thread.join(1)
+        self.assertEqual(3, len([event for event in spy if event[0] == 'released']))
+
+    def testInvalidNumberOfParties(self):
+        try:
+            threading2.Barrier(0)
+            self.fail('It was expected an exception.')
+        except Exception as e:
+            self.assertEqual('The number of parties must be greater than 0.', str(e))
+
+class KWorkerPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.pool = threading2.KWorkerPool(2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def testTheWorkersAreReused(self):
+        names = [self.pool.run(1, lambda: threading.currentThread().getName()).result for i in range(3)]
+        self.assertEqual(['KWorker-1'] * 3, names)
+
+    def testDurationIsMeasuredInTheWorker(self):
+        task = self.pool.run(1, time.sleep, (0.1,))
+        self.assertTrue(0.1 <= task.duration < 0.2, task.duration)
+        self.assertFalse(task.isExpired())
+
+    def testExpiredWorkerIsKilledAndReplaced(self):
+        def func():
+            while True:
+                pass
+        task = self.pool.run(0.1, func)
+        self.assertTrue(task.isExpired())
+        self.assertEqual('KWorker-2', self.pool.run(1, lambda: threading.currentThread().getName()).result)
+
+    def testElapsedOfAnExpiredTaskDoesNotIncludeTheKill(self):
+        task = self.pool.run(0.1, time.sleep, (1.5,))
+        self.assertTrue(task.isExpired())
+        self.assertTrue(0.1 <= task.elapsed < 0.5, task.elapsed)
+
+    def testBlockedWorkerIsAbandonedWithAWarning(self):
+        killTimeout, threading2.KILL_TIMEOUT = threading2.KILL_TIMEOUT, 0.1
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                task = self.pool.run(0.1, time.sleep, (1,))
+            self.assertTrue(task.abandoned)
+            self.assertEqual(1, len([warning for warning in caught if warning.category is RuntimeWarning]))
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                task = self.pool.run(0.1, lambda: sum(1 for i in iter(int, 1)))
+            self.assertTrue(task.isExpired())
+            self.assertFalse(task.abandoned)
+            self.assertEqual([], [warning for warning in caught if warning.category is RuntimeWarning])
+        finally:
+            threading2.KILL_TIMEOUT = killTimeout
+
+    def testAsyncWorkers(self):
+        pool = threading2.KWorkerPool(1, threading2.AsyncKWorker)
+        def func():
+            while True:
+                pass
+        try:
+            self.assertTrue(pool.run(0.1, func).isExpired())
+            self.assertEqual(13, pool.run(1, lambda: 13).result)
+        finally:
+            pool.shutdown()
+
+    def testTaskFinishedRightAtTheDeadline(self):
+        release = threading.Event()
+        finished = threading.Event()
+        class LateWorker(threading2.AsyncKWorker):
+            def kill(self):
+                # The task finishes after the wait gives up, the worker goes back to tasks.get()
+                release.set()
+                finished.wait(1)
+                time.sleep(0.05)
+                threading2.AsyncKWorker.kill(self)
+        def func():
+            release.wait(1)
+            finished.set()
+        pool = threading2.KWorkerPool(1, LateWorker)
+        calls = []
+        def runTwice():
+            calls.append(pool.run(0.05, func).isExpired())
+            calls.append(pool.run(1, lambda: 13).result)
+        thread = threading.Thread(target=runTwice)
+        thread.daemon = True
+        thread.start()
+        thread.join(5)
+        try:
+            self.assertFalse(thread.is_alive(), 'The pool hangs when the task finishes right at the deadline.')
+            self.assertEqual([True, 13], calls)
+        finally:
+            pool.shutdown()
+
+    def testException(self):
+        def func():
+            raise Exception('ops')
+        try:
+            self.pool.run(1, func)
+            self.fail('It was expected an exception.')
+        except Exception as e:
+            self.assertEqual('ops', str(e))
+            self.assertEqual('Exception in KWorker-1: ops', e.message)
+
+    def testThePoolIsBounded(self):
+        running = []
+        def func():
+            running.append(1)
+            time.sleep(0.1)
+            running.pop()
+            return len(running)
+        threads = [threading.Thread(target=self.pool.run, args=(1, func)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        self.assertEqual(2, len(running))
+        for thread in threads:
+            thread.join()
+        self.assertEqual(2, self.pool.created)
+
+    def testSharedPools(self):
+        self.assertTrue(threading2.getWorkerPool() is threading2.getWorkerPool('trace'))
+        self.assertFalse(threading2.getWorkerPool('trace') is threading2.getWorkerPool('async'))
+        try:
+            threading2.getWorkerPool('xpto')
+            self.fail('It was expected an exception.')
+        except Exception as e:
+            self.assertEqual("Invalid backend 'xpto', use one of: async, trace", str(e))
+
+
 if __name__ == "__main__":
         #import sys;sys.argv = ['', 'Test.testName']
         unittest.main()
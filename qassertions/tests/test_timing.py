@@ -0,0 +1,104 @@
+import sys
+import time
+import unittest
+
+from qassertions import timing
+from qassertions.timing import *
+
+
+class PercentileTests(unittest.TestCase):
+    def testExactPosition(self):
+        self.assertEqual(3, percentile([1, 2, 3, 4, 5], 50))
+        self.assertEqual(1, percentile([1, 2, 3, 4, 5], 0))
+        self.assertEqual(5, percentile([1, 2, 3, 4, 5], 100))
+
+    def testInterpolation(self):
+        self.assertEqual(2.5, percentile([1, 2, 3, 4], 50))
+        self.assertAlmostEqual(4.85, percentile([1, 2, 3, 4, 5], 96.25))
+
+    def testNoValues(self):
+        try:
+            percentile([], 50)
+        except Exception as e:
+            self.assertEqual('There is no value to calculate the percentile.', str(e))
+        else: self.fail()
+
+
+class TimingResultTests(unittest.TestCase):
+    def setUp(self):
+        self.result = TimingResult([0.4, 0.1, 0.3, 0.2])
+
+    def testStatistics(self):
+        self.assertEqual(0.1, self.result.min())
+        self.assertEqual(0.4, self.result.max())
+        self.assertAlmostEqual(0.25, self.result.mean())
+        self.assertAlmostEqual(0.25, self.result.median())
+        self.assertAlmostEqual(0.129099, self.result.stddev(), places=5)
+
+    def testStatisticByName(self):
+        self.assertAlmostEqual(0.25, self.result.statistic('median'))
+        self.assertAlmostEqual(0.391, self.result.statistic('p97'))
+        self.assertAlmostEqual(0.379099, self.result.statistic('mean+stddev'), places=5)
+
+    def testInvalidStatistic(self):
+        try:
+            self.result.statistic('xpto')
+        except Exception as e:
+            self.assertTrue(str(e).startswith("Invalid statistic 'xpto'"))
+        else: self.fail()
+
+    def testStddevOfOneDuration(self):
+        self.assertEqual(0.0, TimingResult([0.1]).stddev())
+
+    def testStrWithoutDurations(self):
+        self.assertEqual('runs=0', str(TimingResult()))
+
+
+class ClockTests(unittest.TestCase):
+    def testClockIsIncreasing(self):
+        self.assertTrue(timing.clock() <= timing.clock())
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'clock_gettime is used only in Linux')
+    def testClocksAreAvailableInLinux(self):
+        self.assertTrue(timing.MONOTONIC)
+        self.assertTrue(timing.THREAD_CLOCK)
+
+    @unittest.skipUnless(timing.MONOTONIC, 'there is no monotonic clock')
+    def testMonotonicClockIsNotTheWallClock(self):
+        # The monotonic clocks don't start at 1970
+        self.assertTrue(abs(timing.clock() - time.time()) > 1)
+
+    @unittest.skipUnless(timing.THREAD_CLOCK, 'there is no thread clock')
+    def testThreadClockDoesntAdvanceWhileSleeping(self):
+        startTime = timing.threadClock()
+        time.sleep(0.05)
+        self.assertTrue(timing.threadClock() - startTime < 0.01)
+
+
+class ThroughputResultTests(unittest.TestCase):
+    def testOpsPerSecond(self):
+        result = ThroughputResult(TimingResult([0.1] * 50), 2.5, 4)
+        self.assertEqual(50, result.calls())
+        self.assertEqual(20, result.opsPerSecond())
+
+    def testHistogram(self):
+        result = ThroughputResult(TimingResult([0.0000005, 0.002, 0.003, 0.05, 20]), 1)
+        self.assertEqual([(1e-6, 1), (1e-5, 0), (1e-4, 0), (1e-3, 0), (1e-2, 2), (1e-1, 1), (1, 0), (10, 0), (None, 1)],
+                          result.histogram())
+        self.assertEqual([(0.01, 3), (None, 2)], result.histogram([0.01]))
+
+    def testStr(self):
+        result = ThroughputResult(TimingResult([0.002, 0.003, 0.05]), 1.5, 2)
+        lines = str(result).split('\n')
+        self.assertEqual('calls=3, concurrency=2, elapsed=1.500000s, ops/sec=2.0', lines[0])
+        self.assertTrue(lines[1].startswith('latency: runs=3, '))
+        self.assertEqual(['   <= 10ms: 2', '  <= 100ms: 1'], lines[2:])
+
+    def testFormatSeconds(self):
+        self.assertEqual('1us', formatSeconds(1e-6))
+        self.assertEqual('100ms', formatSeconds(0.1))
+        self.assertEqual('10s', formatSeconds(10))
+
+
+if __name__ == "__main__":
+    unittest.main()
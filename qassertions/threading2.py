@@ -5,18 +5,51 @@ http://www.velocityreviews.com/forums/t330554-kill-a-thread-in-python.html
 http://docs.python.org/library/threading.html
 '''
 
+import ctypes
+import inspect
+import multiprocessing
+import os
+import signal
 import sys
 import threading
+import time
 import trace
+import traceback
+import warnings
+
+from . import compat
+from . import timing
+
+try:
+  import resource
+except ImportError:
+  resource = None
+
+
+# Seconds to wait for a killed thread to finish
+KILL_TIMEOUT = 1
+# Seconds to wait for a child process to start (fork, spawn or forkserver), before the timeout of the target
+PROCESS_STARTUP_TIMEOUT = 60
+# Message of a child process that is ready to run the target
+_STARTED = 'started'
+
+
+def warnAbandoned(thread):
+  """Warn that a killed thread is still running (blocked in a C call): it can change the shared state while the next
+  assertions run."""
+  warnings.warn('%s was killed but it is still running (blocked in a C call): it was abandoned' % thread.name,
+                RuntimeWarning, stacklevel=3)
 
 
 class KThread(threading.Thread):
-  """A subclass of threading.Thread, with a kill() method."""
+  """A subclass of threading.Thread, with a kill() method. A thread that is still running after the kill (blocked in a
+  C call) is abandoned: abandoned is True and a RuntimeWarning is emitted."""
 
   def __init__(self, *args, **keywords):
     threading.Thread.__init__(self, *args, **keywords)
     self.killed = False
     self.expired = False
+    self.abandoned = False
     self.__exception = None
 
   def start(self):
@@ -32,22 +65,42 @@ class KThread(threading.Thread):
     if self.isAlive():
       self.expired = True
       self.kill()
-      # Join waits until the thread terminates.
-      self.join()
+      # The kill only stops the thread when it executes Python code again, a thread blocked in a C call (sleep, I/O)
+      # is abandoned after KILL_TIMEOUT
+      self.join(KILL_TIMEOUT)
+      if self.isAlive():
+        self.abandoned = True
+        warnAbandoned(self)
     if self.__exception is not None:
       raise self.__exception
 
   def isExpired(self):
     return self.expired
 
+  def isAlive(self):
+    # Thread.isAlive was removed in Python 3.9
+    return self.is_alive()
+
+  def installTrace(self):
+    sys.settrace(self.globaltrace)
+
+  def finishRun(self):
+    """Called by the thread when the target returns, before the cleanup of threading.Thread."""
+    pass
+
   def __run(self):
     """Hacked run function, which installs the trace."""
     try:
-      sys.settrace(self.globaltrace)
-      self.__run_backup()
-      self.run = self.__run_backup
-    except Exception, e:
-      e.message = e.__class__.__name__ + ' in ' + self.getName() + ': ' + e.message
+      try:
+        self.installTrace()
+        self.__run_backup()
+        self.run = self.__run_backup
+      finally:
+        self.finishRun()
+    except SystemExit:
+      pass # killed
+    except Exception as e:
+      e.message = e.__class__.__name__ + ' in ' + self.getName() + ': ' + str(e)
       self.__exception = e
 
   def globaltrace(self, frame, why, arg):
@@ -66,50 +119,401 @@ class KThread(threading.Thread):
     self.killed = True
 
 
-#import threading
-#import inspect
-#import ctypes
-# 
-#def _async_raise(tid, exctype):
-#    """raises the exception, performs cleanup if needed"""
-#    if not inspect.isclass(exctype):
-#        raise TypeError("Only types can be raised (not instances)")
-#    res = ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, ctypes.py_object(exctype))
-#    if res == 0:
-#        raise ValueError("invalid thread id")
-#    elif res != 1:
-#        # """if it returns a number greater than one, you're in trouble, 
-#        # and you should call it again with exc=NULL to revert the effect"""
-#        ctypes.pythonapi.PyThreadState_SetAsyncExc(tid, 0)
-#        raise SystemError("PyThreadState_SetAsyncExc failed")
-# 
-# 
-#class Thread(threading.Thread):
-#    def _get_my_tid(self):
-#        """determines this (self's) thread id"""
-#        if not self.isAlive():
-#            raise threading.ThreadError("the thread is not active")
-# 
-#        # do we have it cached?
-#        if hasattr(self, "_thread_id"):
-#            return self._thread_id
-# 
-#        # no, look for it in the _active dict
-#        for tid, tobj in threading._active.items():
-#            if tobj is self:
-#                self._thread_id = tid
-#                return tid
-# 
-#        raise AssertionError("could not determine the thread's id")
-# 
-#    def raise_exc(self, exctype):
-#        """raises the given exception type in the context of this thread"""
-#        _async_raise(self._get_my_tid(), exctype)
-# 
-#    def terminate(self):
-#        """raises SystemExit in the context of the given thread, which should 
-#        cause the thread to exit silently (unless caught)"""
-#        self.raise_exc(SystemExit)
+def _async_raise(tid, exctype):
+  """raises the exception, performs cleanup if needed"""
+  if not inspect.isclass(exctype):
+    raise TypeError("Only types can be raised (not instances)")
+  res = ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(tid), ctypes.py_object(exctype))
+  if res == 0:
+    raise ValueError("invalid thread id")
+  elif res != 1:
+    # """if it returns a number greater than one, you're in trouble, 
+    # and you should call it again with exc=NULL to revert the effect"""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(tid), None)
+    raise SystemError("PyThreadState_SetAsyncExc failed")
+
+
+def _receiveAsyncExc(exctype, timeout):
+  """Execute Python code until the asynchronous exception of the current thread is raised (at most timeout seconds).
+  It is raised when the thread returns from a sleep, that grows up to 10ms so the wait doesn't spin."""
+  deadline = timing.clock() + timeout
+  delay = 0.0001
+  try:
+    while timing.clock() < deadline:
+      time.sleep(min(delay, max(deadline - timing.clock(), 0)))
+      delay = min(delay * 2, 0.01)
+  except exctype:
+    pass
+
+
+class AsyncKThread(KThread):
+  """A KThread that doesn't trace the executed lines. kill() raises SystemExit asynchronously in the thread, so the
+  thread runs at full speed. Like KThread, it stops only when the thread executes Python code again (not inside a
+  blocking call).
+  In Python 3.11 the traced threads (KThread) don't run while the SystemExit of a kill is pending in a thread blocked
+  in a C call, until it is delivered (a bug of the interpreter)."""
+
+  def __init__(self, *args, **keywords):
+    KThread.__init__(self, *args, **keywords)
+    # The kill and the end of the target are serialized, so the SystemExit is never raised after the target returned
+    # (in the cleanup of threading.Thread, that would never notify the join)
+    self.killLock = threading.Lock()
+    self.finished = False
+
+  def installTrace(self):
+    pass
+
+  def finishRun(self):
+    with self.killLock:
+      self.finished = True
+      if not self.killed:
+        return
+      # The SystemExit of a kill that was not delivered yet (the target was blocked in a C call) must not be raised
+      # in the cleanup of threading.Thread
+      if not compat.PY3:
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(self.ident), None)
+      elif sys.exc_info()[0] is not SystemExit:
+        # Python 3 never resets the pending flag of the interpreter when the exception is cleared with NULL, every
+        # thread would stop at each instruction to look for it: the exception is received here instead
+        _receiveAsyncExc(SystemExit, KILL_TIMEOUT)
+
+  def kill(self):
+    with self.killLock:
+      self.killed = True
+      if self.isAlive() and not self.finished:
+        try:
+          _async_raise(self.ident, SystemExit)
+        except ValueError:
+          pass # the thread has just finished
+
+
+class KTask(object):
+  """A call executed by a KWorkerPool. When it finishes, duration (seconds, measured in the worker, so the startup of
+  the thread is not included) and result are available. When it expires, elapsed is the time waited for it (without
+  the kill of the worker) and abandoned is True if the worker was still running after the kill."""
+
+  def __init__(self, target, args=(), kwargs=None):
+    self.target = target
+    self.args = args
+    self.kwargs = kwargs or {}
+    self.expired = False
+    self.elapsed = None
+    self.abandoned = False
+    self.duration = None
+    self.result = None
+    self.exception = None
+    self.done = threading.Event()
+
+  def isExpired(self):
+    return self.expired
+
+  def run(self, name):
+    startTime = timing.clock()
+    try:
+      try:
+        self.result = self.target(*self.args, **self.kwargs)
+      finally:
+        self.duration = timing.clock() - startTime
+    except Exception as e:
+      e.message = e.__class__.__name__ + ' in ' + name + ': ' + str(e)
+      self.exception = e
+    self.done.set()
+
+
+class KWorker(KThread):
+  """A persistent KThread that executes the tasks of a KWorkerPool. A killed worker finishes (SystemExit) and it is
+  never reused.
+  The tasks are handed over with a raw lock instead of a Queue: the kill can interrupt the Python code of Queue.get
+  while it holds the mutex of the queue, so a later put would block forever."""
+
+  def __init__(self, name):
+    super(KWorker, self).__init__(name=name) # AsyncKThread in AsyncKWorker
+    self.daemon = True
+    self.task = None
+    self.wakeup = threading.Lock()
+    self.wakeup.acquire()
+
+  def submit(self, task):
+    """Hand over the task (None finishes the worker). Never blocks, the worker has at most one task at a time."""
+    self.task = task
+    try:
+      self.wakeup.release()
+    except (threading.ThreadError, RuntimeError):
+      pass # the worker didn't take the previous submission (it was killed)
+
+  def run(self):
+    while not self.killed:
+      self.wakeup.acquire()
+      task, self.task = self.task, None
+      if task is None:
+        return
+      task.run(self.getName())
+
+
+class AsyncKWorker(KWorker, AsyncKThread):
+  """A KWorker that is killed with an asynchronous exception, like AsyncKThread (no trace)."""
+
+
+class KWorkerPool(object):
+  """Bounded pool of persistent killable workers, so the assertions don't pay the creation of a thread per call.
+  At most `size` tasks run at the same time, the others wait for a free worker. A worker killed because its task
+  expired is replaced by a new one in the next task."""
+
+  def __init__(self, size=4, workerClass=KWorker):
+    if size < 1: raise Exception('The size of the pool must be greater than 0.')
+    self.size = size
+    self.workerClass = workerClass
+    self.slots = threading.Semaphore(size)
+    self.lock = threading.Lock()
+    self.idle = []
+    self.created = 0
+
+  def acquireWorker(self):
+    with self.lock:
+      if self.idle:
+        return self.idle.pop()
+      self.created += 1
+      name = '%s-%s' % (self.workerClass.__name__, self.created)
+    worker = self.workerClass(name)
+    worker.start()
+    return worker
+
+  def run(self, timeout, target, args=(), kwargs=None):
+    """Execute target(*args, **kwargs) in a worker and wait for it at most `timeout` seconds (< 0 means no timeout).
+    The worker is killed if the timeout expires. Return the KTask."""
+    task = KTask(target, args, kwargs)
+    self.slots.acquire()
+    try:
+      worker = self.acquireWorker()
+      startTime = timing.clock()
+      worker.submit(task)
+      if timeout < 0:
+        while not task.done.wait(1): # Event.wait() without timeout can't be interrupted
+          pass
+      elif not task.done.wait(timeout):
+        task.elapsed = timing.clock() - startTime
+        task.expired = True
+        worker.kill()
+        # The task may have finished just after the wait: the worker is waiting for the next task, that the kill
+        # can't interrupt, so it needs the sentinel. A worker that is still running after KILL_TIMEOUT is abandoned
+        # (daemon) and the slot is released anyway.
+        worker.submit(None)
+        worker.join(KILL_TIMEOUT)
+        if worker.isAlive():
+          task.abandoned = True
+          warnAbandoned(worker)
+        return task
+      with self.lock:
+        self.idle.append(worker)
+    finally:
+      self.slots.release()
+    if task.exception is not None:
+      raise task.exception
+    return task
+
+  def shutdown(self):
+    with self.lock:
+      workers, self.idle = self.idle, []
+    for worker in workers:
+      worker.submit(None)
+    for worker in workers:
+      worker.join()
+
+
+WORKERS = {
+  'trace': KWorker,
+  'async': AsyncKWorker,
+}
+POOL_SIZE = 4
+
+_pools = {}
+_poolsLock = threading.Lock()
+
+
+def getWorkerPool(backend=None):
+  """The shared KWorkerPool of the backend: None/'trace' (KWorker) or 'async' (AsyncKWorker)"""
+  if backend is None:
+    backend = 'trace'
+  if backend not in WORKERS:
+    raise Exception("Invalid backend '%s', use one of: %s" % (backend, ', '.join(sorted(WORKERS.keys()))))
+  with _poolsLock:
+    if backend not in _pools:
+      _pools[backend] = KWorkerPool(POOL_SIZE, WORKERS[backend])
+    return _pools[backend]
+
+
+def shutdownWorkerPools():
+  with _poolsLock:
+    pools = _pools.values()
+    _pools.clear()
+  for pool in pools:
+    pool.shutdown()
+
+
+def _peakMemory():
+  """maximum resident set size of the current process in bytes (None if it is not available)"""
+  if resource is None:
+    return None
+  maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  if sys.platform == 'darwin':
+    return maxrss # bytes
+  return maxrss * 1024 # kilobytes
+
+
+def errorMessage(e):
+  """The message of the exception, followed by the traceback of the child process if it was raised by a KProcess"""
+  childTraceback = getattr(e, 'traceback', None)
+  if childTraceback:
+    return '%s\n%s' % (str(e), childTraceback.rstrip())
+  return str(e)
+
+
+def _runInProcess(connection, target, args, kwargs):
+  connection.send(_STARTED)
+  try:
+    startTime = timing.clock()
+    try:
+      result = target(*args, **kwargs)
+    finally:
+      duration = timing.clock() - startTime
+  except Exception as e:
+    connection.send((duration, _peakMemory(), None, e.__class__.__name__, str(e), traceback.format_exc()))
+  else:
+    try:
+      connection.send((duration, _peakMemory(), result, None, None, None))
+    except Exception as e: # the result is not picklable
+      connection.send((duration, _peakMemory(), None, e.__class__.__name__, str(e), traceback.format_exc()))
+  connection.close()
+
+
+class KProcess(object):
+  """Same interface of KThread, but the target runs isolated in a child process (no GIL, heap or GC shared with the
+  parent), that is killed (SIGKILL) when the timeout expires.
+  The timeout of joinWithTimeout starts when the child is ready to run the target, elapsed is the time from then until
+  the timeout expired.
+  After the join, duration (seconds, measured inside the child), peakMemory (maximum resident set size of the child
+  in bytes, it includes the memory inherited from the parent) and result (the value returned by the target, it must be
+  picklable) are available if the target finished. The exception raised by the join has the traceback of the child
+  (a string, also in KProcess.traceback)."""
+
+  def __init__(self, target=None, name=None, args=(), kwargs=None):
+    self.target = target
+    self.name = name or 'KProcess'
+    self.args = args
+    self.kwargs = kwargs or {}
+    self.expired = False
+    self.elapsed = None
+    self.duration = None
+    self.peakMemory = None
+    self.result = None
+    self.traceback = None
+    self.__exception = None
+    self.__process = None
+    self.__connection = None
+
+  def getName(self):
+    return self.name
+
+  def start(self):
+    self.__connection, childConnection = multiprocessing.Pipe(False)
+    self.__process = multiprocessing.Process(target=_runInProcess, name=self.name,
+                                             args=(childConnection, self.target, self.args, self.kwargs))
+    self.__process.start()
+    childConnection.close()
+
+  def isAlive(self):
+    return self.__process is not None and self.__process.is_alive()
+
+  def isExpired(self):
+    return self.expired
+
+  def kill(self):
+    if self.isAlive():
+      if hasattr(signal, 'SIGKILL'):
+        os.kill(self.__process.pid, signal.SIGKILL)
+      else:
+        self.__process.terminate()
+
+  def join(self, timeout=None):
+    self.__process.join(timeout)
+
+  def __stop(self):
+    self.kill()
+    self.join()
+    self.__connection.close()
+
+  def __receive(self):
+    try:
+      return self.__connection.recv()
+    except EOFError: # the process died without send the message
+      return None
+
+  def joinWithTimeout(self, timeout):
+    # The timeout starts when the child is ready to run the target: the startup of the process is not charged to the
+    # target. The result is received before the join: a result bigger than the buffer of the pipe blocks the child in
+    # send() until the parent reads it. poll() is also True when the child dies without send the result (EOF).
+    if not self.__connection.poll(PROCESS_STARTUP_TIMEOUT):
+      self.__stop()
+      raise Exception("The process %s didn't start in %s seconds" % (self.getName(), PROCESS_STARTUP_TIMEOUT))
+    response = self.__receive()
+    if response == _STARTED:
+      startTime = timing.clock()
+      if not self.__connection.poll(None if timeout < 0 else timeout):
+        self.elapsed = timing.clock() - startTime
+        self.expired = True
+        self.__stop()
+        return
+      response = self.__receive()
+    self.__connection.close()
+    self.join()
+    if response is None:
+      exceptionName, message = 'Exception', 'The process finished with exit code %s' % self.__process.exitcode
+    else:
+      self.duration, self.peakMemory, self.result, exceptionName, message, self.traceback = response
+    if exceptionName is not None:
+      self.__exception = Exception(message)
+      self.__exception.message = exceptionName + ' in ' + self.getName() + ': ' + message
+      self.__exception.traceback = self.traceback
+    if self.__exception is not None:
+      raise self.__exception
+
+
+class Barrier(object):
+  """Block the threads that call wait() until `parties` threads are waiting, then release all of them at the same time
+  (threading.Barrier is not available in Python 2). It can be used only once."""
+
+  def __init__(self, parties):
+    if parties < 1: raise Exception('The number of parties must be greater than 0.')
+    self.parties = parties
+    self.count = 0
+    self.condition = threading.Condition()
+
+  def wait(self):
+    self.condition.acquire()
+    try:
+      self.count += 1
+      if self.count >= self.parties:
+        self.condition.notifyAll()
+      while self.count < self.parties:
+        self.condition.wait()
+    finally:
+      self.condition.release()
+
+
+BACKENDS = {
+  'trace': KThread,
+  'async': AsyncKThread,
+  'process': KProcess,
+}
+
+
+def getKThreadClass(backend=None):
+  """backend = None/'trace' (KThread), 'async' (AsyncKThread) or 'process' (KProcess)"""
+  if backend is None:
+    backend = 'trace'
+  if backend not in BACKENDS:
+    raise Exception("Invalid backend '%s', use one of: %s" % (backend, ', '.join(sorted(BACKENDS.keys()))))
+  return BACKENDS[backend]
 
 
 #class StoppableThread (threading.Thread):
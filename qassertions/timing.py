@@ -0,0 +1,197 @@
+'''
+Clock and statistics used by the performance assertions.
+
+clock: the clock with the best resolution available, monotonic if possible: time.perf_counter (Python 3) or
+clock_gettime(CLOCK_MONOTONIC) (Python 2 on Linux). MONOTONIC is False when it falls back to the wall clock.
+threadClock: CPU time of the current thread (time.thread_time or clock_gettime(CLOCK_THREAD_CPUTIME_ID)), it doesn't
+advance while the thread waits or is preempted. It falls back to clock (THREAD_CLOCK is False).
+TimingResult: durations (in seconds) of the measured executions of a method
+ThroughputResult: calls per second and latency histogram of a method under concurrent load
+'''
+
+import ctypes
+import ctypes.util
+import math
+import sys
+import time
+import timeit
+
+
+# Ids of the clocks of clock_gettime in Linux
+CLOCK_MONOTONIC = 1
+CLOCK_THREAD_CPUTIME_ID = 3
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+def _posixClock(clockId):
+    '''
+    Function that returns clock_gettime(clockId) in seconds, None if it is not available (only Linux is supported,
+    the ids of the clocks depend on the system).
+    '''
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        clock_gettime = ctypes.CDLL(ctypes.util.find_library('rt') or 'librt.so.1').clock_gettime
+    except (OSError, AttributeError):
+        return None
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_Timespec)]
+    if clock_gettime(clockId, ctypes.byref(_Timespec())) != 0:
+        return None
+    def posixClock():
+        spec = _Timespec()
+        clock_gettime(clockId, ctypes.byref(spec))
+        return spec.tv_sec + spec.tv_nsec * 1e-9
+    return posixClock
+
+
+if hasattr(time, 'perf_counter'):
+    clock = time.perf_counter
+    MONOTONIC = True
+else:
+    clock = _posixClock(CLOCK_MONOTONIC)
+    MONOTONIC = clock is not None
+    if clock is None:
+        clock = timeit.default_timer # wall clock
+
+if hasattr(time, 'thread_time'):
+    threadClock = time.thread_time
+    THREAD_CLOCK = True
+else:
+    threadClock = _posixClock(CLOCK_THREAD_CPUTIME_ID)
+    THREAD_CLOCK = threadClock is not None
+    if threadClock is None:
+        threadClock = clock
+
+
+def percentile(sorted_values, p):
+    '''
+    p = percentile between 0 and 100. Linear interpolation between the closest values.
+    '''
+    if len(sorted_values) == 0: raise Exception('There is no value to calculate the percentile.')
+    position = (len(sorted_values) - 1) * (p / 100.0)
+    lower = int(math.floor(position))
+    upper = int(math.ceil(position))
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class TimingResult(object):
+    '''
+    Durations, in seconds, of the measured executions of a method (warmup executions are not included).
+    peakMemory = maximum resident set size in bytes, when it is measured (process isolation)
+
+    Statistics: min, max, mean, stddev, median, p<N> (p95, p99 etc) and mean+stddev
+    '''
+
+    def __init__(self, durations=None, warmup=0, peakMemory=None):
+        self.durations = list(durations or [])
+        self.warmup = warmup
+        self.peakMemory = peakMemory
+
+    def add(self, duration):
+        self.durations.append(duration)
+
+    def min(self):
+        return min(self.durations)
+
+    def max(self):
+        return max(self.durations)
+
+    def mean(self):
+        return sum(self.durations) / float(len(self.durations))
+
+    def stddev(self):
+        '''
+        Sample standard deviation (0 if there is just one duration).
+        '''
+        if len(self.durations) < 2:
+            return 0.0
+        mean = self.mean()
+        return math.sqrt(sum((d - mean) ** 2 for d in self.durations) / (len(self.durations) - 1))
+
+    def median(self):
+        return self.percentile(50)
+
+    def percentile(self, p):
+        return percentile(sorted(self.durations), p)
+
+    def statistic(self, name):
+        if name == 'mean+stddev':
+            return self.mean() + self.stddev()
+        if name.startswith('p') and name[1:].replace('.', '', 1).isdigit():
+            return self.percentile(float(name[1:]))
+        if name in ('min', 'max', 'mean', 'stddev', 'median'):
+            return getattr(self, name)()
+        raise Exception("Invalid statistic '%s', use one of: min, max, mean, stddev, median, mean+stddev or p<N> (p95, p99 etc)" % name)
+
+    def __len__(self):
+        return len(self.durations)
+
+    def __str__(self):
+        if not self.durations:
+            return 'runs=0'
+        return 'runs=%s, min=%.6fs, median=%.6fs, p95=%.6fs, p99=%.6fs, max=%.6fs, mean=%.6fs, stddev=%.6fs' % \
+            (len(self.durations), self.min(), self.median(), self.percentile(95), self.percentile(99), self.max(),
+             self.mean(), self.stddev())
+
+
+# Upper bounds (seconds) of the buckets of the latency histogram, the last bucket has no upper bound
+LATENCY_BUCKETS = [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1, 10]
+
+
+def formatSeconds(seconds):
+    for unit, factor in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= factor:
+            return '%g%s' % (round(seconds / factor, 6), unit)
+    return '%gus' % (seconds / 1e-6)
+
+
+class ThroughputResult(object):
+    '''
+    latencies = TimingResult with the duration of every call
+    elapsed = seconds between the first call and the end of the last one
+    concurrency = number of concurrent threads, processes or asyncio tasks
+    '''
+
+    def __init__(self, latencies, elapsed, concurrency=1):
+        self.latencies = latencies
+        self.elapsed = elapsed
+        self.concurrency = concurrency
+
+    def calls(self):
+        return len(self.latencies)
+
+    def opsPerSecond(self):
+        if self.elapsed <= 0:
+            return float('inf')
+        return self.calls() / self.elapsed
+
+    def histogram(self, buckets=None):
+        '''
+        List of (upper bound in seconds or None, number of calls) of the latencies.
+        buckets = default LATENCY_BUCKETS, increasing upper bounds
+        '''
+        buckets = buckets or LATENCY_BUCKETS
+        counts = [0] * (len(buckets) + 1)
+        for latency in self.latencies.durations:
+            index = 0
+            while index < len(buckets) and latency > buckets[index]:
+                index += 1
+            counts[index] += 1
+        return list(zip(buckets + [None], counts))
+
+    def __str__(self):
+        lines = ['calls=%s, concurrency=%s, elapsed=%.6fs, ops/sec=%.1f' % (self.calls(), self.concurrency, self.elapsed, self.opsPerSecond())]
+        if len(self.latencies):
+            lines.append('latency: %s' % self.latencies)
+        previous = 0
+        for bound, count in self.histogram():
+            if count:
+                label = '<= %s' % formatSeconds(bound) if bound is not None else '> %s' % formatSeconds(previous)
+                lines.append('%10s: %s' % (label, count))
+            previous = bound
+        return '\n'.join(lines)